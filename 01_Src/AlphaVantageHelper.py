@@ -12,6 +12,9 @@
 # Standard Python Modules
 import requests        # HTTP Requests Module
 
+# Local Modules
+from StageTiming import span, NETWORK
+
 
 
 # ---------------------- Custom Exceptions ----------------------
@@ -73,7 +76,8 @@ def fetch_earnings_alpha_vantage (api_key, base_url, ticker, data_type="eps", ea
         }
 
         # Sending request to the API
-        response = requests.get(alpha_vantage_url, params=params)
+        with span ("fetch.alpha_vantage", NETWORK):
+            response = requests.get(alpha_vantage_url, params=params)
         
         # HTTP Status Code for successful response
         HTTP_OK = 200
@@ -248,7 +252,8 @@ def get_balance_sheet_alpha_vantage (api_key, base_url, ticker, balance_sheet_pe
 
 
         # Sending request to the API
-        response = requests.get(alpha_vantage_url, params=params, timeout=10)
+        with span ("fetch.alpha_vantage", NETWORK):
+            response = requests.get(alpha_vantage_url, params=params, timeout=10)
 
         # HTTP Status Code for successful response
         HTTP_OK = 200
@@ -351,7 +356,8 @@ def get_income_statement_alpha_vantage (api_key, base_url, ticker, income_statem
         }
 
         # Sending request to the API
-        response = requests.get (alpha_vantage_url, params=params)
+        with span ("fetch.alpha_vantage", NETWORK):
+            response = requests.get (alpha_vantage_url, params=params)
 
         # HTTP Status Code for successful response
         HTTP_OK = 200
@@ -0,0 +1,290 @@
+# encoding: utf-8
+
+# Copyright (c) Ivan Antunović (ivantun05@gmail.com) - All rights reserved.
+# Unintended redistribution can be punishable by law.
+# By reading this message, you are automatically consenting to it
+# and you are accepting that the financial data might be incorrect.
+# The financial data generated by this script is for informational purposes only
+# and should not be considered as investment advice.
+# Use at your own risk.
+
+"""
+ArrowExporter.py - columnar (Parquet / Arrow IPC) export of complete screener runs
+-------------------------------------------------------------------------------
+Every run can be stored next to its Excel file as one columnar table:
+
+    • build_result_table(results_df, scores, config)
+    • write_result_table(file_name, table, file_format, compression)
+    • load_results(path, columns)
+
+One row per ticker with the result table columns (raw numbers), the raw value
+and z-score of every configured metric, the factor composites and the final
+composite. `run_id` / `run_date` columns allow many runs to be concatenated;
+the metric weights and the configuration are stored as schema metadata. The
+stored configuration is redacted (`redact_config`): API keys, tokens and other
+secrets never leave ScreenerConfig.json.
+
+`load_results` memory-maps the files, so reloading a year of daily runs (or
+only a few columns of them) takes seconds instead of parsing Excel files.
+
+pyarrow is an optional dependency - it is only needed when the export is
+enabled ('ArrowExport' in ScreenerConfig.json) or results are loaded.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import glob
+import json
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:     # optional dependency
+    pa = None
+
+from ZScoreCalculator import FactorScoreMatrix
+
+
+
+# ---------------------------------------------------------------------------
+# constants
+# ---------------------------------------------------------------------------
+
+# File formats and their extension
+#   - parquet: compressed, smallest files, column pruning on load
+#   - arrow:   Arrow IPC file, zero-copy memory-mapped load
+ARROW_FORMATS: Dict[str, str] = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+DEFAULT_ARROW_FORMAT = "parquet"
+DEFAULT_COMPRESSION = "zstd"
+
+# Schema metadata key of the run metadata (JSON)
+RUN_METADATA_KEY = b"stock_factor_screener"
+
+INDEX_COLUMN = "Ticker"
+
+# Configuration entries whose name contains one of these words are dropped before a run is stored
+SECRET_KEY_PARTS = ("key", "token", "secret", "password")
+
+
+
+# ---------------------------------------------------------------------------
+# public API
+# ---------------------------------------------------------------------------
+
+def redact_config (config: Optional[dict]) -> dict:
+    """
+    Copy of the configuration without secrets, for storing it with a run.
+
+    Entries whose name contains 'key', 'token', 'secret' or 'password' (any case,
+    e.g. 'AlphaVantage.API_Key') are dropped at every level.
+    """
+    def _redact (value: Any) -> Any:
+        if isinstance(value, dict):
+            return {
+                name: _redact(item) for name, item in value.items()
+                if not any(part in str(name).lower() for part in SECRET_KEY_PARTS)
+            }
+        if isinstance(value, list):
+            return [_redact(item) for item in value]
+        return value
+
+    return _redact(config or {})
+
+
+def build_result_frame (results_df: pd.DataFrame, scores: Optional[FactorScoreMatrix], run_id: str, run_date: datetime) -> pd.DataFrame:
+    """
+    Flat result table of one run: result columns plus all metric raw values, z-scores and composites.
+
+    Metric columns are named 'raw.<factor>.<metric>' / 'z.<factor>.<metric>',
+    composites 'composite.<factor>' and 'composite.final'. Tickers without
+    scores (invalid tickers) get NaN.
+    """
+    frame = results_df.copy()
+    frame.index = frame.index.astype(str)
+
+    # Mixed object columns (text with missing values) become nullable strings
+    for column in frame.columns:
+        if frame[column].dtype == object:
+            frame[column] = frame[column].map(lambda value: None if value is None or (isinstance(value, float) and np.isnan(value)) else str(value)).astype("string")
+
+    if scores is not None:
+        metric_labels = [f"{factor}.{key}" for factor, key in zip(scores.metric_factors, scores.metric_keys)]
+        score_columns = {}
+        score_columns.update({f"raw.{label}": row for label, row in zip(metric_labels, scores.raw)})
+        score_columns.update({f"z.{label}": row for label, row in zip(metric_labels, scores.zscores)})
+        score_columns.update({f"composite.{factor}": row for factor, row in zip(scores.factors, scores.composites)})
+        if scores.final_composite is not None:
+            score_columns["composite.final"] = scores.final_composite
+
+        score_frame = pd.DataFrame(score_columns, index=pd.Index(scores.tickers, dtype=str))
+        frame = frame.join(score_frame.reindex(frame.index))
+
+    frame.insert(0, "run_date", pd.Timestamp(run_date))
+    frame.insert(0, "run_id", run_id)
+    frame.index.name = INDEX_COLUMN
+    return frame.reset_index()
+
+
+def build_result_table (results_df: pd.DataFrame, scores: Optional[FactorScoreMatrix], config: Optional[dict] = None,
+                        run_date: Optional[datetime] = None) -> "pa.Table":
+    """
+    Arrow table of one run (see `build_result_frame`) with the run metadata attached to the schema.
+
+    Parameters:
+        results_df (pd.DataFrame): Result table (index = ticker, raw numbers).
+        scores (FactorScoreMatrix): Result of the z-score calculation (None = result table only).
+        config (dict): Screener configuration stored with the run (redacted).
+        run_date (datetime): Time of the run (default: now).
+
+    Returns:
+        pa.Table: Result table with schema metadata.
+    """
+    _require_pyarrow()
+
+    run_date = run_date or datetime.now()
+    run_id = run_date.strftime("%Y-%m-%dT%H-%M-%S")
+
+    frame = build_result_frame(results_df, scores, run_id, run_date)
+
+    # Plain (not large) strings, so that runs written by different pandas versions concatenate
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.cast(pa.schema([
+        field.with_type(pa.string()) if pa.types.is_large_string(field.type) else field
+        for field in table.schema
+    ], metadata=table.schema.metadata))
+
+    # run_id is constant per file - dictionary encoding stores it once
+    table = table.set_column(table.schema.get_field_index("run_id"), "run_id", table["run_id"].dictionary_encode())
+
+    run_metadata: Dict[str, Any] = {
+        "run_id": run_id,
+        "run_date": run_date.isoformat(),
+        "n_tickers": int(len(frame)),
+        "config": redact_config(config),
+    }
+    if scores is not None:
+        run_metadata["metric_weights"] = {
+            factor: {scores.metric_keys[row]: float(scores.weights[f_idx, row]) for row in scores.factor_rows(factor)}
+            for f_idx, factor in enumerate(scores.factors)
+        }
+        run_metadata["factor_weights"] = dict(zip(scores.factors, np.asarray(scores.factor_weights, dtype=float).tolist())) if scores.factor_weights is not None else {}
+        run_metadata["scoring_modes"] = dict(zip(scores.metric_factors, scores.modes))
+
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[RUN_METADATA_KEY] = json.dumps(run_metadata, default=str).encode("utf-8")
+    return table.replace_schema_metadata(schema_metadata)
+
+
+def write_result_table (file_name: str, table: "pa.Table", file_format: str = DEFAULT_ARROW_FORMAT,
+                        compression: Optional[str] = DEFAULT_COMPRESSION) -> str:
+    """
+    Write a result table as Parquet or Arrow IPC file.
+
+    Raises:
+        ValueError: If the file format is unknown.
+    """
+    _require_pyarrow()
+
+    if file_format == "parquet":
+        pq.write_table(table, file_name, compression=compression)
+    elif file_format == "arrow":
+        with pa.OSFile(file_name, "wb") as sink, pa_ipc.new_file(sink, table.schema, options=pa_ipc.IpcWriteOptions(compression=None)) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unknown Arrow export format '{file_format}'. Options: {list(ARROW_FORMATS)}")
+
+    return file_name
+
+
+def read_result_table (file_name: str, columns: Optional[List[str]] = None) -> "pa.Table":
+    """
+    Memory-map one Parquet / Arrow IPC result file (only the requested *columns*).
+
+    Requested columns the file does not contain are skipped (runs of other
+    configurations); only the remaining columns are read from disk.
+    """
+    _require_pyarrow()
+
+    if file_name.endswith(ARROW_FORMATS["arrow"]):
+        # Zero-copy: the columns are views on the memory-mapped file, unselected columns are never touched
+        table = pa_ipc.open_file(pa.memory_map(file_name, "r")).read_all()
+        return table.select([column for column in columns if column in table.column_names]) if columns else table
+
+    # Parquet: column pruning - only the selected column chunks are read
+    if columns:
+        file_columns = set(pq.read_schema(file_name).names)
+        columns = [column for column in columns if column in file_columns]
+
+    return pq.read_table(file_name, columns=columns, memory_map=True)
+
+
+def load_results (path: str, columns: Optional[List[str]] = None, as_pandas: bool = True):
+    """
+    Load one result file or all result files of a directory (e.g. 'gen') into one table.
+
+    Runs with different configurations (different metric columns) are combined,
+    missing columns are filled with nulls. Select *columns* to read only what is
+    needed ('run_date', 'Ticker', 'composite.final', ...).
+
+    Parameters:
+        path (str): Result file or directory containing .parquet / .arrow files.
+        columns (List[str]): Columns to load (default: all).
+        as_pandas (bool): Return a pandas DataFrame instead of an Arrow table.
+
+    Returns:
+        pd.DataFrame | pa.Table: All runs, in file name (i.e. date) order.
+    """
+    _require_pyarrow()
+
+    if os.path.isdir(path):
+        file_names = sorted(
+            file_name
+            for extension in ARROW_FORMATS.values()
+            for file_name in glob.glob(os.path.join(path, f"*{extension}"))
+        )
+    else:
+        file_names = [path]
+
+    tables = []
+    for file_name in file_names:
+        table = read_result_table(file_name, columns)
+        tables.append(table.replace_schema_metadata(None))
+
+    if not tables:
+        table = pa.table({})
+    else:
+        table = pa.concat_tables(tables, promote_options="default")
+
+    return table.to_pandas() if as_pandas else table
+
+
+def read_run_metadata (file_name: str) -> Dict[str, Any]:
+    """Run metadata (run id, date, configuration, weights) of one result file."""
+    _require_pyarrow()
+
+    if file_name.endswith(ARROW_FORMATS["arrow"]):
+        schema = pa_ipc.open_file(pa.memory_map(file_name, "r")).schema
+    else:
+        schema = pq.read_schema(file_name)
+
+    return json.loads((schema.metadata or {}).get(RUN_METADATA_KEY, b"{}"))
+
+
+
+# ---------------------------------------------------------------------------
+# internal helpers
+# ---------------------------------------------------------------------------
+
+def _require_pyarrow () -> None:
+    """Raise a helpful error if the optional pyarrow dependency is missing."""
+    if pa is None:
+        raise ImportError("The Parquet / Arrow export requires 'pyarrow' (pip install pyarrow).")
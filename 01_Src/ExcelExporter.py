@@ -0,0 +1,341 @@
+# encoding: utf-8
+
+# Copyright (c) Ivan Antunović (ivantun05@gmail.com) - All rights reserved.
+# Unintended redistribution can be punishable by law.
+# By reading this message, you are automatically consenting to it
+# and you are accepting that the financial data might be incorrect.
+# The financial data generated by this script is for informational purposes only
+# and should not be considered as investment advice.
+# Use at your own risk.
+
+"""
+ExcelExporter.py - streaming Excel export of the screener results
+-------------------------------------------------------------------------------
+Writes the result table in a single pass into a write-only openpyxl workbook:
+
+    • write_stock_table(file_name, df)
+    • write_workbook(file_name, sheets)                    several tables, one sheet each
+    • build_factor_details(scores, metric_sources)         per-factor detail tables
+
+Rows are streamed straight to the file instead of being held as a cell tree,
+so memory stays flat as the universe grows. The ETF header block is written
+above the table and every numeric column gets its number format.
+
+Formatting is applied per column or per range, never cell by cell: each column
+streams its values through one reusable styled cell (one shared style id in
+the file), and the z-score / composite colour scale, the frozen header row /
+ticker column and the autofilter are a handful of range-level rules written
+once per sheet. Formatting a 10,000 row sheet costs no more than writing it.
+
+The result rows hold raw numbers (NaN = missing, '(%)' columns as fractions).
+`to_display_units` converts them for presentation with vectorised per-column
+operations (percent scaling, rounding); missing values are rendered as "N/A".
+
+The factor detail tables show, per factor block and ticker, the raw value,
+z-score and effective weight of every metric (renormalised over the metrics
+available for that ticker, i.e. the weight it really had in the composite)
+plus the source MetricSelector chose for multi-source metrics.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import math
+import numbers
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import ColorScaleRule
+from openpyxl.utils import get_column_letter
+
+from ZScoreCalculator import FactorScoreMatrix
+
+
+
+# ---------------------------------------------------------------------------
+# constants
+# ---------------------------------------------------------------------------
+
+# (label, value, hyperlink) rows written above the result table
+ETF_HEADER_ROWS: List[Tuple[str, str, Optional[str]]] = [
+    ("ETF", "MSCI World Momentum Index", "https://www.ishares.com/uk/individual/en/products/270051/ishares-msci-world-momentum-factor-ucits-etf?switchLocale=y&siteEntryPassthrough=true"),
+    ("Total Investment", "1.000,00 €", None),
+]
+
+# Number format of all numeric columns without an explicit entry in COLUMN_NUMBER_FORMATS
+DEFAULT_NUMBER_FORMAT = "#,##0.00"
+INTEGER_NUMBER_FORMAT = "0"
+
+COLUMN_NUMBER_FORMATS: Dict[str, str] = {
+    "Original Weight": "0.00",
+    "Portfolio Rank": INTEGER_NUMBER_FORMAT,
+}
+
+# Column widths of the first (ticker) and second (company) column
+COLUMN_WIDTHS: Dict[str, float] = {
+    "A": 20,
+    "B": 30,
+}
+
+INDEX_HEADER = "Ticker"
+
+# Columns with this suffix hold fractions in the result rows and are shown in percent
+PERCENT_COLUMN_SUFFIX = "(%)"
+DISPLAY_DECIMALS = 2
+MISSING_VALUE = "N/A"
+
+# Colour scale of the z-score and composite columns: red (-2 σ) - white (0) - green (+2 σ)
+COLOR_SCALE_COLUMN_PREFIXES = ("Z-Score",)
+COLOR_SCALE_COLUMN_SUFFIXES = ("Composite Z-Score", "(z)")
+COLOR_SCALE_POINTS: List[Tuple[float, str]] = [(-2.0, "F8696B"), (0.0, "FFFFFF"), (2.0, "63BE7B")]
+
+SUMMARY_SHEET_TITLE = "Summary"
+COMPOSITE_HEADER = "Composite"
+
+# Multi-source metrics: factor block -> { z_score_metrics key -> metric name in Stock.metric_sources }
+METRIC_SOURCE_NAMES: Dict[str, Dict[str, str]] = {
+    "ProfitabilityFactor": {
+        "gross_profit_assets": "GPOA",
+        "roe": "ROE",
+        "roa": "ROA",
+        "cfoa": "CFOA",
+        "gpmar": "GPMAR",
+        "gprmar": "GPMAR",
+    },
+}
+
+
+
+# ---------------------------------------------------------------------------
+# public API
+# ---------------------------------------------------------------------------
+
+def to_display_units (df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Presentation copy of the result table: '(%)' columns scaled to percent, numeric columns rounded.
+
+    Every operation works on whole columns; text columns are left untouched.
+    """
+    df = df.copy()
+
+    numeric_columns = [column for column in df.columns if is_numeric_dtype(df[column]) and not is_bool_dtype(df[column])]
+    percent_columns = [column for column in numeric_columns if str(column).endswith(PERCENT_COLUMN_SUFFIX)]
+
+    if percent_columns:
+        df[percent_columns] = df[percent_columns] * 100.0
+    if numeric_columns:
+        df[numeric_columns] = df[numeric_columns].round(DISPLAY_DECIMALS)
+
+    return df
+
+
+def is_score_column (column) -> bool:
+    """True for z-score and composite columns (colour scale)."""
+    column = str(column)
+    return column == COMPOSITE_HEADER or column.startswith(COLOR_SCALE_COLUMN_PREFIXES) or column.endswith(COLOR_SCALE_COLUMN_SUFFIXES)
+
+
+def write_stock_table (file_name: str, df: pd.DataFrame,
+                       header_rows: Sequence[Tuple[str, str, Optional[str]]] = ETF_HEADER_ROWS,
+                       column_formats: Optional[Dict[str, str]] = None,
+                       sheet_title: str = "Sheet1") -> str:
+    """
+    Stream the result table (one row per ticker, index = ticker) into an Excel file.
+
+    The table is converted with `to_display_units` first; numbers stay numbers
+    (sortable in Excel) and missing values are written as "N/A".
+
+    Layout:
+        rows 1..k   ETF header block (label, value, optional hyperlink on the value)
+        row  k+1    empty
+        row  k+2    column header
+        rows ...    one row per ticker
+
+    Parameters:
+        file_name (str): Target .xlsx file.
+        df (pd.DataFrame): Result table with raw numbers.
+        header_rows (Sequence): (label, value, hyperlink) rows written above the table.
+        column_formats (Dict[str, str]): Number format per column, overrides COLUMN_NUMBER_FORMATS.
+        sheet_title (str): Name of the worksheet.
+
+    Returns:
+        str: The file name.
+    """
+    return write_workbook(file_name, {sheet_title: df}, header_rows, column_formats)
+
+
+def write_workbook (file_name: str, sheets: Dict[str, pd.DataFrame],
+                    header_rows: Sequence[Tuple[str, str, Optional[str]]] = ETF_HEADER_ROWS,
+                    column_formats: Optional[Dict[str, str]] = None) -> str:
+    """
+    Stream several tables (index = ticker) into one Excel file, one worksheet each.
+
+    The sheets are written one after the other into the same write-only workbook;
+    the header block is written above the first table only (see `write_stock_table`
+    for the layout).
+
+    Parameters:
+        file_name (str): Target .xlsx file.
+        sheets (Dict[str, pd.DataFrame]): Sheet title -> table with raw numbers.
+        header_rows (Sequence): (label, value, hyperlink) rows written above the first table.
+        column_formats (Dict[str, str]): Number format per column, overrides COLUMN_NUMBER_FORMATS.
+
+    Returns:
+        str: The file name.
+    """
+    number_formats = dict(COLUMN_NUMBER_FORMATS, **(column_formats or {}))
+
+    workbook = Workbook(write_only=True)
+
+    for sheet_idx, (sheet_title, df) in enumerate(sheets.items()):
+        worksheet = workbook.create_sheet(title=sheet_title)
+
+        # Column widths must be set before the first row is streamed
+        for column_letter, width in COLUMN_WIDTHS.items():
+            worksheet.column_dimensions[column_letter].width = width
+
+        sheet_header_rows = header_rows if sheet_idx == 0 else []
+        header_row = len(sheet_header_rows) + 1 + (1 if sheet_header_rows else 0)
+
+        # Freeze the column header and the ticker column (part of the sheet view, set before streaming)
+        worksheet.freeze_panes = f"B{header_row + 1}"
+
+        _append_header_rows(worksheet, sheet_header_rows)
+        _append_table(worksheet, to_display_units(df), number_formats)
+        _add_range_formats(worksheet, df, header_row)
+
+    workbook.save(file_name)
+    return file_name
+
+
+def build_factor_details (scores: FactorScoreMatrix,
+                          metric_sources: Optional[Dict[str, Dict[str, Optional[str]]]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    One detail table per factor block (index = ticker) from the scoring engine's matrices.
+
+    Columns: the factor composite, then per metric '<key> (raw)', '<key> (z)',
+    '<key> weight (%)' (effective weight after renormalisation over the available
+    metrics), '<key> (source)' for multi-source metrics and '<key> (imputed)' if the
+    factor block imputes missing values.
+
+    Parameters:
+        scores (FactorScoreMatrix): Result of the z-score calculation.
+        metric_sources (Dict): Ticker -> {metric: source} as chosen by MetricSelector.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Factor block name -> detail table.
+    """
+    metric_sources = metric_sources or {}
+    index = pd.Index(scores.tickers, dtype=str, name=INDEX_HEADER)
+    details: Dict[str, pd.DataFrame] = {}
+
+    for f_idx, factor in enumerate(scores.factors):
+        rows = scores.factor_rows(factor)
+        zscores = np.asarray(scores.zscores[rows], dtype=float)
+        raw = np.asarray(scores.raw[rows], dtype=float)
+
+        # Effective weight: configured weight renormalised over the metrics available per ticker
+        weighted_mask = scores.weights[f_idx, rows][:, None] * ~np.isnan(zscores)
+        weight_sum = weighted_mask.sum(axis=0)
+        effective_weights = np.divide(weighted_mask, weight_sum, out=np.full_like(weighted_mask, np.nan), where=weight_sum != 0)
+
+        source_names = METRIC_SOURCE_NAMES.get(factor, {})
+        columns: Dict[str, object] = {COMPOSITE_HEADER: scores.composites[f_idx]}
+
+        for m_idx, row in enumerate(rows):
+            key = scores.metric_keys[row]
+            columns[f"{key} (raw)"] = raw[m_idx]
+            columns[f"{key} (z)"] = zscores[m_idx]
+            columns[f"{key} weight {PERCENT_COLUMN_SUFFIX}"] = effective_weights[m_idx]
+            if key in source_names:
+                columns[f"{key} (source)"] = [metric_sources.get(ticker, {}).get(source_names[key]) for ticker in scores.tickers]
+            if scores.imputed is not None and scores.imputation and scores.imputation[row] != "none":
+                columns[f"{key} (imputed)"] = scores.imputed[row]
+
+        details[factor] = pd.DataFrame(columns, index=index)
+
+    return details
+
+
+
+# ---------------------------------------------------------------------------
+# internal helpers
+# ---------------------------------------------------------------------------
+
+def _append_header_rows (worksheet, header_rows: Sequence[Tuple[str, str, Optional[str]]]) -> None:
+    """ETF header block (label, value, optional hyperlink on the value) followed by an empty row."""
+    if not header_rows:
+        return
+
+    for label, value, hyperlink in header_rows:
+        value_cell = WriteOnlyCell(worksheet, value=value)
+        if hyperlink:
+            value_cell.hyperlink = hyperlink
+            value_cell.style = "Hyperlink"
+        worksheet.append([label, value_cell])
+    worksheet.append([])
+
+
+def _append_table (worksheet, df: pd.DataFrame, number_formats: Dict[str, str]) -> None:
+    """Column header and one row per ticker (index), every number with its column's number format."""
+    worksheet.append([INDEX_HEADER] + [str(column) for column in df.columns])
+
+    # One reusable styled cell per column and number type: a streamed row is serialised by `append`,
+    # so the same cell object carries the value of every row (no cell object / style lookup per value)
+    float_cells = [_styled_cell(worksheet, number_formats.get(column) or DEFAULT_NUMBER_FORMAT) for column in df.columns]
+    integer_cells = [_styled_cell(worksheet, number_formats.get(column) or INTEGER_NUMBER_FORMAT) for column in df.columns]
+
+    for ticker, row in zip(df.index, df.itertuples(index=False, name=None)):
+        worksheet.append([ticker] + [
+            _to_cell(value, float_cell, integer_cell)
+            for value, float_cell, integer_cell in zip(row, float_cells, integer_cells)
+        ])
+
+
+def _add_range_formats (worksheet, df: pd.DataFrame, header_row: int) -> None:
+    """Autofilter over the table and one colour scale rule over all z-score / composite columns."""
+    if df.empty:
+        return
+
+    first_row, last_row = header_row + 1, header_row + len(df)
+    worksheet.auto_filter.ref = f"A{header_row}:{get_column_letter(len(df.columns) + 1)}{last_row}"
+
+    score_ranges = [
+        f"{get_column_letter(col_idx)}{first_row}:{get_column_letter(col_idx)}{last_row}"
+        for col_idx, column in enumerate(df.columns, start=2)
+        if is_score_column(column)
+    ]
+    if score_ranges:
+        (start_value, start_color), (mid_value, mid_color), (end_value, end_color) = COLOR_SCALE_POINTS
+        worksheet.conditional_formatting.add(" ".join(score_ranges), ColorScaleRule(
+            start_type="num", start_value=start_value, start_color=start_color,
+            mid_type="num", mid_value=mid_value, mid_color=mid_color,
+            end_type="num", end_value=end_value, end_color=end_color,
+        ))
+
+
+def _styled_cell (worksheet, number_format: str) -> WriteOnlyCell:
+    """Write-only cell with a number format, reused for all values of a column."""
+    cell = WriteOnlyCell(worksheet)
+    cell.number_format = number_format
+    return cell
+
+
+def _to_cell (value, float_cell: WriteOnlyCell, integer_cell: WriteOnlyCell):
+    """Plain value for text cells, "N/A" for missing values, the column's styled cell for numbers."""
+    if value is None:
+        return MISSING_VALUE
+    if isinstance(value, (str, bool)):
+        return value
+    if isinstance(value, numbers.Integral):
+        integer_cell.value = int(value)
+        return integer_cell
+    if isinstance(value, numbers.Real):
+        if math.isnan(value):
+            return MISSING_VALUE
+        float_cell.value = float(value)
+        return float_cell
+    return value
@@ -0,0 +1,142 @@
+# encoding: utf-8
+
+# Copyright (c) Ivan Antunović (ivantun05@gmail.com) - All rights reserved.
+# Unintended redistribution can be punishable by law.
+# By reading this message, you are automatically consenting to it
+# and you are accepting that the financial data might be incorrect.
+# The financial data generated by this script is for informational purposes only
+# and should not be considered as investment advice.
+# Use at your own risk.
+
+"""
+FactorCorrelation.py - correlation and redundancy report of the metric z-scores
+-------------------------------------------------------------------------------
+Many factor inputs are highly collinear (ROE vs ROA, GPOA vs GPMAR, ...), which
+silently overweights one theme in the composite. This module computes the
+pairwise, NaN-aware (pairwise complete observations) Pearson correlation of all
+metric z-score rows of the `FactorScoreMatrix` already built by the scoring
+engine, and flags the pairs above a threshold.
+
+All pairs are computed at once with a handful of (M x N) @ (N x M) matrix
+products, so the report adds almost no runtime.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Tuple
+import numpy as np
+import pandas as pd
+
+from ZScoreCalculator import FactorScoreMatrix
+
+
+
+# ---------------------------------------------------------------------------
+# constants
+# ---------------------------------------------------------------------------
+
+DEFAULT_CORRELATION_THRESHOLD = 0.8
+DEFAULT_MIN_OBSERVATIONS = 10
+
+
+
+# ---------------------------------------------------------------------------
+# dataclasses
+# ---------------------------------------------------------------------------
+
+@dataclass
+class CorrelationReport:
+    """Pairwise correlation matrix of the metric z-scores and the flagged (redundant) pairs."""
+
+    labels: List[str]               # 'Factor: metric' label of every row / column
+    correlation: np.ndarray         # (M x M) correlation matrix (NaN = not enough observations)
+    observations: np.ndarray        # (M x M) number of tickers where both metrics are available
+    flagged: pd.DataFrame           # Pairs with |correlation| >= threshold, strongest first
+
+    def to_frame (self) -> pd.DataFrame:
+        """Correlation matrix as DataFrame labelled with the metric names."""
+        return pd.DataFrame(self.correlation, index=self.labels, columns=self.labels)
+
+
+
+# ---------------------------------------------------------------------------
+# public API
+# ---------------------------------------------------------------------------
+
+def calc_nan_correlation (matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairwise-complete Pearson correlation between all rows of a (M x N) matrix.
+
+    For every pair of rows only the columns where both values are available are
+    used. All sums needed for all pairs are obtained with matrix products of the
+    zero-filled values and the validity mask:
+
+        n_xy  = M @ Mᵀ          Σx  = X @ Mᵀ          Σx² = X² @ Mᵀ          Σxy = X @ Xᵀ
+
+    Parameters:
+        matrix (np.ndarray): 2D array (metrics x tickers), may contain NaNs.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (M x M) correlation and number of pairwise observations.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    mask = (~np.isnan(matrix)).astype(float)
+    values = np.where(mask > 0, matrix, 0.0)
+
+    n_obs = mask @ mask.T
+    sum_x = values @ mask.T                 # Σ x_i over the columns where row j is valid too
+    sum_y = sum_x.T
+    sum_xx = (values ** 2) @ mask.T
+    sum_yy = sum_xx.T
+    sum_xy = values @ values.T
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = sum_xy - sum_x * sum_y / n_obs
+        variance_x = sum_xx - sum_x ** 2 / n_obs
+        variance_y = sum_yy - sum_y ** 2 / n_obs
+        correlation = covariance / np.sqrt(variance_x * variance_y)
+
+    correlation[~np.isfinite(correlation)] = np.nan
+    correlation = np.clip(correlation, -1.0, 1.0)
+
+    return correlation, n_obs.astype(np.int64)
+
+
+def build_correlation_report (scores: FactorScoreMatrix, threshold: float = DEFAULT_CORRELATION_THRESHOLD,
+                              min_observations: int = DEFAULT_MIN_OBSERVATIONS) -> CorrelationReport:
+    """
+    Correlation report of all metric z-scores of the scoring engine's matrix.
+
+    Parameters:
+        scores (FactorScoreMatrix): Result of the z-score calculation.
+        threshold (float): Absolute correlation from which a pair is flagged as redundant.
+        min_observations (int): Minimum number of common tickers for a correlation to be reported.
+
+    Returns:
+        CorrelationReport: Correlation matrix and flagged pairs.
+    """
+    labels = [f"{factor}: {key}" for factor, key in zip(scores.metric_factors, scores.metric_keys)]
+
+    correlation, observations = calc_nan_correlation(scores.zscores)
+    correlation[observations < min_observations] = np.nan
+
+    # Flag each pair once (upper triangle, without the diagonal)
+    upper_rows, upper_cols = np.triu_indices(len(labels), k=1)
+    pair_corr = correlation[upper_rows, upper_cols]
+    is_flagged = np.abs(np.nan_to_num(pair_corr)) >= threshold
+
+    flagged = pd.DataFrame({
+        "Metric A": np.asarray(labels, dtype=object)[upper_rows[is_flagged]],
+        "Metric B": np.asarray(labels, dtype=object)[upper_cols[is_flagged]],
+        "Correlation": pair_corr[is_flagged],
+        "Observations": observations[upper_rows[is_flagged], upper_cols[is_flagged]],
+    })
+    flagged = flagged.reindex(flagged["Correlation"].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+    return CorrelationReport(
+        labels=labels,
+        correlation=correlation,
+        observations=observations,
+        flagged=flagged,
+    )
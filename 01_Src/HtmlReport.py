@@ -0,0 +1,351 @@
+# encoding: utf-8
+
+# Copyright (c) Ivan Antunović (ivantun05@gmail.com) - All rights reserved.
+# Unintended redistribution can be punishable by law.
+# By reading this message, you are automatically consenting to it
+# and you are accepting that the financial data might be incorrect.
+# The financial data generated by this script is for informational purposes only
+# and should not be considered as investment advice.
+# Use at your own risk.
+
+"""
+HtmlReport.py - static, self-contained HTML report of the screener results
+-------------------------------------------------------------------------------
+Renders the result table into one HTML file next to the Excel file:
+
+    • write_html_report(file_name, results_df, title)
+
+The page has no external dependencies (no CDN, no web fonts) and works from
+the file system or a headless server:
+
+    • sector exposure summary          (rendered server-side, HTML table)
+    • score distributions              (rendered server-side, inline SVG histograms)
+    • result table                     (embedded JSON, sorted / filtered / paginated client-side)
+
+Only one page of rows is in the DOM at a time, so a 5,000 ticker universe
+opens instantly. The page is rendered from `string.Template` templates in one
+pass; all aggregations are vectorised pandas / numpy operations.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from html import escape
+from string import Template
+from typing import List, Optional
+import json
+import numpy as np
+import pandas as pd
+
+from ExcelExporter import to_display_units, INDEX_HEADER
+
+
+
+# ---------------------------------------------------------------------------
+# constants
+# ---------------------------------------------------------------------------
+
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_HISTOGRAM_BINS = 20
+
+# Score columns of the result table shown as distributions (if present)
+SCORE_COLUMNS: List[str] = [
+    "Z-Score Final",
+    "Z-Score Value",
+    "Z-Score Profitability",
+    "Z-Score Growth",
+]
+
+SECTOR_COLUMN = "Sector"
+WEIGHT_COLUMN = "Original Weight"
+TARGET_WEIGHT_COLUMN = "Target Weight (%)"
+
+# Histogram size (SVG user units)
+HISTOGRAM_WIDTH = 320
+HISTOGRAM_HEIGHT = 120
+
+
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>
+  body { font-family: -apple-system, "Segoe UI", Roboto, Arial, sans-serif; margin: 24px; color: #222; }
+  h1 { font-size: 1.4em; margin-bottom: 0; }
+  h2 { font-size: 1.1em; margin-top: 28px; }
+  .meta { color: #666; font-size: 0.9em; }
+  table { border-collapse: collapse; font-size: 0.85em; }
+  th, td { border: 1px solid #ddd; padding: 3px 8px; white-space: nowrap; }
+  th { background: #f3f3f3; position: sticky; top: 0; }
+  td.num { text-align: right; font-variant-numeric: tabular-nums; }
+  #results th { cursor: pointer; user-select: none; }
+  #results th.asc::after { content: " \\25B2"; }
+  #results th.desc::after { content: " \\25BC"; }
+  .histograms { display: flex; flex-wrap: wrap; gap: 16px; }
+  .histograms figure { margin: 0; }
+  .histograms figcaption { font-size: 0.85em; color: #444; }
+  .histograms rect { fill: #4a78b5; }
+  .controls { margin: 8px 0; }
+  .controls input { margin-right: 12px; }
+  .table-wrap { overflow-x: auto; max-height: 80vh; }
+</style>
+</head>
+<body>
+<h1>$title</h1>
+<p class="meta">Generated $generated &middot; $n_tickers tickers</p>
+
+<h2>Sector Exposure</h2>
+$sector_table
+
+<h2>Score Distributions</h2>
+<div class="histograms">
+$histograms
+</div>
+
+<h2>Results</h2>
+<div class="controls">
+  <input id="filter" type="search" placeholder="Filter (ticker, company, sector, ...)">
+  <button id="prev">&laquo; Prev</button>
+  <span id="page-info"></span>
+  <button id="next">Next &raquo;</button>
+</div>
+<div class="table-wrap">
+<table id="results"><thead><tr></tr></thead><tbody></tbody></table>
+</div>
+
+<script type="application/json" id="report-data">$data</script>
+<script>
+(function () {
+  "use strict";
+  var data = JSON.parse(document.getElementById("report-data").textContent);
+  var pageSize = $page_size;
+  var columns = data.columns, rows = data.rows, view = rows.slice();
+  var page = 0, sortColumn = -1, sortAscending = true;
+  var head = document.querySelector("#results thead tr"), body = document.querySelector("#results tbody");
+
+  columns.forEach(function (name, idx) {
+    var th = document.createElement("th");
+    th.textContent = name;
+    th.addEventListener("click", function () { sortBy(idx); });
+    head.appendChild(th);
+  });
+
+  function compare(a, b) {
+    if (a === b) return 0;
+    if (a === null) return 1;                         // missing values last in both directions
+    if (b === null) return -1;
+    var result = (typeof a === "number" && typeof b === "number") ? a - b : String(a).localeCompare(String(b));
+    return sortAscending ? result : -result;
+  }
+
+  function sortBy(idx) {
+    sortAscending = (sortColumn === idx) ? !sortAscending : (typeof firstValue(idx) !== "number");
+    sortColumn = idx;
+    view.sort(function (a, b) { return compare(a[idx], b[idx]); });
+    Array.prototype.forEach.call(head.children, function (th, i) {
+      th.className = (i === idx) ? (sortAscending ? "asc" : "desc") : "";
+    });
+    page = 0;
+    render();
+  }
+
+  function firstValue(idx) {
+    for (var i = 0; i < rows.length; i++) { if (rows[i][idx] !== null) return rows[i][idx]; }
+    return null;
+  }
+
+  function applyFilter(text) {
+    text = text.trim().toLowerCase();
+    view = !text ? rows.slice() : rows.filter(function (row) {
+      return row.some(function (value) { return value !== null && String(value).toLowerCase().indexOf(text) !== -1; });
+    });
+    if (sortColumn >= 0) view.sort(function (a, b) { return compare(a[sortColumn], b[sortColumn]); });
+    page = 0;
+    render();
+  }
+
+  function render() {
+    var pages = Math.max(1, Math.ceil(view.length / pageSize));
+    page = Math.min(Math.max(page, 0), pages - 1);
+    var html = [];
+    view.slice(page * pageSize, (page + 1) * pageSize).forEach(function (row) {
+      html.push("<tr>");
+      row.forEach(function (value) {
+        if (value === null) html.push('<td class="num">N/A</td>');
+        else if (typeof value === "number") html.push('<td class="num">' + value.toLocaleString(undefined, {maximumFractionDigits: 2}) + "</td>");
+        else html.push("<td>" + String(value).replace(/&/g, "&amp;").replace(/</g, "&lt;") + "</td>");
+      });
+      html.push("</tr>");
+    });
+    body.innerHTML = html.join("");
+    document.getElementById("page-info").textContent = "Page " + (page + 1) + " / " + pages + " (" + view.length + " rows)";
+  }
+
+  document.getElementById("prev").addEventListener("click", function () { page--; render(); });
+  document.getElementById("next").addEventListener("click", function () { page++; render(); });
+  document.getElementById("filter").addEventListener("input", function (event) { applyFilter(event.target.value); });
+
+  render();
+})();
+</script>
+</body>
+</html>
+""")
+
+HISTOGRAM_TEMPLATE = Template("""<figure>
+<svg width="$width" height="$height" viewBox="0 0 $width $height" role="img" aria-label="$label">$bars</svg>
+<figcaption>$label &middot; n = $count &middot; mean $mean &middot; median $median<br>[$low, $high]</figcaption>
+</figure>""")
+
+
+
+# ---------------------------------------------------------------------------
+# public API
+# ---------------------------------------------------------------------------
+
+def build_sector_exposure (results_df: pd.DataFrame, score_column: str = SCORE_COLUMNS[0]) -> pd.DataFrame:
+    """
+    Sector exposure of the universe: tickers, share of tickers, share of the original
+    (and target, if a portfolio was selected) weight and the mean / median score.
+
+    Returns an empty table if the result table has no sector column.
+    """
+    if SECTOR_COLUMN not in results_df.columns:
+        return pd.DataFrame()
+
+    df = results_df.assign(**{SECTOR_COLUMN: results_df[SECTOR_COLUMN].fillna("N/A")})
+    grouped = df.groupby(SECTOR_COLUMN, sort=False)
+
+    exposure = pd.DataFrame({"Tickers": grouped.size()})
+    exposure["Tickers (%)"] = exposure["Tickers"] / exposure["Tickers"].sum() * 100.0
+
+    for column, label in ((WEIGHT_COLUMN, "Original Weight (%)"), (TARGET_WEIGHT_COLUMN, "Target Weight (%)")):
+        if column in df.columns:
+            weights = pd.to_numeric(df[column], errors="coerce")
+            total = weights.sum()
+            if total:
+                exposure[label] = weights.groupby(df[SECTOR_COLUMN], sort=False).sum() / total * 100.0
+
+    if score_column in df.columns:
+        scores = pd.to_numeric(df[score_column], errors="coerce").groupby(df[SECTOR_COLUMN], sort=False)
+        exposure[f"Mean {score_column}"] = scores.mean()
+        exposure[f"Median {score_column}"] = scores.median()
+
+    return exposure.sort_values("Tickers", ascending=False)
+
+
+def render_html_report (results_df: pd.DataFrame, title: str, page_size: int = DEFAULT_PAGE_SIZE,
+                        histogram_bins: int = DEFAULT_HISTOGRAM_BINS, generated: Optional[datetime] = None) -> str:
+    """
+    Render the HTML report of one run.
+
+    Parameters:
+        results_df (pd.DataFrame): Result table (index = ticker, raw numbers).
+        title (str): Page title.
+        page_size (int): Rows per page of the result table.
+        histogram_bins (int): Number of bins of the score histograms.
+        generated (datetime): Time stamp shown on the page (default: now).
+
+    Returns:
+        str: Complete HTML document.
+    """
+    generated = generated or datetime.now()
+
+    return PAGE_TEMPLATE.substitute(
+        title=escape(title),
+        generated=generated.strftime("%Y-%m-%d %H:%M"),
+        n_tickers=len(results_df),
+        sector_table=_render_sector_table(build_sector_exposure(results_df)),
+        histograms="\n".join(
+            _render_histogram(pd.to_numeric(results_df[column], errors="coerce").to_numpy(dtype=float), column, histogram_bins)
+            for column in SCORE_COLUMNS if column in results_df.columns
+        ),
+        data=_embed_json(results_df),
+        page_size=int(page_size),
+    )
+
+
+def write_html_report (file_name: str, results_df: pd.DataFrame, title: str, page_size: int = DEFAULT_PAGE_SIZE,
+                       histogram_bins: int = DEFAULT_HISTOGRAM_BINS) -> str:
+    """Render the HTML report (see `render_html_report`) and write it to *file_name*."""
+    html = render_html_report(results_df, title, page_size, histogram_bins)
+
+    with open(file_name, "w", encoding="utf-8") as html_file:
+        html_file.write(html)
+
+    return file_name
+
+
+
+# ---------------------------------------------------------------------------
+# internal helpers
+# ---------------------------------------------------------------------------
+
+def _embed_json (results_df: pd.DataFrame) -> str:
+    """Result table in display units as {"columns": [...], "rows": [[...], ...]} JSON, safe inside <script>."""
+    df = to_display_units(results_df)
+    df.index = df.index.astype(str)
+
+    # Text columns: missing values as null (not 'nan'), everything else as string
+    for column in df.columns:
+        if df[column].dtype == object:
+            df[column] = df[column].where(df[column].notna(), None)
+
+    rows = df.reset_index().to_json(orient="values", force_ascii=False, date_format="iso")
+    columns = json.dumps([INDEX_HEADER] + [str(column) for column in df.columns], ensure_ascii=False)
+
+    # '</' would end the script element early
+    return f'{{"columns": {columns}, "rows": {rows}}}'.replace("</", "<\\/")
+
+
+def _render_sector_table (exposure: pd.DataFrame) -> str:
+    """Sector exposure as HTML table (numbers rounded to two decimals)."""
+    if exposure.empty:
+        return "<p>No sector data.</p>"
+
+    header = "".join(f"<th>{escape(str(column))}</th>" for column in [SECTOR_COLUMN] + list(exposure.columns))
+    body = "".join(
+        "<tr><td>" + escape(str(sector)) + "</td>"
+        + "".join(f'<td class="num">{_format_number(value)}</td>' for value in values)
+        + "</tr>"
+        for sector, values in zip(exposure.index, exposure.itertuples(index=False, name=None))
+    )
+    return f"<table><thead><tr>{header}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def _render_histogram (values: np.ndarray, label: str, bins: int) -> str:
+    """Inline SVG histogram of the non-missing *values*."""
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return HISTOGRAM_TEMPLATE.substitute(width=HISTOGRAM_WIDTH, height=HISTOGRAM_HEIGHT, label=escape(label), bars="",
+                                             count=0, mean="N/A", median="N/A", low="N/A", high="N/A")
+
+    counts, edges = np.histogram(values, bins=bins)
+    bar_width = HISTOGRAM_WIDTH / len(counts)
+    bar_heights = counts / counts.max() * (HISTOGRAM_HEIGHT - 2)
+
+    bars = "".join(
+        f'<rect x="{idx * bar_width:.1f}" y="{HISTOGRAM_HEIGHT - height:.1f}" width="{max(bar_width - 1, 1):.1f}" height="{height:.1f}">'
+        f"<title>{edges[idx]:.2f} .. {edges[idx + 1]:.2f}: {count}</title></rect>"
+        for idx, (count, height) in enumerate(zip(counts.tolist(), bar_heights.tolist()))
+    )
+
+    return HISTOGRAM_TEMPLATE.substitute(
+        width=HISTOGRAM_WIDTH,
+        height=HISTOGRAM_HEIGHT,
+        label=escape(label),
+        bars=bars,
+        count=values.size,
+        mean=_format_number(values.mean()),
+        median=_format_number(np.median(values)),
+        low=_format_number(edges[0]),
+        high=_format_number(edges[-1]),
+    )
+
+
+def _format_number (value) -> str:
+    """Number with two decimals, "N/A" for missing values."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "N/A"
+    return f"{value:,.2f}" if isinstance(value, (float, np.floating)) else str(value)
@@ -0,0 +1,440 @@
+# encoding: utf-8
+
+# Copyright (c) Ivan Antunović (ivantun05@gmail.com) - All rights reserved.
+# Unintended redistribution can be punishable by law.
+# By reading this message, you are automatically consenting to it
+# and you are accepting that the financial data might be incorrect.
+# The financial data generated by this script is for informational purposes only
+# and should not be considered as investment advice.
+# Use at your own risk.
+
+"""
+IncrementalScorer.py - z-scores on partial universe updates
+-------------------------------------------------------------------------------
+When only a handful of tickers receive new fundamentals (or a few tickers are
+added to / removed from `Tickers_and_Weights`), re-scoring the complete
+cross-section is wasted work. `IncrementalFactorScorer` keeps per-metric running
+sufficient statistics
+
+    count, mean, M2 = Σ(x - mean)²          (NaN-masked, per metric and per sector)
+
+so adding, removing or updating a ticker adjusts the means and standard
+deviations in O(changed x metrics) time. Z-scores can then be produced for the
+changed tickers only, or for the whole universe in one vectorised pass.
+
+The statistics are updated with Welford's algorithm (and its inverse for
+removals), which - unlike E[x²] - E[x]² - does not lose precision when the
+universe drifts away from its initial values. `rebuild_statistics()` recomputes
+them exactly (two-pass) from the stored values, e.g. after a long intraday
+session. `compare_with_full_rescore()` checks the incremental scores against a
+full `calc_factor_z_scores` of the same universe; `python IncrementalScorer.py`
+runs that check on a synthetic universe after a series of upserts and removals.
+
+Only the plain 'zscore' scoring mode has sufficient statistics; the robust modes
+(winsorized, mad, rank) and the median imputation depend on order statistics and
+need a full re-score via `ZScoreCalculator.calc_factor_z_scores`.
+"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+import sys
+import numpy as np
+
+from Stock import Stock
+from ZScoreCalculator import (
+    METRIC_REGISTRY,
+    FactorScoreMatrix,
+    assign_results,
+    calc_factor_z_scores,
+    calc_final_composite,
+    calc_weighted_composites,
+    get_attr_path,
+    nan_safe,
+    standardise_matrix,
+)
+
+
+
+# ---------------------------------------------------------------------------
+# constants
+# ---------------------------------------------------------------------------
+
+# Relative tolerance (to mean²) below which a running variance is treated as zero (no variation)
+VARIANCE_REL_TOLERANCE = 1e-12
+
+# Maximum deviation from a full re-score accepted by the self-check
+SELF_CHECK_TOLERANCE = 1e-9
+
+
+
+# ---------------------------------------------------------------------------
+# incremental scorer
+# ---------------------------------------------------------------------------
+
+class IncrementalFactorScorer:
+    """
+    Incrementally maintained z-scores and composites of a scored universe.
+
+    Typical usage:
+
+        scores = calc_factor_z_scores(stocks, config)
+        scorer = IncrementalFactorScorer(scores)
+
+        scorer.upsert(updated_stock)                  # new fundamentals or new ticker
+        scorer.remove("XYZ")                          # ticker dropped from the universe
+        scorer.assign(changed_stocks)                 # re-score only the changed tickers
+        full_scores = scorer.to_score_matrix()        # or re-score everything
+
+    Raises:
+        ValueError: If a factor block of *scores* uses a robust scoring mode or imputation.
+    """
+
+    def __init__ (self, scores: FactorScoreMatrix):
+
+        robust_modes = sorted({mode for mode in scores.modes if mode != "zscore"})
+        if robust_modes:
+            raise ValueError(f"Incremental scoring supports the 'zscore' mode only (configured: {robust_modes}).")
+
+        imputation = sorted({method for method in scores.imputation if method != "none"})
+        if imputation:
+            raise ValueError(f"Incremental scoring does not support imputation (configured: {imputation}).")
+
+        n_metrics, n_tickers = scores.raw.shape
+
+        # Metric definition (fixed)
+        self.factors: List[str] = list(scores.factors)
+        self.metric_factors: List[str] = list(scores.metric_factors)
+        self.metric_keys: List[str] = list(scores.metric_keys)
+        self.weights: np.ndarray = scores.weights.copy()
+        self.factor_weights: np.ndarray = scores.factor_weights if scores.factor_weights is not None else np.ones(len(self.factors))
+        self._specs = [METRIC_REGISTRY[factor][key] for factor, key in zip(self.metric_factors, self.metric_keys)]
+        self._direction = scores.direction.astype(float) if scores.direction is not None else np.ones(n_metrics)
+        self._min_group_size = scores.min_group_size if scores.min_group_size is not None else np.full(n_metrics, np.inf)
+        self._sector_neutral = bool(np.isfinite(self._min_group_size).any())
+
+        # Column storage (direction adjusted values); removed tickers leave a free column.
+        # Running sums need float64 precision, also when *scores* was built in compact (float32) mode.
+        self._values: np.ndarray = scores.raw.astype(float) * self._direction[:, None]
+        self._slot_tickers: List[Optional[str]] = list(scores.tickers)
+        self._columns: Dict[str, int] = {ticker: col for col, ticker in enumerate(scores.tickers)}
+        self._free_columns: List[int] = []
+
+        # Sector codes
+        sector_codes = scores.sector_codes if scores.sector_codes is not None else np.full(n_tickers, -1)
+        self._sector_codes: np.ndarray = np.asarray(sector_codes, dtype=np.int64).copy()
+        self._sector_names: List[str] = list(scores.sector_names)
+        self._sector_lookup: Dict[str, int] = {name: code for code, name in enumerate(self._sector_names)}
+
+        # Running statistics (count, mean, M2) of every metric and every (metric, sector)
+        self.rebuild_statistics()
+
+
+    # ---------------------------------------------------------------------
+    # universe updates - O(changed x metrics)
+    # ---------------------------------------------------------------------
+
+    @property
+    def tickers (self) -> List[str]:
+        """Tickers currently in the universe (column order)."""
+        return [ticker for ticker in self._slot_tickers if ticker is not None]
+
+
+    def upsert (self, stock: Stock) -> None:
+        """Add a new ticker or replace the metrics (and sector) of an existing one."""
+        values = np.array([nan_safe(get_attr_path(stock, spec.attr_path)) for spec in self._specs], dtype=float) * self._direction
+        sector_code = self._get_sector_code(getattr(stock, "sector", None))
+
+        col = self._columns.get(stock.ticker)
+        if col is None:
+            col = self._allocate_column(stock.ticker)
+        else:
+            # Retract the old values from the running statistics
+            self._update(self._values[:, col], self._sector_codes[col], -1.0)
+
+        self._values[:, col] = values
+        self._sector_codes[col] = sector_code
+        self._update(values, sector_code, 1.0)
+
+
+    def remove (self, ticker: str) -> None:
+        """Remove a ticker from the universe (unknown tickers are ignored)."""
+        col = self._columns.pop(ticker, None)
+        if col is None:
+            return
+
+        self._update(self._values[:, col], self._sector_codes[col], -1.0)
+
+        self._values[:, col] = np.nan
+        self._sector_codes[col] = -1
+        self._slot_tickers[col] = None
+        self._free_columns.append(col)
+
+
+    def rebuild_statistics (self) -> None:
+        """Recompute the running statistics exactly (two-pass) from the stored values - O(metrics x tickers)."""
+        n_metrics = self._values.shape[0]
+        n_groups = len(self._sector_names)
+        mask = ~np.isnan(self._values)
+
+        self._count = mask.sum(axis=1).astype(float)
+        self._mean = np.divide(np.where(mask, self._values, 0.0).sum(axis=1), self._count, out=np.zeros(n_metrics), where=self._count > 0)
+        self._m2 = (np.where(mask, self._values - self._mean[:, None], 0.0) ** 2).sum(axis=1)
+
+        self._g_count = np.zeros((n_metrics, n_groups))
+        self._g_mean = np.zeros((n_metrics, n_groups))
+        self._g_m2 = np.zeros((n_metrics, n_groups))
+
+        if n_groups and self._values.size:
+            rows, cols = np.nonzero(mask & (self._sector_codes >= 0)[None, :])
+            bins = rows * n_groups + self._sector_codes[cols]
+            values = self._values[rows, cols]
+            size = n_metrics * n_groups
+
+            g_count = np.bincount(bins, minlength=size).astype(float)
+            g_mean = np.divide(np.bincount(bins, weights=values, minlength=size), g_count, out=np.zeros(size), where=g_count > 0)
+            g_m2 = np.bincount(bins, weights=(values - g_mean[bins]) ** 2, minlength=size)
+
+            self._g_count = g_count.reshape(n_metrics, n_groups)
+            self._g_mean = g_mean.reshape(n_metrics, n_groups)
+            self._g_m2 = g_m2.reshape(n_metrics, n_groups)
+
+
+    # ---------------------------------------------------------------------
+    # scoring
+    # ---------------------------------------------------------------------
+
+    def to_score_matrix (self, tickers: Optional[List[str]] = None) -> FactorScoreMatrix:
+        """
+        Z-scores and composites from the current running statistics.
+
+        Parameters:
+            tickers (List[str]): Tickers to score (default: the whole universe).
+                                 Scoring only the changed tickers costs O(changed x metrics).
+
+        Returns:
+            FactorScoreMatrix: Matrices of the requested tickers, in the requested order.
+        """
+        if tickers is None:
+            tickers = self.tickers
+        cols = np.array([self._columns[ticker] for ticker in tickers], dtype=np.int64)
+
+        values = self._values[:, cols]
+        sector_codes = self._sector_codes[cols]
+
+        zscores = standardise_matrix(
+            values,
+            self._row_stats(),
+            sector_codes if self._sector_neutral else None,
+            self._group_stats() if self._sector_neutral else None,
+            self._min_group_size
+        )
+
+        composites = calc_weighted_composites(zscores, self.weights)
+
+        return FactorScoreMatrix(
+            tickers=list(tickers),
+            factors=list(self.factors),
+            metric_factors=list(self.metric_factors),
+            metric_keys=list(self.metric_keys),
+            raw=values * self._direction[:, None],
+            zscores=zscores,
+            weights=self.weights,
+            composites=composites,
+            sector_codes=sector_codes,
+            sector_names=list(self._sector_names),
+            direction=self._direction,
+            modes=["zscore"] * len(self.metric_keys),
+            min_group_size=self._min_group_size,
+            factor_weights=self.factor_weights,
+            final_composite=calc_final_composite(composites, self.factor_weights),
+        )
+
+
+    def assign (self, stocks: List[Stock]) -> FactorScoreMatrix:
+        """Re-score *stocks* with the current statistics and write the results back to them."""
+        scores = self.to_score_matrix([stock.ticker for stock in stocks])
+        assign_results(stocks, scores)
+        return scores
+
+
+    # ---------------------------------------------------------------------
+    # internal helpers
+    # ---------------------------------------------------------------------
+
+    def _update (self, values: np.ndarray, sector_code: int, sign: float) -> None:
+        """Add (sign=+1) or retract (sign=-1) one ticker column to / from the running statistics."""
+        self._count, self._mean, self._m2 = self._welford(self._count, self._mean, self._m2, values, sign)
+
+        if sector_code >= 0:
+            (self._g_count[:, sector_code],
+             self._g_mean[:, sector_code],
+             self._g_m2[:, sector_code]) = self._welford(
+                self._g_count[:, sector_code], self._g_mean[:, sector_code], self._g_m2[:, sector_code], values, sign
+            )
+
+
+    @staticmethod
+    def _welford (count: np.ndarray, mean: np.ndarray, m2: np.ndarray, values: np.ndarray, sign: float):
+        """
+        Welford update of (count, mean, M2) with one value per metric (NaN = no value).
+
+            add:     n' = n + 1,  mean' = mean + (x - mean) / n',  M2' = M2 + (x - mean)(x - mean')
+            retract: n' = n - 1,  mean' = mean - (x - mean) / n',  M2' = M2 - (x - mean)(x - mean')
+        """
+        valid = ~np.isnan(values)
+        new_count = count + sign * valid
+
+        delta = np.where(valid, values - mean, 0.0)
+        new_mean = mean + np.divide(sign * delta, new_count, out=np.zeros_like(mean), where=new_count > 0)
+        new_m2 = m2 + sign * delta * np.where(valid, values - new_mean, 0.0)
+
+        # An emptied statistic starts from scratch; M2 cannot become negative (rounding on retraction)
+        empty = new_count <= 0
+        return new_count, np.where(empty, 0.0, new_mean), np.where(empty, 0.0, np.maximum(new_m2, 0.0))
+
+
+    def _allocate_column (self, ticker: str) -> int:
+        """Column for a new ticker: re-use a free column or grow the storage (amortised O(1))."""
+        if not self._free_columns:
+            capacity = self._values.shape[1]
+            grow_by = max(capacity, 16)
+            self._values = np.concatenate([self._values, np.full((self._values.shape[0], grow_by), np.nan)], axis=1)
+            self._sector_codes = np.concatenate([self._sector_codes, np.full(grow_by, -1, dtype=np.int64)])
+            self._slot_tickers.extend([None] * grow_by)
+            self._free_columns.extend(range(capacity + grow_by - 1, capacity - 1, -1))
+
+        col = self._free_columns.pop()
+        self._columns[ticker] = col
+        self._slot_tickers[col] = ticker
+        return col
+
+
+    def _get_sector_code (self, sector: Optional[str]) -> int:
+        """Integer code of a sector, registering new sectors on the fly (-1 = unknown)."""
+        if sector is None or sector in ("", "N/A"):
+            return -1
+
+        code = self._sector_lookup.get(sector)
+        if code is None:
+            code = len(self._sector_names)
+            self._sector_lookup[sector] = code
+            self._sector_names.append(sector)
+
+            new_column = np.zeros((self._g_count.shape[0], 1))
+            self._g_count = np.hstack([self._g_count, new_column])
+            self._g_mean = np.hstack([self._g_mean, new_column])
+            self._g_m2 = np.hstack([self._g_m2, new_column])
+        return code
+
+
+    def _row_stats (self):
+        """Universe count, mean and population std of every metric from the running statistics."""
+        return self._moments(self._count, self._mean, self._m2)
+
+
+    def _group_stats (self):
+        """(M x G) count, mean and population std of every (metric, sector) from the running statistics."""
+        return self._moments(self._g_count, self._g_mean, self._g_m2)
+
+
+    @staticmethod
+    def _moments (count: np.ndarray, mean: np.ndarray, m2: np.ndarray):
+        """Convert running (count, mean, M2) to count, mean and population std."""
+        variance = np.divide(m2, count, out=np.full(count.shape, np.nan), where=count > 0)
+
+        # Variances within rounding noise of the mean (e.g. all values equal after a retraction) are zero
+        variance[variance <= VARIANCE_REL_TOLERANCE * mean ** 2] = 0.0
+        stand_dev = np.sqrt(variance)
+
+        return np.rint(count).astype(np.int64), np.where(count > 0, mean, np.nan), stand_dev
+
+
+
+# ---------------------------------------------------------------------------
+# consistency check
+# ---------------------------------------------------------------------------
+
+def compare_with_full_rescore (scorer: IncrementalFactorScorer, stocks: List[Stock], config: dict) -> float:
+    """
+    Largest absolute difference between the incremental scores and a full re-score.
+
+    *stocks* must be the current universe of *scorer*. The full re-score
+    (`calc_factor_z_scores` of the scorer's factor blocks) writes its results
+    to *stocks*. Z-scores, factor composites and the final composite are
+    compared; a value missing on one side only counts as an infinite difference.
+
+    Returns:
+        float: Maximum absolute difference (0.0 = identical).
+    """
+    full = calc_factor_z_scores(stocks, config, scorer.factors)
+    incremental = scorer.to_score_matrix(full.tickers)
+
+    max_difference = 0.0
+    for full_values, incremental_values in (
+        (full.zscores, incremental.zscores),
+        (full.composites, incremental.composites),
+        (full.final_composite, incremental.final_composite),
+    ):
+        full_values, incremental_values = np.asarray(full_values, dtype=float), np.asarray(incremental_values, dtype=float)
+        if not np.array_equal(np.isnan(full_values), np.isnan(incremental_values)):
+            return np.inf
+        if full_values.size:
+            max_difference = max(max_difference, float(np.nanmax(np.abs(full_values - incremental_values), initial=0.0)))
+
+    return max_difference
+
+
+def _synthetic_stock (ticker: str, rng: np.random.Generator, sectors: List[str]) -> SimpleNamespace:
+    """Stock stand-in with random value / profitability metrics (about 10 % missing)."""
+    def metric (loc: float, scale: float) -> Optional[float]:
+        return None if rng.random() < 0.1 else float(rng.normal(loc, scale))
+
+    return SimpleNamespace(
+        ticker=ticker,
+        sector=sectors[rng.integers(len(sectors))],
+        industry=None,
+        value_metrics=SimpleNamespace(pe_trailing=metric(20, 8), pe_forward=metric(18, 6), ebit_to_tev=metric(0.08, 0.04), pb_ratio=metric(3, 1.5)),
+        profitability_metrics=SimpleNamespace(gpoa=metric(0.3, 0.1), roe=metric(0.15, 0.08), roa=metric(0.07, 0.04), cfoa=metric(0.1, 0.05), gpmar=metric(0.4, 0.15)),
+    )
+
+
+def _self_check (n_tickers: int = 500, n_updates: int = 2000, seed: int = 7) -> float:
+    """Score a synthetic universe, apply random upserts / removals and compare with a full re-score."""
+    rng = np.random.default_rng(seed)
+    config = {
+        "ValueFactor": {"z_score_metrics": {"pe_trailing": 1, "pe_forward": 1, "ebit_to_tev": 2, "pb_ratio": 1},
+                        "sector_neutral": True, "min_sector_size": 5, "total_weight": 1},
+        "ProfitabilityFactor": {"z_score_metrics": {"gross_profit_assets": 1, "roe": 1, "roa": 1, "cfoa": 1, "gpmar": 1},
+                                "total_weight": 1},
+    }
+    sectors = ["Technology", "Healthcare", "Energy", "Utilities"]
+
+    universe = {f"T{i}": _synthetic_stock(f"T{i}", rng, sectors) for i in range(n_tickers)}
+    scorer = IncrementalFactorScorer(calc_factor_z_scores(list(universe.values()), config))
+
+    next_ticker = n_tickers
+    for _ in range(n_updates):
+        action = rng.random()
+        if action < 0.25 and len(universe) > 10:
+            ticker = list(universe)[rng.integers(len(universe))]
+            del universe[ticker]
+            scorer.remove(ticker)
+        else:
+            if action < 0.5:
+                ticker, next_ticker = f"T{next_ticker}", next_ticker + 1
+                sectors_now = sectors + ["Materials"]         # new sectors appear on the fly
+            else:
+                ticker = list(universe)[rng.integers(len(universe))]
+                sectors_now = sectors
+            universe[ticker] = _synthetic_stock(ticker, rng, sectors_now)
+            scorer.upsert(universe[ticker])
+
+    return compare_with_full_rescore(scorer, list(universe.values()), config)
+
+
+if __name__ == "__main__":
+    max_difference = _self_check()
+    print(f"Incremental vs. full re-score: max. absolute difference {max_difference:.3e}")
+    sys.exit(0 if max_difference <= SELF_CHECK_TOLERANCE else 1)
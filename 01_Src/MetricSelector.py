@@ -14,7 +14,16 @@ Encapsulates logic for selecting the most appropriate metric value
 from multiple sources for each metric category.
 """
 
-def select_roe (roe):
+# Source labels returned by the *_with_source selectors (priority order per metric)
+SOURCE_TTM_YF = "ttm (yFinance)"
+SOURCE_TTM_CALC = "ttm (calc)"
+SOURCE_TTM = "ttm"
+SOURCE_ANNUAL = "annual"
+SOURCE_MSCI = "MSCI"
+
+
+
+def select_roe_with_source (roe):
     """
     Selects the most appropriate ROE value from the available sources.
 
@@ -22,26 +31,40 @@ def select_roe (roe):
         roe (object): An object containing various ROE values from different sources.
 
     Returns:
-        float or None: The selected ROE value based on the priority of sources.
+        tuple: (selected ROE value or None, source label or None)
     """
     # ROE TTM from Yahoo Finance
     if roe.ttm_yf is not None:
-        return roe.ttm_yf
+        return roe.ttm_yf, SOURCE_TTM_YF
     # ROE TTM calculcated
     elif roe.ttm_calc is not None:
-        return roe.ttm_calc
+        return roe.ttm_calc, SOURCE_TTM_CALC
     # ROE annual list is not None and has at least one value
     elif roe.annual_list is not None and len (roe.annual_list) > 0:
-        return roe.annual_list[0]
+        return roe.annual_list[0], SOURCE_ANNUAL
     # ROE MSCI
     elif roe.msci is not None:
-        return roe.msci
+        return roe.msci, SOURCE_MSCI
     else:
-        return None
+        return None, None
 
 
 
-def select_roa (roa):
+def select_roe (roe):
+    """
+    Selects the most appropriate ROE value from the available sources.
+
+    Parameters:
+        roe (object): An object containing various ROE values from different sources.
+
+    Returns:
+        float or None: The selected ROE value based on the priority of sources.
+    """
+    return select_roe_with_source (roe)[0]
+
+
+
+def select_roa_with_source (roa):
     """
     Selects the most appropriate ROA value from the available sources.
 
@@ -49,19 +72,61 @@ def select_roa (roa):
         roa (object): An object containing various ROA values from different sources.
 
     Returns:
-        float or None: The selected ROA value based on the priority of sources.
+        tuple: (selected ROA value or None, source label or None)
     """
     # ROA TTM from Yahoo Finance
     if roa.ttm_yf is not None:
-        return roa.ttm_yf
+        return roa.ttm_yf, SOURCE_TTM_YF
     # ROA TTM calculated
     elif roa.ttm_calc is not None:
-        return roa.ttm_calc
+        return roa.ttm_calc, SOURCE_TTM_CALC
     # ROA annual list is not None and has at least one value
     elif roa.annual_list is not None and len (roa.annual_list) > 0:
-        return roa.annual_list[0]
+        return roa.annual_list[0], SOURCE_ANNUAL
     else:
-        return None
+        return None, None
+
+
+
+def select_roa (roa):
+    """
+    Selects the most appropriate ROA value from the available sources.
+
+    Parameters:
+        roa (object): An object containing various ROA values from different sources.
+
+    Returns:
+        float or None: The selected ROA value based on the priority of sources.
+    """
+    return select_roa_with_source (roa)[0]
+
+
+
+def _select_ttm_or_annual (ttm, annual_list):
+    """TTM value if available, else the latest annual value - (value, source label)."""
+    # TTM
+    if ttm is not None:
+        return ttm, SOURCE_TTM
+    # Annual list is not None and has at least one value
+    elif annual_list is not None and len (annual_list) > 0:
+        return annual_list[0], SOURCE_ANNUAL
+    else:
+        return None, None
+
+
+
+def select_cfoa_with_source (cfoa_ttm, cfoa_annual_list):
+    """
+    Selects the most appropriate CFOA value from the available sources.
+
+    Parameters:
+        cfoa_ttm (float): CFOA TTM value.
+        cfoa_annual_list (list): List of CFOA annual values.
+
+    Returns:
+        tuple: (selected CFOA value or None, source label or None)
+    """
+    return _select_ttm_or_annual (cfoa_ttm, cfoa_annual_list)
 
 
 
@@ -76,14 +141,22 @@ def select_cfoa (cfoa_ttm, cfoa_annual_list):
     Returns:
         float or None: The selected CFOA value based on the priority of sources.
     """
-    # CFOA TTM
-    if cfoa_ttm is not None:
-        return cfoa_ttm
-    # CFOA annual list is not None and has at least one value
-    elif cfoa_annual_list is not None and len (cfoa_annual_list) > 0:
-        return cfoa_annual_list[0]
-    else:
-        return None
+    return select_cfoa_with_source (cfoa_ttm, cfoa_annual_list)[0]
+
+
+
+def select_gpoa_with_source (gpoa_ttm, gpoa_annual_list):
+    """
+    Selects the most appropriate GPOA value from the available sources.
+
+    Parameters:
+        gpoa_ttm (float): GPOA TTM value.
+        gpoa_annual_list (list): List of GPOA annual values.
+
+    Returns:
+        tuple: (selected GPOA value or None, source label or None)
+    """
+    return _select_ttm_or_annual (gpoa_ttm, gpoa_annual_list)
 
 
 
@@ -98,14 +171,22 @@ def select_gpoa (gpoa_ttm, gpoa_annual_list):
     Returns:
         float or None: The selected GPOA value based on the priority of sources.
     """
-    # GPOA TTM
-    if gpoa_ttm is not None:
-        return gpoa_ttm
-    # GPOA annual list is not None and has at least one value
-    elif gpoa_annual_list is not None and len (gpoa_annual_list) > 0:
-        return gpoa_annual_list[0]
-    else:
-        return None
+    return select_gpoa_with_source (gpoa_ttm, gpoa_annual_list)[0]
+
+
+
+def select_gpmar_with_source (gpmar_ttm, gpmar_annual_list):
+    """
+    Selects the most appropriate GPMAR value from the available sources.
+
+    Parameters:
+        gpmar_ttm (float): GPMAR TTM value.
+        gpmar_annual_list (list): List of GPMAR annual values.
+
+    Returns:
+        tuple: (selected GPMAR value or None, source label or None)
+    """
+    return _select_ttm_or_annual (gpmar_ttm, gpmar_annual_list)
 
 
 
@@ -120,11 +201,4 @@ def select_gpmar (gpmar_ttm, gpmar_annual_list):
     Returns:
         float or None: The selected GPMAR value based on the priority of sources.
     """
-    # GPMAR TTM
-    if gpmar_ttm is not None:
-        return gpmar_ttm
-    # GPMAR annual list is not None and has at least one value
-    elif gpmar_annual_list is not None and len (gpmar_annual_list) > 0:
-        return gpmar_annual_list[0]
-    else:
-        return None
\ No newline at end of file
+    return select_gpmar_with_source (gpmar_ttm, gpmar_annual_list)[0]
@@ -0,0 +1,192 @@
+# encoding: utf-8
+
+# Copyright (c) Ivan Antunović (ivantun05@gmail.com) - All rights reserved.
+# Unintended redistribution can be punishable by law.
+# By reading this message, you are automatically consenting to it
+# and you are accepting that the financial data might be incorrect.
+# The financial data generated by this script is for informational purposes only
+# and should not be considered as investment advice.
+# Use at your own risk.
+
+"""
+OutputWriter.py - output file naming and atomic, concurrent file writing
+-------------------------------------------------------------------------------
+    • generate_output_name(base_name)       'gen/<date>_<base>[_<n>].xlsx' (os.path, any OS)
+    • atomic_write(file_name, write_fn)     write to a temporary file, then rename
+    • write_outputs(writers)                several files concurrently, each atomically
+
+Every file is written to a temporary file in the target directory and moved
+into place with `os.replace`, so a crashed or interrupted run never leaves a
+half-written output behind and readers never see a partial file.
+
+`write_outputs` starts all writers at the same time (Excel plus the optional
+CSV / JSON copies of the same in-memory result table), so the output stage
+takes about as long as the slowest writer instead of the sum of all writers.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import os
+import re
+import stat
+import tempfile
+import pandas as pd
+
+
+
+# ---------------------------------------------------------------------------
+# constants
+# ---------------------------------------------------------------------------
+
+GEN_DIR_NAME = "gen"
+EXCEL_EXTENSION = ".xlsx"
+
+# Optional copies of the result table ('Output_Copies' in ScreenerConfig.json) and their extension
+OUTPUT_COPY_FORMATS: Dict[str, str] = {
+    "csv": ".csv",
+    "json": ".json",
+}
+
+INDEX_LABEL = "Ticker"
+
+# Mode of a new output file (0o666 minus the umask). The umask can only be read by setting it,
+# so it is read once at import - never while the `write_outputs` threads create files
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_DEFAULT_FILE_MODE = 0o666 & ~_UMASK
+
+
+
+# ---------------------------------------------------------------------------
+# public API
+# ---------------------------------------------------------------------------
+
+def generate_output_name (base_name: str, directory: str = GEN_DIR_NAME, extension: str = EXCEL_EXTENSION,
+                          date: Optional[datetime] = None) -> str:
+    """
+    Next free output file name '<directory>/<YYYY-MM-DD>_<base_name>[_<n>]<extension>'.
+
+    The directory is created if needed. Existing runs of the day are found with
+    one directory listing; the new name gets the next counter after the highest
+    one in use.
+
+    Parameters:
+        base_name (str): Base file name ('Output_Excel_Filename').
+        directory (str): Output directory, relative to the working directory.
+        extension (str): File extension including the dot.
+        date (datetime): Date of the run (default: today).
+
+    Returns:
+        str: Output file name.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    stem = f"{(date or datetime.now()).strftime('%Y-%m-%d')}_{base_name}"
+    pattern = re.compile(rf"^{re.escape(stem)}(?:_(\d+))?{re.escape(extension)}$")
+
+    counters = [
+        int(match.group(1) or 0)
+        for match in map(pattern.match, os.listdir(directory))
+        if match
+    ]
+
+    suffix = f"_{max(counters) + 1}" if counters else ""
+    return os.path.join(directory, f"{stem}{suffix}{extension}")
+
+
+@contextmanager
+def atomic_output (file_name: str) -> Iterator[str]:
+    """
+    Context manager yielding a temporary path next to *file_name*.
+
+    On success the temporary file replaces *file_name* in one `os.replace`; on
+    error it is removed and *file_name* is left untouched. The output gets the
+    mode of an existing *file_name*, otherwise the umask default of a new file
+    (mkstemp itself creates owner-only files).
+    """
+    directory, base_name = os.path.split(os.path.abspath(file_name))
+    extension = os.path.splitext(base_name)[1]
+
+    # Same directory as the target (rename within one file system), same extension (writers may check it)
+    file_descriptor, temp_name = tempfile.mkstemp(prefix=f".{base_name}.", suffix=f".tmp{extension}", dir=directory)
+    os.close(file_descriptor)
+
+    try:
+        yield temp_name
+        os.chmod(temp_name, _output_mode(file_name))
+        os.replace(temp_name, file_name)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+
+def atomic_write (file_name: str, write_fn: Callable[[str], Any]) -> str:
+    """Call `write_fn(path)` on a temporary file and move the result to *file_name*."""
+    with atomic_output(file_name) as temp_name:
+        write_fn(temp_name)
+    return file_name
+
+
+def write_outputs (writers: Dict[str, Callable[[str], Any]], max_workers: Optional[int] = None) -> List[str]:
+    """
+    Write several files concurrently, each one atomically.
+
+    Parameters:
+        writers (Dict[str, Callable]): Target file name -> function writing the file to a given path.
+        max_workers (int): Number of writer threads (default: one per file).
+
+    Returns:
+        List[str]: The file names, in the order of *writers*.
+
+    Raises:
+        Exception: The first error of a writer (after all writers have finished).
+    """
+    if len(writers) <= 1:
+        return [atomic_write(file_name, write_fn) for file_name, write_fn in writers.items()]
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(writers)) as executor:
+        futures = [executor.submit(atomic_write, file_name, write_fn) for file_name, write_fn in writers.items()]
+
+    return [future.result() for future in futures]
+
+
+def copy_writers (results_df: pd.DataFrame, base_name: str, formats: List[str]) -> Dict[str, Callable[[str], Any]]:
+    """
+    Writers of the optional CSV / JSON copies of the result table (raw numbers, index = ticker).
+
+    Raises:
+        ValueError: If a format is unknown.
+    """
+    writers: Dict[str, Callable[[str], Any]] = {}
+
+    for file_format in formats:
+        if file_format not in OUTPUT_COPY_FORMATS:
+            raise ValueError(f"Unknown output copy format '{file_format}'. Options: {list(OUTPUT_COPY_FORMATS)}")
+
+        file_name = f"{base_name}{OUTPUT_COPY_FORMATS[file_format]}"
+        if file_format == "csv":
+            writers[file_name] = lambda path: results_df.to_csv(path, index_label=INDEX_LABEL, encoding="utf-8")
+        else:
+            writers[file_name] = lambda path: results_df.rename_axis(INDEX_LABEL).reset_index().to_json(
+                path, orient="records", force_ascii=False, indent=1
+            )
+
+    return writers
+
+
+
+# ---------------------------------------------------------------------------
+# internal helpers
+# ---------------------------------------------------------------------------
+
+def _output_mode (file_name: str) -> int:
+    """Permission bits of an output file: those of the existing file, else 0o666 minus the umask."""
+    try:
+        return stat.S_IMODE(os.stat(file_name).st_mode)
+    except FileNotFoundError:
+        return _DEFAULT_FILE_MODE
@@ -0,0 +1,295 @@
+# encoding: utf-8
+
+# Copyright (c) Ivan Antunović (ivantun05@gmail.com) - All rights reserved.
+# Unintended redistribution can be punishable by law.
+# By reading this message, you are automatically consenting to it
+# and you are accepting that the financial data might be incorrect.
+# The financial data generated by this script is for informational purposes only
+# and should not be considered as investment advice.
+# Use at your own risk.
+
+"""
+PortfolioSelector.py - turn composite scores into a target portfolio
+-------------------------------------------------------------------------------
+Selects the top-k tickers by composite score and assigns target weights which
+can be compared with the 'Original Weight' of the ETF / index.
+
+    • select_top_k(composites, sector_codes, top_k, max_per_sector)
+    • cap_sector_weights(target_weights, sector_codes, max_sector_weight)
+    • build_portfolio(scores, portfolio_cfg, config)
+
+Diversification is the only free lunch in investing: if the `use_sector_cap`
+flag of the ranking factor block is set, no sector may hold more than
+`max_sector_weight` of the selected names, nor more than `max_sector_weight`
+of the target weight. The name cap alone is not enough for 'rank' weighting,
+where the best names of one sector can carry much more weight than their
+count suggests.
+
+The selection uses a partial selection (argpartition) instead of a full sort
+and enforces the sector caps with a vectorised greedy fill, so it runs in
+milliseconds even for 10,000-name universes and can be used inside scenario
+sweeps.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+import logging
+import math
+import numpy as np
+import pandas as pd
+
+from ZScoreCalculator import FactorScoreMatrix
+
+
+
+# ---------------------------------------------------------------------------
+# constants
+# ---------------------------------------------------------------------------
+
+# Target weighting schemes of the selected names
+#   - equal: every selected name gets the same weight
+#   - rank:  weights decrease linearly with the rank (best name = k, worst = 1)
+WEIGHTING_SCHEMES = ("equal", "rank")
+
+# 'rank_by' value selecting the final cross-factor composite instead of a single factor block
+FINAL_COMPOSITE = "Final"
+
+DEFAULT_TOP_K = 30
+DEFAULT_MAX_SECTOR_WEIGHT = 0.25
+
+
+
+# ---------------------------------------------------------------------------
+# dataclasses
+# ---------------------------------------------------------------------------
+
+@dataclass
+class PortfolioSelection:
+    """Selected tickers (best first) and their target weights in percent."""
+
+    tickers: List[str]
+    sectors: List[str]
+    composites: np.ndarray          # Composite score of every selected ticker
+    target_weights: np.ndarray      # Target weight of every selected ticker (%), sums to 100 (less if the sector cap cannot be met)
+
+    @property
+    def unallocated_weight (self) -> float:
+        """Weight (%) left unallocated (cash) because the sector cap could not be met, normally 0."""
+        return max(0.0, 100.0 - float(self.target_weights.sum())) if self.target_weights.size else 0.0
+
+    def sector_exposure (self) -> pd.Series:
+        """Target weight (%) per sector, largest first."""
+        exposure = pd.Series(self.target_weights, index=self.sectors).groupby(level=0).sum()
+        return exposure.sort_values(ascending=False)
+
+
+
+# ---------------------------------------------------------------------------
+# public API
+# ---------------------------------------------------------------------------
+
+def select_top_k (composites: np.ndarray, sector_codes: Optional[np.ndarray], top_k: int, max_per_sector: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of the top-k composites (best first), optionally with a cap of names per sector.
+
+    Only a candidate pool of the best names is partially selected (argpartition)
+    and sorted. The sector cap is applied as a vectorised greedy fill: walking
+    down the candidates by score, a name is kept while its sector has fewer than
+    *max_per_sector* kept names - computed for all candidates at once via the
+    within-sector running count. If the caps leave fewer than k names, the pool
+    is doubled and the fill repeated.
+
+    Tickers without a composite (NaN) are never selected. Tickers without a
+    sector (code -1) form one common 'unknown' sector.
+
+    Parameters:
+        composites (np.ndarray): Composite score per ticker.
+        sector_codes (np.ndarray): Integer sector code per ticker (see `ZScoreCalculator.encode_groups`).
+        top_k (int): Number of names to select.
+        max_per_sector (int): Maximum number of names per sector (None = no cap).
+
+    Returns:
+        np.ndarray: Indices of the selected tickers, best first.
+    """
+    composites = np.asarray(composites, dtype=float)
+    n_tickers = composites.shape[0]
+
+    valid = ~np.isnan(composites)
+    top_k = min(top_k, int(valid.sum()))
+    if top_k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    # Sort key: best composite first, missing composites last
+    sort_keys = np.where(valid, -composites, np.inf)
+
+    if sector_codes is not None and max_per_sector is not None:
+        sector_codes = np.asarray(sector_codes, dtype=np.int64)
+        # Unknown sector (-1) becomes its own group after all known sectors
+        group_codes = np.where(sector_codes >= 0, sector_codes, sector_codes.max(initial=-1) + 1)
+    else:
+        group_codes = None
+
+    pool_size = top_k
+    while True:
+
+        # Partial selection of the candidate pool, then sort only the pool
+        if pool_size < n_tickers:
+            candidates = np.argpartition(sort_keys, pool_size - 1)[:pool_size]
+        else:
+            candidates = np.arange(n_tickers)
+        candidates = candidates[np.argsort(sort_keys[candidates], kind="stable")]
+        candidates = candidates[valid[candidates]]
+
+        if group_codes is None:
+            return candidates[:top_k]
+
+        # Within-sector running count of every candidate (0 = best name of its sector)
+        candidate_groups = group_codes[candidates]
+        by_group = np.argsort(candidate_groups, kind="stable")          # keeps the score order inside a sector
+        sorted_groups = candidate_groups[by_group]
+        group_start = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+        group_sizes = np.diff(np.r_[group_start, sorted_groups.size])
+
+        running_count = np.empty(candidates.size, dtype=np.int64)
+        running_count[by_group] = np.arange(sorted_groups.size) - np.repeat(group_start, group_sizes)
+
+        selected = candidates[running_count < max_per_sector]
+
+        if selected.size >= top_k or pool_size >= n_tickers:
+            return selected[:top_k]
+
+        pool_size = min(2 * pool_size, n_tickers)
+
+
+def calc_target_weights (n_selected: int, weighting: str = "equal") -> np.ndarray:
+    """
+    Target weights (%) of *n_selected* names ordered best first.
+
+    Raises:
+        ValueError: If the weighting scheme is unknown.
+    """
+    if weighting == "equal":
+        raw_weights = np.ones(n_selected)
+    elif weighting == "rank":
+        raw_weights = np.arange(n_selected, 0, -1, dtype=float)
+    else:
+        raise ValueError(f"Unknown weighting scheme '{weighting}'. Options: {WEIGHTING_SCHEMES}")
+
+    return raw_weights / raw_weights.sum() * 100.0 if n_selected else raw_weights
+
+
+def cap_sector_weights (target_weights: np.ndarray, sector_codes: np.ndarray, max_sector_weight: float) -> np.ndarray:
+    """
+    Limit the target weight (%) of every sector to *max_sector_weight* (fraction).
+
+    Sectors above the cap are scaled down to it and the excess is spread over the
+    uncapped sectors in proportion to their weights, repeated until no sector is
+    above the cap. The order of the weights inside a sector is kept.
+
+    Infeasible cap: if the selected sectors cannot hold 100 % under the cap
+    (number of sectors * *max_sector_weight* < 1, e.g. 3 sectors at 25 %),
+    every sector is set to the cap, the shortfall is left unallocated (the
+    returned weights sum to less than 100) and a warning is logged.
+
+    Parameters:
+        target_weights (np.ndarray): Target weights (%) of the selected names, sum 100.
+        sector_codes (np.ndarray): Integer sector code per selected name (-1 = unknown, one common sector).
+        max_sector_weight (float): Maximum weight per sector as a fraction (0.25 = 25 %).
+
+    Returns:
+        np.ndarray: Capped target weights (%), sum 100 (less if the cap is infeasible).
+    """
+    weights = np.asarray(target_weights, dtype=float).copy()
+    if weights.size == 0:
+        return weights
+
+    _, groups = np.unique(np.asarray(sector_codes, dtype=np.int64), return_inverse=True)
+    n_groups = groups.max() + 1
+    cap = max_sector_weight * 100.0
+    total = weights.sum()
+
+    # Infeasible: every sector at the cap, the rest stays unallocated
+    if n_groups * cap < total:
+        exposure = np.bincount(groups, weights=weights, minlength=n_groups)
+        weights *= (cap / exposure)[groups]
+        logging.warning(f"Portfolio: {n_groups} sectors cannot hold 100 % with a sector cap of {cap:g} % - {total - weights.sum():.1f} % left unallocated.")
+        return weights
+
+    capped = np.zeros(n_groups, dtype=bool)
+    for _ in range(n_groups):
+        exposure = np.bincount(groups, weights=weights, minlength=n_groups)
+        over = exposure > cap * (1 + 1e-9)
+        if not over.any():
+            break
+
+        # Scale the sectors above the cap down to it ...
+        capped |= over
+        weights *= np.where(over, cap / np.where(over, exposure, 1.0), 1.0)[groups]
+
+        # ... and spread the excess over the uncapped sectors
+        free = ~capped[groups]
+        free_weight = weights[free].sum()
+        if free_weight <= 0:
+            break
+        weights[free] += (total - weights.sum()) * weights[free] / free_weight
+
+    return weights
+
+
+def build_portfolio (scores: FactorScoreMatrix, portfolio_cfg: dict, config: dict) -> PortfolioSelection:
+    """
+    Build the target portfolio described by the `Portfolio` configuration block.
+
+    The tickers are ranked by the composite of the `rank_by` factor block, or by
+    the final cross-factor composite if `rank_by` is 'Final'. The sector cap
+    (names and weight per sector) is enforced when the ranking factor block has
+    `use_sector_cap` enabled (for 'Final': when any factor block has it enabled).
+    If too few sectors are selected to meet the cap, part of the weight stays
+    unallocated (`PortfolioSelection.unallocated_weight`).
+
+    Parameters:
+        scores (FactorScoreMatrix): Result of the z-score calculation.
+        portfolio_cfg (dict): 'Portfolio' configuration block.
+        config (dict): Complete screener configuration (factor blocks).
+
+    Returns:
+        PortfolioSelection: Selected tickers and their target weights.
+    """
+    rank_by = portfolio_cfg.get("rank_by", FINAL_COMPOSITE)
+    top_k = int(portfolio_cfg.get("top_k", DEFAULT_TOP_K))
+
+    if rank_by == FINAL_COMPOSITE:
+        composites = scores.final_composite
+        use_sector_cap = any(config.get(factor, {}).get("use_sector_cap", False) for factor in scores.factors)
+    else:
+        composites = scores.composites[scores.factors.index(rank_by)]
+        use_sector_cap = config.get(rank_by, {}).get("use_sector_cap", False)
+
+    max_per_sector = None
+    if use_sector_cap:
+        max_sector_weight = float(portfolio_cfg.get("max_sector_weight", DEFAULT_MAX_SECTOR_WEIGHT))
+        max_per_sector = max(1, math.floor(max_sector_weight * top_k))
+
+    selected = select_top_k(composites, scores.sector_codes, top_k, max_per_sector)
+
+    if selected.size < top_k:
+        logging.warning(f"Portfolio: only {selected.size} of {top_k} names could be selected (ranked by '{rank_by}').")
+
+    selected_codes = scores.sector_codes[selected] if scores.sector_codes is not None else np.full(selected.size, -1)
+
+    sector_names = list(scores.sector_names)
+    sectors = [sector_names[code] if code >= 0 else "N/A" for code in selected_codes]
+
+    # The name cap does not bound the weight of a sector under 'rank' weighting - cap the weights too
+    target_weights = calc_target_weights(selected.size, portfolio_cfg.get("weighting", "equal"))
+    if use_sector_cap:
+        target_weights = cap_sector_weights(target_weights, selected_codes, max_sector_weight)
+
+    return PortfolioSelection(
+        tickers=[scores.tickers[i] for i in selected],
+        sectors=sectors,
+        composites=composites[selected],
+        target_weights=target_weights,
+    )
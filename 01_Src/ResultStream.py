@@ -0,0 +1,357 @@
+# encoding: utf-8
+
+# Copyright (c) Ivan Antunović (ivantun05@gmail.com) - All rights reserved.
+# Unintended redistribution can be punishable by law.
+# By reading this message, you are automatically consenting to it
+# and you are accepting that the financial data might be incorrect.
+# The financial data generated by this script is for informational purposes only
+# and should not be considered as investment advice.
+# Use at your own risk.
+
+"""
+ResultStream.py - incremental per-ticker result file (JSONL / CSV)
+-------------------------------------------------------------------------------
+The data fetch appends every analysed ticker to a stream file as soon as
+`analyze_one_stock` returns:
+
+    with ResultStreamWriter(file_name, "jsonl") as sink:
+        for future in as_completed(futures):
+            sink.append(*future.result())
+
+    stock_data, stocks = load_result_stream(file_name)
+
+One flat record per ticker:
+
+    Ticker, Valid                  ticker and whether it could be analysed
+    <result column> ...            the result row (STOCK_DATA_TEMPLATE columns, raw numbers)
+    Sector, Industry
+    metric:<attr path> ...         every scoring input (ZScoreCalculator.METRIC_REGISTRY)
+    source:<metric> ...            the MetricSelector source of every multi-source metric
+
+Every line is flushed immediately, so partial results are visible while the
+run is in progress and survive a crash. `load_result_stream` rebuilds the
+result rows and lightweight `Stock` objects holding exactly the attributes the
+scoring engine reads, so scoring and all exports can run from the file
+(a crashed run is resumed by skipping the tickers already in it, see
+`completed_tickers`). Tickers whose analysis failed (Valid = false, e.g. a
+transient fetch error) are fetched again on resume by default; their new
+record replaces the old one.
+"""
+
+from __future__ import annotations
+
+from operator import attrgetter
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Set, Tuple
+import csv
+import io
+import json
+import math
+import os
+import pandas as pd
+
+from Stock import Stock
+from StockDataTemplate import STOCK_DATA_TEMPLATE
+from ZScoreCalculator import METRIC_REGISTRY
+
+
+
+# ---------------------------------------------------------------------------
+# constants
+# ---------------------------------------------------------------------------
+
+# Stream file formats and their extension
+STREAM_FORMATS: Dict[str, str] = {
+    "jsonl": ".jsonl",
+    "csv": ".csv",
+}
+DEFAULT_STREAM_FORMAT = "jsonl"
+
+TICKER_FIELD = "Ticker"
+VALID_FIELD = "Valid"
+SECTOR_FIELD = "Sector"
+INDUSTRY_FIELD = "Industry"
+METRIC_PREFIX = "metric:"
+SOURCE_PREFIX = "source:"
+
+# Text columns of the result row - missing values in all other columns are restored as NaN
+TEXT_COLUMNS = ("Company", "Country", SECTOR_FIELD, INDUSTRY_FIELD)
+
+# Multi-source metrics (keys of Stock.metric_sources)
+SOURCE_METRICS = ("ROE", "ROA", "CFOA", "GPOA", "GPMAR")
+
+# Every Stock attribute path read by the scoring engine, in registry order
+METRIC_PATHS: List[str] = list(dict.fromkeys(
+    spec.attr_path
+    for factor_metrics in METRIC_REGISTRY.values()
+    for spec in factor_metrics.values()
+))
+
+# Top-level Stock attributes holding the metric objects
+STOCK_METRIC_ATTRS = ("value_metrics", "profitability_metrics", "growth_metrics", "safety_metrics")
+
+FIELDNAMES: List[str] = (
+    [TICKER_FIELD, VALID_FIELD]
+    + [column for column in STOCK_DATA_TEMPLATE if column not in (SECTOR_FIELD, INDUSTRY_FIELD)]
+    + [SECTOR_FIELD, INDUSTRY_FIELD]
+    + [f"{METRIC_PREFIX}{path}" for path in METRIC_PATHS]
+    + [f"{SOURCE_PREFIX}{metric}" for metric in SOURCE_METRICS]
+)
+
+
+
+# ---------------------------------------------------------------------------
+# writer
+# ---------------------------------------------------------------------------
+
+class ResultStreamWriter:
+    """
+    Append-only per-ticker result file, one flushed record per ticker.
+
+    An existing file is appended to (resume), the CSV header is only written to
+    an empty file. A partial last line of a crashed run is cut off first, so the
+    first new record starts on a line of its own.
+    """
+
+    def __init__ (self, file_name: str, file_format: str = DEFAULT_STREAM_FORMAT):
+
+        if file_format not in STREAM_FORMATS:
+            raise ValueError(f"Unknown result stream format '{file_format}'. Options: {list(STREAM_FORMATS)}")
+
+        directory = os.path.dirname(file_name)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.file_name = file_name
+        self.file_format = file_format
+        self.count = 0
+
+        if os.path.exists(file_name):
+            _drop_partial_line(file_name)
+
+        is_new_file = not os.path.exists(file_name) or os.path.getsize(file_name) == 0
+        self._file = open(file_name, "a", encoding="utf-8", newline="")
+
+        self._csv_writer = None
+        if file_format == "csv":
+            self._csv_writer = csv.DictWriter(self._file, fieldnames=FIELDNAMES, extrasaction="ignore")
+            if is_new_file:
+                self._csv_writer.writeheader()
+
+
+    def __enter__ (self) -> "ResultStreamWriter":
+        return self
+
+
+    def __exit__ (self, *exc_info) -> None:
+        self.close()
+
+
+    def close (self) -> None:
+        """Close the stream file."""
+        self._file.close()
+
+
+    def append (self, ticker: str, stock_data_entry: Optional[dict], stock: Optional[Stock]) -> None:
+        """Write the record of one analysed ticker (result row and scoring inputs) and flush it."""
+        if stock_data_entry is None and stock is None:
+            return
+
+        record = flatten_record(ticker, stock_data_entry, stock)
+
+        if self._csv_writer is not None:
+            self._csv_writer.writerow({key: "" if value is None else value for key, value in record.items()})
+        else:
+            self._file.write(json.dumps(record, ensure_ascii=False, default=_json_default))
+            self._file.write("\n")
+
+        self._file.flush()
+        self.count += 1
+
+
+
+# ---------------------------------------------------------------------------
+# public API
+# ---------------------------------------------------------------------------
+
+def flatten_record (ticker: str, stock_data_entry: Optional[dict], stock: Optional[Stock]) -> Dict[str, Any]:
+    """Flat record of one ticker (see module docstring), missing numbers as None."""
+    record: Dict[str, Any] = {TICKER_FIELD: ticker, VALID_FIELD: stock is not None}
+    record.update({column: _plain(value) for column, value in (stock_data_entry or {}).items()})
+
+    if stock is not None:
+        record[SECTOR_FIELD] = stock.sector
+        record[INDUSTRY_FIELD] = stock.industry
+        record.update({f"{METRIC_PREFIX}{path}": _plain(_get_metric(stock, path)) for path in METRIC_PATHS})
+        record.update({f"{SOURCE_PREFIX}{metric}": source for metric, source in stock.metric_sources.items()})
+
+    return record
+
+
+def completed_tickers (file_name: str, retry_invalid: bool = True) -> Set[str]:
+    """
+    Tickers of a stream file that a resumed run does not need to fetch again.
+
+    Parameters:
+        file_name (str): Stream file of an interrupted run (empty set if it does not exist).
+        retry_invalid (bool): Leave out the tickers whose analysis failed, so that they are retried.
+
+    Returns:
+        Set[str]: Completed tickers.
+    """
+    if not os.path.exists(file_name):
+        return set()
+    return {
+        ticker for ticker, record in _read_records(file_name).items()
+        if not retry_invalid or _is_true(record.get(VALID_FIELD))
+    }
+
+
+def load_result_stream (file_name: str) -> Tuple[Dict[str, dict], List[Stock]]:
+    """
+    Rebuild the result rows and the scoring inputs of a run from its stream file.
+
+    A ticker written more than once (e.g. a resumed run) keeps its last record.
+
+    Returns:
+        Tuple[Dict[str, dict], List[Stock]]: (ticker -> result row, Stock objects of all valid tickers)
+    """
+    stock_data: Dict[str, dict] = {}
+    stocks: List[Stock] = []
+
+    for ticker, record in _read_records(file_name).items():
+        stock_data[ticker] = {
+            column: math.nan if value is None and column not in TEXT_COLUMNS else value
+            for column, value in record.items()
+            if column not in (TICKER_FIELD, VALID_FIELD) and not column.startswith((METRIC_PREFIX, SOURCE_PREFIX))
+        }
+
+        if _is_true(record.get(VALID_FIELD)):
+            stocks.append(_build_stock(ticker, record))
+
+    return stock_data, stocks
+
+
+
+# ---------------------------------------------------------------------------
+# internal helpers
+# ---------------------------------------------------------------------------
+
+def _read_records (file_name: str) -> Dict[str, Dict[str, Any]]:
+    """Ticker -> last record of a JSONL / CSV stream file (a truncated last line is skipped)."""
+    records: Dict[str, Dict[str, Any]] = {}
+
+    if file_name.endswith(STREAM_FORMATS["csv"]):
+        frame = pd.read_csv(io.StringIO(_complete_csv_rows(file_name)), dtype={TICKER_FIELD: str},
+                            keep_default_na=False, na_values=[""])
+        frame = frame.astype(object).where(frame.notna(), None)
+        for record in frame.to_dict(orient="records"):
+            records[str(record[TICKER_FIELD])] = record
+        return records
+
+    with open(file_name, "r", encoding="utf-8") as stream_file:
+        for line in stream_file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:            # Last line of a crashed run
+                continue
+            records[str(record[TICKER_FIELD])] = record
+
+    return records
+
+
+def _complete_csv_rows (file_name: str) -> str:
+    """
+    CSV text of the complete rows of a stream file: newline-terminated and with
+    the field count of the header (pandas pads a truncated row with NaN instead
+    of rejecting it).
+    """
+    with open(file_name, "r", encoding="utf-8", newline="") as stream_file:
+        content = stream_file.read()
+
+    # Text after the last newline is the partial row of a crashed run
+    content = content[:content.rfind("\n") + 1]
+
+    rows = csv.reader(io.StringIO(content))
+    header = next(rows, None)
+    if header is None:
+        return ""
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    writer.writerows(row for row in rows if len(row) == len(header))
+    return output.getvalue()
+
+
+def _drop_partial_line (file_name: str) -> None:
+    """Cut a stream file back to its last newline (removes the partial last line of a crashed run)."""
+    with open(file_name, "rb+") as stream_file:
+        content = stream_file.read()
+        if content and not content.endswith(b"\n"):
+            stream_file.truncate(content.rfind(b"\n") + 1)
+
+
+def _build_stock (ticker: str, record: Dict[str, Any]) -> Stock:
+    """`Stock` with the metric attributes of a stream record (nested namespaces along the attribute paths)."""
+    containers = {attr: SimpleNamespace() for attr in STOCK_METRIC_ATTRS}
+
+    for path in METRIC_PATHS:
+        head, *middle, leaf = path.split(".")
+        node = containers[head]
+        for attr in middle:
+            if not hasattr(node, attr):
+                setattr(node, attr, SimpleNamespace())
+            node = getattr(node, attr)
+        setattr(node, leaf, _to_float(record.get(f"{METRIC_PREFIX}{path}")))
+
+    sources = {metric: record.get(f"{SOURCE_PREFIX}{metric}") for metric in SOURCE_METRICS if record.get(f"{SOURCE_PREFIX}{metric}") is not None}
+
+    return Stock(
+        ticker,
+        record.get(SECTOR_FIELD),
+        containers["value_metrics"],
+        containers["profitability_metrics"],
+        containers["growth_metrics"],
+        containers["safety_metrics"],
+        record.get(INDUSTRY_FIELD),
+        sources,
+    )
+
+
+def _get_metric (stock: Stock, path: str) -> Any:
+    """Value of a dotted attribute path, None on any missing link."""
+    try:
+        return attrgetter(path)(stock)
+    except AttributeError:
+        return None
+
+
+def _plain (value: Any) -> Any:
+    """JSON / CSV friendly value: NaN -> None, numpy scalars -> Python scalars."""
+    if value is None or isinstance(value, (str, bool)):
+        return value
+    if isinstance(value, (int, float)) or hasattr(value, "item"):
+        value = value.item() if hasattr(value, "item") else value
+        return None if isinstance(value, float) and math.isnan(value) else value
+    return value
+
+
+def _to_float (value: Any) -> Optional[float]:
+    """Metric value as float, None if missing."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_true (value: Any) -> bool:
+    """Valid flag of a JSONL (bool) or CSV (text) record."""
+    return value is True or str(value).strip().lower() == "true"
+
+
+def _json_default (value: Any) -> Any:
+    """Fallback serialisation of values json does not know (dates, numpy types)."""
+    return value.item() if hasattr(value, "item") else str(value)
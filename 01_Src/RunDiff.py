@@ -0,0 +1,264 @@
+# encoding: utf-8
+
+# Copyright (c) Ivan Antunović (ivantun05@gmail.com) - All rights reserved.
+# Unintended redistribution can be punishable by law.
+# By reading this message, you are automatically consenting to it
+# and you are accepting that the financial data might be incorrect.
+# The financial data generated by this script is for informational purposes only
+# and should not be considered as investment advice.
+# Use at your own risk.
+
+"""
+RunDiff.py - run-to-run diff of the screener results
+-------------------------------------------------------------------------------
+Every run writes a compact snapshot next to its Excel file
+('<excel>_Snapshot.csv': ticker, company, rank, composites and the source
+chosen by MetricSelector for every multi-source metric). The next run aligns
+its own snapshot with the latest previous one by ticker (one index join) and
+reports:
+
+    • rank moves of at least `min_rank_move` positions
+    • composite deltas of at least `composite_threshold`
+    • new and dropped tickers
+    • metrics whose source changed (e.g. ROE 'ttm (yFinance)' -> 'ttm (calc)')
+
+All comparisons are whole-column operations on the joined frame, so the diff
+costs nothing next to the data fetch.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import glob
+import json
+import os
+import numpy as np
+import pandas as pd
+
+
+
+# ---------------------------------------------------------------------------
+# constants
+# ---------------------------------------------------------------------------
+
+DEFAULT_COMPOSITE_THRESHOLD = 0.25
+DEFAULT_MIN_RANK_MOVE = 10
+
+# Composite columns of the result table compared between runs (the first one defines the rank)
+COMPOSITE_COLUMNS: List[str] = [
+    "Z-Score Final",
+    "Z-Score Value",
+    "Z-Score Profitability",
+    "Z-Score Growth",
+]
+
+INDEX_COLUMN = "Ticker"
+COMPANY_COLUMN = "Company"
+RANK_COLUMN = "Rank"
+SOURCE_PREFIX = "Source "
+SNAPSHOT_SUFFIX = "_Snapshot.csv"
+
+# Status of a ticker in the diff
+STATUS_NEW = "new"
+STATUS_DROPPED = "dropped"
+STATUS_CHANGED = "changed"
+
+
+
+# ---------------------------------------------------------------------------
+# dataclasses
+# ---------------------------------------------------------------------------
+
+@dataclass
+class RunDiffReport:
+    """Differences between the current and the previous run."""
+
+    previous_run: Optional[str]                 # Snapshot file of the previous run (None = first run)
+    changes: pd.DataFrame                       # One row per new, dropped or changed ticker
+    source_changes: pd.DataFrame                # (Ticker, Metric, Previous Source, Current Source)
+    new_tickers: List[str] = field(default_factory=list)
+    dropped_tickers: List[str] = field(default_factory=list)
+
+    def to_dict (self) -> Dict[str, Any]:
+        """Machine-readable form of the report (JSON serialisable, NaN = null)."""
+        return {
+            "previous_run": self.previous_run,
+            "new_tickers": self.new_tickers,
+            "dropped_tickers": self.dropped_tickers,
+            "changes": _to_records(self.changes.reset_index()),
+            "source_changes": _to_records(self.source_changes),
+        }
+
+
+
+# ---------------------------------------------------------------------------
+# public API
+# ---------------------------------------------------------------------------
+
+def build_snapshot (results_df: pd.DataFrame, metric_sources: Optional[Dict[str, Dict[str, Optional[str]]]] = None,
+                    composite_columns: List[str] = COMPOSITE_COLUMNS) -> pd.DataFrame:
+    """
+    Compact snapshot of one run (index = ticker).
+
+    Parameters:
+        results_df (pd.DataFrame): Result table (index = ticker).
+        metric_sources (Dict): Ticker -> {metric: source} as chosen by MetricSelector.
+        composite_columns (List[str]): Composite columns to keep; the first one defines the rank.
+
+    Returns:
+        pd.DataFrame: Company, Rank, composite and 'Source <metric>' columns.
+    """
+    columns = [column for column in [COMPANY_COLUMN] + list(composite_columns) if column in results_df.columns]
+    snapshot = results_df[columns].copy()
+    snapshot.index = snapshot.index.astype(str)
+    snapshot.index.name = INDEX_COLUMN
+
+    # Rank 1 = best final composite, tickers without a score have no rank
+    rank_column = composite_columns[0]
+    if rank_column in snapshot.columns:
+        snapshot.insert(1 if COMPANY_COLUMN in snapshot.columns else 0, RANK_COLUMN,
+                        pd.to_numeric(snapshot[rank_column], errors="coerce").rank(ascending=False, method="first"))
+
+    if metric_sources:
+        sources = pd.DataFrame.from_dict(metric_sources, orient="index")
+        sources.index = sources.index.astype(str)
+        sources.columns = [f"{SOURCE_PREFIX}{metric}" for metric in sources.columns]
+        snapshot = snapshot.join(sources)
+
+    return snapshot
+
+
+def write_snapshot (file_name: str, snapshot: pd.DataFrame) -> str:
+    """Write a snapshot as CSV."""
+    snapshot.to_csv(file_name, index_label=INDEX_COLUMN)
+    return file_name
+
+
+def read_snapshot (file_name: str) -> pd.DataFrame:
+    """Read a snapshot written by `write_snapshot` (index = ticker)."""
+    return pd.read_csv(file_name, index_col=INDEX_COLUMN, keep_default_na=False, na_values=[""])
+
+
+def find_previous_snapshot (excel_file_name: str, exclude: Optional[str] = None) -> Optional[str]:
+    """
+    Latest snapshot written next to the Excel files of previous runs.
+
+    Parameters:
+        excel_file_name (str): Excel file of the current run (defines the directory).
+        exclude (str): Snapshot file of the current run.
+
+    Returns:
+        str or None: Newest snapshot file (by modification time), None for the first run.
+    """
+    pattern = os.path.join(os.path.dirname(excel_file_name), f"*{SNAPSHOT_SUFFIX}")
+    candidates = [
+        file_name for file_name in glob.glob(pattern)
+        if exclude is None or os.path.abspath(file_name) != os.path.abspath(exclude)
+    ]
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def diff_runs (current: pd.DataFrame, previous: Optional[pd.DataFrame], previous_run: Optional[str] = None,
+               composite_threshold: float = DEFAULT_COMPOSITE_THRESHOLD,
+               min_rank_move: int = DEFAULT_MIN_RANK_MOVE) -> RunDiffReport:
+    """
+    Diff of two run snapshots aligned by ticker.
+
+    Parameters:
+        current (pd.DataFrame): Snapshot of the current run.
+        previous (pd.DataFrame): Snapshot of the previous run (None = first run, empty report).
+        previous_run (str): Name of the previous run (reported as is).
+        composite_threshold (float): Absolute composite change from which a ticker is reported.
+        min_rank_move (int): Rank change (positions) from which a ticker is reported.
+
+    Returns:
+        RunDiffReport: Changed, new and dropped tickers and the source changes.
+    """
+    if previous is None:
+        return RunDiffReport(previous_run=None, changes=pd.DataFrame(), source_changes=pd.DataFrame())
+
+    current = current[~current.index.duplicated()]
+    previous = previous[~previous.index.duplicated()]
+
+    # One outer join of both runs on the ticker
+    joined = current.join(previous, how="outer", lsuffix=" (current)", rsuffix=" (previous)")
+    is_new = ~joined.index.isin(previous.index)
+    is_dropped = ~joined.index.isin(current.index)
+
+    changes = pd.DataFrame(index=joined.index)
+
+    company_current = f"{COMPANY_COLUMN} (current)"
+    if company_current in joined.columns:
+        changes[COMPANY_COLUMN] = joined[company_current].fillna(joined[f"{COMPANY_COLUMN} (previous)"])
+
+    changes["Status"] = np.select([is_new, is_dropped], [STATUS_NEW, STATUS_DROPPED], default=STATUS_CHANGED)
+    is_reported = is_new | is_dropped
+
+    # Rank moves (positive = moved up)
+    if RANK_COLUMN in current.columns and RANK_COLUMN in previous.columns:
+        rank_current = joined[f"{RANK_COLUMN} (current)"]
+        rank_previous = joined[f"{RANK_COLUMN} (previous)"]
+        changes[f"{RANK_COLUMN} (previous)"] = rank_previous
+        changes[f"{RANK_COLUMN} (current)"] = rank_current
+        changes["Rank Move"] = rank_previous - rank_current
+        is_reported |= (changes["Rank Move"].abs() >= min_rank_move).to_numpy()
+
+    # Composite deltas
+    composite_columns = [column for column in COMPOSITE_COLUMNS if column in current.columns and column in previous.columns]
+    if composite_columns:
+        deltas = (joined[[f"{column} (current)" for column in composite_columns]].to_numpy(dtype=float)
+                  - joined[[f"{column} (previous)" for column in composite_columns]].to_numpy(dtype=float))
+        for col_idx, column in enumerate(composite_columns):
+            changes[f"Δ {column}"] = deltas[:, col_idx]
+        is_reported |= (np.nan_to_num(np.abs(deltas)) >= composite_threshold).any(axis=1)
+
+    # Changed tickers first, largest rank moves on top
+    changes = changes[is_reported]
+    move = changes["Rank Move"].abs() if "Rank Move" in changes.columns else pd.Series(0.0, index=changes.index)
+    changes = changes.assign(_move=move).sort_values(["Status", "_move"], ascending=[True, False]).drop(columns="_move")
+
+    return RunDiffReport(
+        previous_run=previous_run,
+        changes=changes,
+        source_changes=_diff_sources(current, previous),
+        new_tickers=joined.index[is_new].tolist(),
+        dropped_tickers=joined.index[is_dropped].tolist(),
+    )
+
+
+
+# ---------------------------------------------------------------------------
+# internal helpers
+# ---------------------------------------------------------------------------
+
+def _diff_sources (current: pd.DataFrame, previous: pd.DataFrame) -> pd.DataFrame:
+    """Long table of the metrics whose source changed, for tickers in both runs."""
+    source_columns = [column for column in current.columns if column.startswith(SOURCE_PREFIX) and column in previous.columns]
+    common = current.index.intersection(previous.index)
+    columns = ["Ticker", "Metric", "Previous Source", "Current Source"]
+
+    if not source_columns or common.empty:
+        return pd.DataFrame(columns=columns)
+
+    current_sources = current.loc[common, source_columns].astype(object).to_numpy()
+    previous_sources = previous.loc[common, source_columns].astype(object).to_numpy()
+
+    # Missing sources compare as "N/A" (a metric that became unavailable is a source change too)
+    current_sources = np.where(pd.isna(current_sources), "N/A", current_sources).astype(str)
+    previous_sources = np.where(pd.isna(previous_sources), "N/A", previous_sources).astype(str)
+
+    rows, cols = np.nonzero(current_sources != previous_sources)
+    metrics = np.asarray([column[len(SOURCE_PREFIX):] for column in source_columns], dtype=object)
+
+    return pd.DataFrame({
+        "Ticker": np.asarray(common, dtype=object)[rows],
+        "Metric": metrics[cols],
+        "Previous Source": previous_sources[rows, cols],
+        "Current Source": current_sources[rows, cols],
+    }, columns=columns)
+
+
+def _to_records (df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Rows of a DataFrame as plain dicts (NaN -> None, numpy scalars -> Python)."""
+    return json.loads(df.to_json(orient="records", force_ascii=False)) if not df.empty else []
@@ -0,0 +1,327 @@
+# encoding: utf-8
+
+# Copyright (c) Ivan Antunović (ivantun05@gmail.com) - All rights reserved.
+# Unintended redistribution can be punishable by law.
+# By reading this message, you are automatically consenting to it
+# and you are accepting that the financial data might be incorrect.
+# The financial data generated by this script is for informational purposes only
+# and should not be considered as investment advice.
+# Use at your own risk.
+
+"""
+RunHistory.py - SQLite history of all screener runs
+-------------------------------------------------------------------------------
+Every run is appended to a local SQLite database instead of only producing a
+new Excel file:
+
+    runs     (run_id, run_date, output_file, n_tickers, config)
+    tickers  (ticker_id, symbol)
+    metrics  (metric_id, name)
+    results  (run_id, metric_id, ticker_id, value)     -- one row per number
+
+The fact table holds every numeric result column, the raw value and z-score of
+every configured metric and all composites (see `ArrowExporter.build_result_frame`
+for the column names, e.g. 'composite.final'). It is indexed by ticker, metric
+and run date, so the typical questions are answered with an index lookup:
+
+    • RunHistoryStore.ticker_history(ticker, metric)      score history of a ticker
+    • RunHistoryStore.top_by_metric(date, metric, top_n)  best tickers of a run date
+
+A run is written with one `executemany` in a single transaction, in primary
+key order. Tickers and metrics are stored as integer ids to keep the fact table
+and its indexes small.
+
+Command line:
+
+    python RunHistory.py runs
+    python RunHistory.py history AAPL --metric composite.final
+    python RunHistory.py top 2026-10-16 --metric composite.final --top 20
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, List, Optional
+import argparse
+import json
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from ArrowExporter import redact_config
+
+
+
+# ---------------------------------------------------------------------------
+# constants
+# ---------------------------------------------------------------------------
+
+DEFAULT_DATABASE = os.path.join("gen", "RunHistory.sqlite")
+DEFAULT_METRIC = "composite.final"
+DEFAULT_TOP_N = 20
+
+TICKER_COLUMN = "Ticker"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_date    TEXT    NOT NULL,           -- ISO 8601, local time
+    output_file TEXT,
+    n_tickers   INTEGER,
+    config      TEXT                        -- JSON
+);
+
+CREATE TABLE IF NOT EXISTS tickers (
+    ticker_id   INTEGER PRIMARY KEY,
+    symbol      TEXT    NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS metrics (
+    metric_id   INTEGER PRIMARY KEY,
+    name        TEXT    NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS results (
+    run_id      INTEGER NOT NULL REFERENCES runs (run_id),
+    metric_id   INTEGER NOT NULL REFERENCES metrics (metric_id),
+    ticker_id   INTEGER NOT NULL REFERENCES tickers (ticker_id),
+    value       REAL    NOT NULL,
+    PRIMARY KEY (run_id, metric_id, ticker_id)             -- run + metric lookups (top-n of a run)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_runs_date      ON runs    (run_date);
+CREATE INDEX IF NOT EXISTS idx_results_ticker ON results (ticker_id, metric_id, run_id);
+"""
+
+# Page cache of the connection (negative = KiB), large enough to keep the index pages of a run in memory
+CACHE_SIZE_KIB = 200_000
+
+
+
+# ---------------------------------------------------------------------------
+# history store
+# ---------------------------------------------------------------------------
+
+class RunHistoryStore:
+    """
+    Append-only SQLite store of screener runs.
+
+    Typical usage:
+
+        with RunHistoryStore("gen/RunHistory.sqlite") as store:
+            run_id = store.append_run(result_frame, output_file=excel_file_name, config=config)
+            history = store.ticker_history("AAPL")
+            top_20 = store.top_by_metric("2026-10-16")
+    """
+
+    def __init__ (self, database: str = DEFAULT_DATABASE):
+
+        directory = os.path.dirname(database)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.database = database
+        self.connection = sqlite3.connect(database)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+        self.connection.executescript(SCHEMA)
+
+
+    def __enter__ (self) -> "RunHistoryStore":
+        return self
+
+
+    def __exit__ (self, *exc_info) -> None:
+        self.close()
+
+
+    def close (self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+
+    # ---------------------------------------------------------------------
+    # writing
+    # ---------------------------------------------------------------------
+
+    def append_run (self, result_frame: pd.DataFrame, run_date: Optional[datetime] = None,
+                    output_file: Optional[str] = None, config: Optional[dict] = None) -> int:
+        """
+        Append one run: every non-missing number of *result_frame* becomes one fact row.
+
+        Parameters:
+            result_frame (pd.DataFrame): One row per ticker with a 'Ticker' column (or the ticker as index)
+                                         and numeric result columns. Text columns are ignored.
+            run_date (datetime): Time of the run (default: now).
+            output_file (str): Excel file of the run.
+            config (dict): Screener configuration of the run (stored redacted).
+
+        Returns:
+            int: run_id of the new run.
+        """
+        run_date = run_date or datetime.now()
+        tickers = self._tickers(result_frame)
+
+        numeric_columns = [
+            column for column in result_frame.columns
+            if column != TICKER_COLUMN and is_numeric_dtype(result_frame[column]) and not is_bool_dtype(result_frame[column])
+        ]
+
+        values = result_frame[numeric_columns].to_numpy(dtype=float)
+
+        with self.connection:                                           # one transaction per run
+            metric_ids = np.asarray(self._get_ids("metrics", "name", numeric_columns), dtype=np.int64)
+            ticker_ids = np.asarray(self._get_ids("tickers", "symbol", tickers), dtype=np.int64)
+
+            # Long format of the (tickers x metrics) block in primary key order (metric, ticker):
+            # metric and ticker id of every valid cell
+            metric_order = np.argsort(metric_ids, kind="stable")
+            ticker_order = np.argsort(ticker_ids, kind="stable")
+            ordered_values = values[ticker_order][:, metric_order]
+            cols, rows = np.nonzero(~np.isnan(ordered_values.T))
+
+            cursor = self.connection.execute(
+                "INSERT INTO runs (run_date, output_file, n_tickers, config) VALUES (?, ?, ?, ?)",
+                (run_date.isoformat(timespec="seconds"), output_file, len(tickers), json.dumps(redact_config(config), default=str))
+            )
+            run_id = cursor.lastrowid
+
+            self.connection.executemany(
+                "INSERT INTO results (run_id, metric_id, ticker_id, value) VALUES (?, ?, ?, ?)",
+                zip(
+                    [run_id] * rows.size,
+                    metric_ids[metric_order][cols].tolist(),
+                    ticker_ids[ticker_order][rows].tolist(),
+                    ordered_values[rows, cols].tolist()
+                )
+            )
+
+        return run_id
+
+
+    # ---------------------------------------------------------------------
+    # queries
+    # ---------------------------------------------------------------------
+
+    def list_runs (self) -> pd.DataFrame:
+        """All runs, oldest first."""
+        return pd.read_sql_query(
+            "SELECT run_id, run_date, output_file, n_tickers FROM runs ORDER BY run_date, run_id",
+            self.connection
+        )
+
+
+    def ticker_history (self, ticker: str, metric: str = DEFAULT_METRIC) -> pd.DataFrame:
+        """Value of *metric* for *ticker* in every run, oldest first."""
+        return pd.read_sql_query(
+            """
+            SELECT r.run_id, r.run_date, f.value
+            FROM results f
+            JOIN tickers t ON t.ticker_id = f.ticker_id
+            JOIN metrics m ON m.metric_id = f.metric_id
+            JOIN runs r    ON r.run_id = f.run_id
+            WHERE t.symbol = ? AND m.name = ?
+            ORDER BY r.run_date, r.run_id
+            """,
+            self.connection,
+            params=(ticker, metric)
+        )
+
+
+    def top_by_metric (self, run_date: str, metric: str = DEFAULT_METRIC, top_n: int = DEFAULT_TOP_N) -> pd.DataFrame:
+        """
+        Best *top_n* tickers by *metric* of the latest run on *run_date* ('YYYY-MM-DD').
+
+        Returns an empty table if there is no run on that date.
+        """
+        return pd.read_sql_query(
+            """
+            SELECT t.symbol AS ticker, f.value
+            FROM results f
+            JOIN tickers t ON t.ticker_id = f.ticker_id
+            JOIN metrics m ON m.metric_id = f.metric_id
+            WHERE m.name = ?
+              AND f.run_id = (SELECT run_id FROM runs WHERE run_date >= ? AND run_date < date(?, '+1 day')
+                              ORDER BY run_date DESC, run_id DESC LIMIT 1)
+            ORDER BY f.value DESC
+            LIMIT ?
+            """,
+            self.connection,
+            params=(metric, run_date, run_date, top_n)
+        )
+
+
+    def run_results (self, run_id: int, metrics: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Wide (tickers x metrics) table of one run, optionally only the given *metrics*."""
+        query = """
+            SELECT t.symbol AS ticker, m.name AS metric, f.value
+            FROM results f
+            JOIN tickers t ON t.ticker_id = f.ticker_id
+            JOIN metrics m ON m.metric_id = f.metric_id
+            WHERE f.run_id = ?
+        """
+        long_df = pd.read_sql_query(query, self.connection, params=(run_id,))
+        if metrics is not None:
+            long_df = long_df[long_df["metric"].isin(list(metrics))]
+        return long_df.pivot(index="ticker", columns="metric", values="value")
+
+
+    # ---------------------------------------------------------------------
+    # internal helpers
+    # ---------------------------------------------------------------------
+
+    def _get_ids (self, table: str, column: str, names: List[str]) -> List[int]:
+        """Integer id of every name of a lookup table (tickers, metrics), registering new names."""
+        self.connection.executemany(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", [(str(name),) for name in names])
+        ids = dict(self.connection.execute(f"SELECT {column}, rowid FROM {table}"))
+        return [ids[str(name)] for name in names]
+
+
+    @staticmethod
+    def _tickers (result_frame: pd.DataFrame) -> List[str]:
+        """Ticker of every row (the 'Ticker' column or the index)."""
+        if TICKER_COLUMN in result_frame.columns:
+            return result_frame[TICKER_COLUMN].astype(str).tolist()
+        return result_frame.index.astype(str).tolist()
+
+
+
+# ---------------------------------------------------------------------------
+# command line
+# ---------------------------------------------------------------------------
+
+def main (argv: Optional[List[str]] = None) -> None:
+    """Command line interface: list runs, ticker history or top tickers of a date."""
+    parser = argparse.ArgumentParser(description="Query the screener run history.")
+    parser.add_argument("--db", default=DEFAULT_DATABASE, help=f"SQLite database (default: {DEFAULT_DATABASE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("runs", help="List all runs")
+
+    history_parser = commands.add_parser("history", help="Metric history of one ticker")
+    history_parser.add_argument("ticker")
+    history_parser.add_argument("--metric", default=DEFAULT_METRIC)
+
+    top_parser = commands.add_parser("top", help="Best tickers of the latest run on a date")
+    top_parser.add_argument("date", help="Run date (YYYY-MM-DD)")
+    top_parser.add_argument("--metric", default=DEFAULT_METRIC)
+    top_parser.add_argument("--top", type=int, default=DEFAULT_TOP_N)
+
+    args = parser.parse_args(argv)
+
+    with RunHistoryStore(args.db) as store:
+        if args.command == "runs":
+            result = store.list_runs()
+        elif args.command == "history":
+            result = store.ticker_history(args.ticker, args.metric)
+        else:
+            result = store.top_by_metric(args.date, args.metric, args.top)
+
+    print(result.to_string(index=False) if not result.empty else "No results.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+# encoding: utf-8
+
+# Copyright (c) Ivan Antunović (ivantun05@gmail.com) - All rights reserved.
+# Unintended redistribution can be punishable by law.
+# By reading this message, you are automatically consenting to it
+# and you are accepting that the financial data might be incorrect.
+# The financial data generated by this script is for informational purposes only
+# and should not be considered as investment advice.
+# Use at your own risk.
+
+"""
+ScreenerLogging.py - asynchronous logging for the screener
+-------------------------------------------------------------------------------
+`LoggingConfig.json` defines the real handlers (log file, console). After it is
+applied, `start_queue_logging` moves them behind a queue:
+
+    worker threads --> QueueHandler --> queue --> QueueListener thread --> file / console
+
+The workers render the message (`getMessage()`, the %-arguments) and the
+traceback of a record and put it on the queue - rendering in the worker keeps
+the message consistent with the arguments at the time of the call, even if
+the objects change later. The handler formatting (time stamp, layout) and all
+file / console I/O happen on the single listener thread, so the analysis
+threads no longer contend for the handler locks. The owner of the listener stops it
+with `stop_queue_logging` (which drains the queue) before `logging.shutdown()`
+closes the handlers. The `atexit` hook registered by `start_queue_logging` is
+only a fallback: it drains the queue at interpreter exit if the program did
+not, but records still queued when `logging.shutdown()` is called explicitly
+would be written to already closed handlers.
+
+Per-ticker log blocks: inside `ticker_log_block()` the records of the current
+task are collected instead of enqueued and handed to the listener as one list
+when the block ends. The listener writes the whole block with one write per
+handler, so the log shows every ticker as one contiguous block instead of
+lines interleaved across worker threads. An optional cap flushes very long
+blocks early.
+
+Structured log: `json_log_handler()` writes one JSON object per record
+(see `JSON_FIELDS`). The ticker and the elapsed time since the start of its
+block come from `ticker_log_block`, the stage from `log_stage` (default: the
+function that logged), metric / value / source from the `extra` of the
+metric records (`metric_fields`). One `pd.read_json(file, lines=True)` then
+answers questions like "which metric fails most often".
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Any, Dict, Iterator, List, Optional
+import atexit
+import json
+import logging
+import math
+import time
+
+
+
+# ---------------------------------------------------------------------------
+# constants
+# ---------------------------------------------------------------------------
+
+# Maximum number of records of a log block (0 = unlimited), 'Log_Block_Max_Records' in ScreenerConfig.json
+DEFAULT_LOG_BLOCK_MAX_RECORDS = 0
+
+# Fields of a structured (JSONL) log record, besides time, level and message
+JSON_FIELDS = ("ticker", "stage", "metric", "value", "source", "elapsed")
+
+
+
+# ---------------------------------------------------------------------------
+# handler / listener
+# ---------------------------------------------------------------------------
+
+class _LogBlock:
+    """Records of one task, enqueued together."""
+
+    def __init__ (self, handler: "BlockQueueHandler", max_records: int, ticker: Optional[str] = None):
+        self.handler = handler
+        self.max_records = max_records
+        self.ticker = ticker
+        self.start = time.time()                 # Same clock as LogRecord.created
+        self.records: List[logging.LogRecord] = []
+
+    def append (self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+        if self.max_records and len(self.records) >= self.max_records:
+            self.flush()
+
+    def flush (self) -> None:
+        if self.records:
+            self.handler.enqueue(self.records)
+            self.records = []
+
+
+# Log block of the current task (None = records are enqueued one by one)
+_active_block: ContextVar[Optional[_LogBlock]] = ContextVar("active_log_block", default=None)
+
+# Stage of the current task (None = the function that logged)
+_active_stage: ContextVar[Optional[str]] = ContextVar("active_log_stage", default=None)
+
+# QueueHandler installed by start_queue_logging (None = logging not started, blocks are no-ops)
+_block_handler: Optional["BlockQueueHandler"] = None
+
+
+class BlockQueueHandler (QueueHandler):
+    """`QueueHandler` that collects the records of an active log block instead of enqueuing them."""
+
+    def emit (self, record: logging.LogRecord) -> None:
+        try:
+            block = _active_block.get()
+            _annotate(record, block)
+
+            # prepare(): message and traceback are rendered now, in the calling thread
+            prepared = self.prepare(record)
+            if block is None:
+                self.enqueue(prepared)
+            else:
+                block.append(prepared)
+        except Exception:
+            self.handleError(record)
+
+
+class BlockQueueListener (QueueListener):
+    """`QueueListener` that writes a log block (list of records) with one write per handler."""
+
+    def handle (self, record) -> None:
+        if not isinstance(record, list):
+            super().handle(record)
+            return
+
+        for handler in self.handlers:
+            records = [
+                block_record for block_record in record
+                if (not self.respect_handler_level or block_record.levelno >= handler.level) and handler.filter(block_record)
+            ]
+            if records:
+                _emit_block(handler, records)
+
+
+class JsonLineFormatter (logging.Formatter):
+    """One JSON object per record: time, level, `JSON_FIELDS` (null if not set) and message."""
+
+    def format (self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+        }
+        for field in JSON_FIELDS:
+            entry[field] = _json_value(getattr(record, field, None))
+        if entry["stage"] is None:
+            entry["stage"] = record.funcName
+        if entry["elapsed"] is not None:
+            entry["elapsed"] = round(entry["elapsed"], 4)
+
+        # Records of the queue carry the traceback in the message already (QueueHandler.prepare)
+        entry["message"] = record.getMessage()
+        if record.exc_info:
+            entry["message"] += "\n" + self.formatException(record.exc_info)
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+
+# ---------------------------------------------------------------------------
+# public API
+# ---------------------------------------------------------------------------
+
+def start_queue_logging (logger: Optional[logging.Logger] = None) -> QueueListener:
+    """
+    Replace the handlers of *logger* (default: root) by one `QueueHandler` and serve
+    the original handlers from a background `QueueListener` thread.
+
+    Parameters:
+        logger (logging.Logger): Logger whose handlers are moved behind the queue.
+
+    Returns:
+        QueueListener: The started listener - stop it with `stop_queue_logging` before `logging.shutdown()`.
+    """
+    global _block_handler
+
+    logger = logger or logging.getLogger()
+    handlers = list(logger.handlers)
+
+    log_queue: SimpleQueue = SimpleQueue()
+    for handler in handlers:
+        logger.removeHandler(handler)
+    _block_handler = BlockQueueHandler(log_queue)
+    logger.addHandler(_block_handler)
+
+    # respect_handler_level: the file / console levels of LoggingConfig.json still apply
+    listener = BlockQueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_queue_logging, listener)
+
+    return listener
+
+
+def stop_queue_logging (listener: QueueListener) -> None:
+    """Write all queued records and stop the listener thread (safe to call twice)."""
+    if listener._thread is not None:
+        listener.stop()
+
+
+def json_log_handler (file_name: str) -> logging.Handler:
+    """File handler of the structured log (one JSON object per line, file rewritten every run)."""
+    # Truncate once here and append afterwards: a handler reopened after close() must not wipe the run
+    open(file_name, "w", encoding="utf-8").close()
+    handler = logging.FileHandler(file_name, mode="a", encoding="utf-8")
+    handler.setFormatter(JsonLineFormatter())
+    return handler
+
+
+def metric_fields (metric: str, value: Any = None, source: Optional[str] = None) -> Dict[str, Any]:
+    """`extra` of a metric record: the metric, its raw value and its source in the structured log."""
+    return {"metric": metric, "value": value, "source": source}
+
+
+@contextmanager
+def log_stage (stage: str) -> Iterator[None]:
+    """Tag the records of the enclosed code with *stage* (structured log)."""
+    token = _active_stage.set(stage)
+    try:
+        yield
+    finally:
+        _active_stage.reset(token)
+
+
+@contextmanager
+def ticker_log_block (ticker: Optional[str] = None, max_records: int = DEFAULT_LOG_BLOCK_MAX_RECORDS) -> Iterator[None]:
+    """
+    Collect the log records of the enclosed task and write them as one contiguous block.
+
+    Parameters:
+        ticker (str): Ticker of the task, added to every record of the block.
+        max_records (int): Flush the block early once it holds this many records (0 = unlimited).
+    """
+    if _block_handler is None:
+        yield
+        return
+
+    block = _LogBlock(_block_handler, max_records, ticker)
+    token = _active_block.set(block)
+    try:
+        yield
+    finally:
+        _active_block.reset(token)
+        block.flush()
+
+
+
+# ---------------------------------------------------------------------------
+# internal helpers
+# ---------------------------------------------------------------------------
+
+def _annotate (record: logging.LogRecord, block: Optional[_LogBlock]) -> None:
+    """Add the ticker, elapsed time and stage of the current task to a record (`extra` values win)."""
+    if block is not None:
+        if getattr(record, "ticker", None) is None:
+            record.ticker = block.ticker
+        record.elapsed = record.created - block.start
+
+    stage = _active_stage.get()
+    if stage is not None and getattr(record, "stage", None) is None:
+        record.stage = stage
+
+
+def _json_value (value: Any) -> Any:
+    """JSON friendly field value: NaN / inf -> None, numpy scalars -> Python scalars."""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _emit_block (handler: logging.Handler, records: List[logging.LogRecord]) -> None:
+    """Format a block of records and write it with a single write (stream handlers) or record by record."""
+    stream = getattr(handler, "stream", None) if isinstance(handler, logging.StreamHandler) else None
+    if stream is None:
+        for record in records:
+            handler.handle(record)
+        return
+
+    handler.acquire()
+    try:
+        stream.write("".join(handler.format(record) + handler.terminator for record in records))
+        handler.flush()
+    except Exception:
+        handler.handleError(records[0])
+    finally:
+        handler.release()
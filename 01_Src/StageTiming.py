@@ -0,0 +1,226 @@
+# encoding: utf-8
+
+# Copyright (c) Ivan Antunović (ivantun05@gmail.com) - All rights reserved.
+# Unintended redistribution can be punishable by law.
+# By reading this message, you are automatically consenting to it
+# and you are accepting that the financial data might be incorrect.
+# The financial data generated by this script is for informational purposes only
+# and should not be considered as investment advice.
+# Use at your own risk.
+
+"""
+StageTiming.py - per-stage timing spans and the end-of-run performance report
+-------------------------------------------------------------------------------
+    with ticker_span(ticker):                       whole task of one ticker
+        with span("fetch.info", NETWORK):           network wait
+            stock.info
+        with span("metric.roe"):                    computation (default kind)
+            ...
+
+Every span records (ticker, stage, kind, seconds) - one `perf_counter` pair
+and one list append, so the instrumentation stays on for every run. The
+ticker comes from the enclosing `ticker_span`; spans outside a ticker
+(z-scoring, exports) are run-level stages. A span also tags the log records
+of its code with the stage (ScreenerLogging.log_stage).
+
+Stage times are inclusive: a network span inside a compute span (e.g. an
+Alpha Vantage fallback inside 'metric.earnings') counts for both stages. The
+network / compute split of the report is exact: network = sum of the network
+spans, compute = remaining task time.
+
+`build_performance_report` aggregates the spans of a run:
+
+    • p50 / p95 / max per stage (per-ticker totals of the stage)
+    • the slowest tickers with their network and compute time
+    • the share of the task time spent waiting on the network vs computing
+
+Task time is the sum of all ticker tasks and run-level stages over all worker
+threads, not wall time: with N fetch threads it is up to N times the wall
+time, so the shares are reported against it (a share of wall time would not
+add up to 100 %).
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import time
+import pandas as pd
+
+from ScreenerLogging import log_stage
+
+
+
+# ---------------------------------------------------------------------------
+# constants
+# ---------------------------------------------------------------------------
+
+# Kinds of a span
+NETWORK = "network"
+COMPUTE = "compute"
+TOTAL = "total"
+
+# Stage of the span around the whole task of one ticker
+TICKER_STAGE = "ticker"
+
+DEFAULT_TOP_N = 10
+PERCENTILES = (0.50, 0.95)
+
+SPAN_COLUMNS = ["Ticker", "Stage", "Kind", "Seconds"]
+
+
+
+# ---------------------------------------------------------------------------
+# recording
+# ---------------------------------------------------------------------------
+
+# (ticker, stage, kind, seconds) of all spans of the run - list.append is atomic, no lock needed
+_spans: List[Tuple[Optional[str], str, str, float]] = []
+
+# Ticker of the current task (None = run-level stage)
+_active_ticker: ContextVar[Optional[str]] = ContextVar("active_span_ticker", default=None)
+
+
+@contextmanager
+def span (stage: str, kind: str = COMPUTE) -> Iterator[None]:
+    """Time the enclosed code as *stage* of the current ticker (`NETWORK` or `COMPUTE`)."""
+    start = time.perf_counter()
+    try:
+        with log_stage(stage):
+            yield
+    finally:
+        _spans.append((_active_ticker.get(), stage, kind, time.perf_counter() - start))
+
+
+@contextmanager
+def ticker_span (ticker: str) -> Iterator[None]:
+    """Time the whole task of *ticker*; the spans inside it are recorded for this ticker."""
+    token = _active_ticker.set(ticker)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _spans.append((ticker, TICKER_STAGE, TOTAL, time.perf_counter() - start))
+        _active_ticker.reset(token)
+
+
+def recorded_spans () -> pd.DataFrame:
+    """All spans recorded so far (Ticker, Stage, Kind, Seconds)."""
+    return pd.DataFrame(list(_spans), columns=SPAN_COLUMNS)
+
+
+def reset_spans () -> None:
+    """Forget all recorded spans."""
+    _spans.clear()
+
+
+
+# ---------------------------------------------------------------------------
+# report
+# ---------------------------------------------------------------------------
+
+@dataclass
+class PerformanceReport:
+    """Timing summary of one run."""
+
+    stages: pd.DataFrame                # Stage, Kind, Count, Total, p50, p95, Max (seconds)
+    slowest_tickers: pd.DataFrame       # Ticker, Total, Network, Compute (seconds)
+    wall_time: Optional[float]          # Runtime of the program (seconds)
+    task_time: float                    # Sum of all ticker tasks and run-level stages (seconds)
+    network_time: float                 # Sum of all network spans (seconds)
+
+    @property
+    def network_share_of_task_time (self) -> float:
+        """Share of the task time (summed over threads, not wall time) spent waiting on the network."""
+        return self.network_time / self.task_time if self.task_time > 0 else 0.0
+
+    @property
+    def compute_share_of_task_time (self) -> float:
+        """Share of the task time (summed over threads, not wall time) spent computing."""
+        return 1.0 - self.network_share_of_task_time if self.task_time > 0 else 0.0
+
+    def to_dict (self) -> Dict[str, Any]:
+        """Machine-readable form of the report (JSON serialisable)."""
+        return {
+            "wall_time": self.wall_time,
+            "task_time": self.task_time,
+            "network_time": self.network_time,
+            "network_share_of_task_time": self.network_share_of_task_time,
+            "compute_share_of_task_time": self.compute_share_of_task_time,
+            "stages": json.loads(self.stages.to_json(orient="records")),
+            "slowest_tickers": json.loads(self.slowest_tickers.to_json(orient="records")),
+        }
+
+    def to_text (self) -> str:
+        """Human-readable report (console / log)."""
+        lines = ["Performance report"]
+        if self.wall_time is not None:
+            lines.append(f"    Wall time: {self.wall_time:.1f} s")
+        lines.append(f"    Task time: {self.task_time:.1f} s (sum over all threads) - "
+                     f"share of task time: network {self.network_share_of_task_time:.0%}, compute {self.compute_share_of_task_time:.0%}")
+        lines += ["", "Stages (seconds, per ticker):", _indent(self.stages.to_string(index=False, float_format="{:.3f}".format))]
+        if not self.slowest_tickers.empty:
+            lines += ["", "Slowest tickers (seconds):", _indent(self.slowest_tickers.to_string(index=False, float_format="{:.3f}".format))]
+        return "\n".join(lines)
+
+
+
+def build_performance_report (spans: pd.DataFrame, wall_time: Optional[float] = None,
+                              top_n: int = DEFAULT_TOP_N) -> PerformanceReport:
+    """
+    Aggregate the spans of a run.
+
+    Parameters:
+        spans (pd.DataFrame): Spans as returned by `recorded_spans`.
+        wall_time (float): Runtime of the program in seconds (reported as is).
+        top_n (int): Number of slowest tickers to report.
+
+    Returns:
+        PerformanceReport: Stage statistics, slowest tickers and the network / compute split.
+    """
+    stage_columns = ["Stage", "Kind", "Count", "Total"] + [_percentile_name(q) for q in PERCENTILES] + ["Max"]
+    ticker_columns = ["Ticker", "Total", "Network", "Compute"]
+
+    if spans.empty:
+        return PerformanceReport(pd.DataFrame(columns=stage_columns), pd.DataFrame(columns=ticker_columns), wall_time, 0.0, 0.0)
+
+    # One value per (ticker, stage): a stage entered several times for one ticker is summed
+    per_ticker = spans.groupby(["Ticker", "Stage", "Kind"], dropna=False, sort=False)["Seconds"].sum().reset_index()
+
+    grouped = per_ticker.groupby(["Stage", "Kind"], sort=False)["Seconds"]
+    stages = grouped.agg(Count="count", Total="sum", Max="max")
+    for q in PERCENTILES:
+        stages[_percentile_name(q)] = grouped.quantile(q)
+    stages = stages.reset_index()[stage_columns].sort_values("Total", ascending=False, ignore_index=True)
+
+    # Network / compute time of every ticker task
+    ticker_spans = spans[spans["Ticker"].notna()]
+    totals = ticker_spans[ticker_spans["Stage"] == TICKER_STAGE].groupby("Ticker")["Seconds"].sum()
+    network = ticker_spans[ticker_spans["Kind"] == NETWORK].groupby("Ticker")["Seconds"].sum().reindex(totals.index, fill_value=0.0)
+    tickers = pd.DataFrame({"Total": totals, "Network": network, "Compute": totals - network}).rename_axis("Ticker").reset_index()
+    slowest = tickers.nlargest(top_n, "Total").reset_index(drop=True)[ticker_columns]
+
+    # Task time: ticker tasks plus the run-level stages (z-scoring, exports)
+    run_level = spans[spans["Ticker"].isna()]
+    task_time = float(totals.sum() + run_level["Seconds"].sum())
+    network_time = float(spans.loc[spans["Kind"] == NETWORK, "Seconds"].sum())
+
+    return PerformanceReport(stages, slowest, wall_time, task_time, network_time)
+
+
+
+# ---------------------------------------------------------------------------
+# internal helpers
+# ---------------------------------------------------------------------------
+
+def _percentile_name (q: float) -> str:
+    """Column name of a percentile (0.95 -> 'p95')."""
+    return f"p{round(q * 100)}"
+
+
+def _indent (text: str) -> str:
+    """Indent every line of a table by four spaces."""
+    return "\n".join(f"    {line}" for line in text.splitlines())
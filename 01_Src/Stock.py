@@ -8,7 +8,7 @@
 # and should not be considered as investment advice.
 # Use at your own risk.
 
-from typing import Optional
+from typing import Dict, Optional
 
 class Stock():
 
@@ -19,12 +19,15 @@ class Stock():
         value_metrics: object,
         profitability_metrics: object,
         growth_metrics: object,
-        safety_metrics: object
+        safety_metrics: object,
+        industry: Optional[str] = None,
+        metric_sources: Optional[Dict[str, Optional[str]]] = None
     ):
 
         # Stock attributes
         self.ticker: str = ticker                                               # Stock ticker symbol
         self.sector: str = sector                                               # Sector of the stock (e.g., Technology, Healthcare, Financial Services, Industrials, etc.)
+        self.industry: Optional[str] = industry                                 # Industry of the stock (e.g., Semiconductors, Software - Infrastructure, etc.)
 
         # Financial metrics
         self.value_metrics: object = value_metrics                              # Value metrics (P/B, P/E, etc.)
@@ -32,7 +35,11 @@ class Stock():
         self.growth_metrics: object = growth_metrics                            # Profitability Growth metrics
         self.safety_metrics: object = safety_metrics                            # Safety metrics
 
+        # Source chosen by MetricSelector for every multi-source metric (e.g. {"ROE": "ttm (yFinance)"})
+        self.metric_sources: Dict[str, Optional[str]] = metric_sources or {}
+
         # Z-score results (will be set after calculation)
         self.value_z_score_result: Optional["ZScoreResult"] = None              # Value Z-score result (will be set after calculation)
         self.profitability_z_score_result: Optional["ZScoreResult"] = None      # Profitability Z-score result (will be set after calculation)
-        self.growth_z_score_result: Optional["ZScoreResult"] = None             # Growth Z-score result (will be set after calculation)
\ No newline at end of file
+        self.growth_z_score_result: Optional["ZScoreResult"] = None             # Growth Z-score result (will be set after calculation)
+        self.final_z_score: Optional[float] = None                              # Final cross-factor composite weighted by 'total_weight' (will be set after calculation)
\ No newline at end of file
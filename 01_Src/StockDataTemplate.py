@@ -10,11 +10,14 @@
 # and should not be considered as investment advice.
 # Use at your own risk.
 
+import math
+
 
 STOCK_DATA_TEMPLATE = {
     "Company": None,
     "Country": None,  # Added country field
     "Original Weight": None,
+    "Z-Score Final": None,
     "Market Cap (in Billions)": None,
     "P/E (Forward)": None,
     "P/E (Trailing)": None,
@@ -37,36 +40,42 @@ STOCK_DATA_TEMPLATE = {
     "GPOA (ttm) (%)": None,
     "GPMAR (ttm) (%)": None,
     "Profit Margin (%)": None,
+    "Z-Score Profitability": None,
+    "Z-Score Growth": None,
     "Sector": None,
     "Industry": None
 }
 
+# Numeric columns of invalid tickers are NaN (rendered as "N/A" by the exporters)
 INVALID_TICKER_TEMPLATE = {
     "Company": None,  # to be set to ticker
     "Country": None,  # to be set to country
     "Original Weight": None,  # to be set to weight
-    "Market Cap (in Billions)": "Invalid Ticker!",
-    "P/E (Forward)": "N/A",
-    "P/E (Trailing)": "N/A",
-    "P/B": "N/A",
-    "EBIT/TEV (%)": "N/A",
-    "TEV (in Billions)": "N/A",
-    "Z-Score Value": "N/A",
-    "EPS (latest)": "N/A",
-    "EVAR - EPS (%)": "N/A",
-    "EVAR - Net Income (%)": "N/A",
-    "CAGR - EPS (%)": "N/A",
-    "CAGR - Net Income (%)": "N/A",
-    "Dividend Yield (%)": "N/A",
-    "ROE (ttm) - yFinance (%)": "N/A",
-    "ROE (ttm) - Calc (%)": "N/A",
-    "ROA - yFinance (%)": "N/A",
-    "ROA - Calc (%)": "N/A",
-    "CFOA (annual) (%)": "N/A",
-    "CFOA (ttm) (%)" : "N/A",
-    "GPOA (ttm) (%)": "N/A",
-    "GPMAR (ttm) (%)": "N/A",
-    "Profit Margin (%)": "N/A",
+    "Z-Score Final": math.nan,
+    "Market Cap (in Billions)": math.nan,
+    "P/E (Forward)": math.nan,
+    "P/E (Trailing)": math.nan,
+    "P/B": math.nan,
+    "EBIT/TEV (%)": math.nan,
+    "TEV (in Billions)": math.nan,
+    "Z-Score Value": math.nan,
+    "EPS (latest)": math.nan,
+    "EVAR - EPS (%)": math.nan,
+    "EVAR - Net Income (%)": math.nan,
+    "CAGR - EPS (%)": math.nan,
+    "CAGR - Net Income (%)": math.nan,
+    "Dividend Yield (%)": math.nan,
+    "ROE (ttm) - yFinance (%)": math.nan,
+    "ROE (ttm) - Calc (%)": math.nan,
+    "ROA - yFinance (%)": math.nan,
+    "ROA - Calc (%)": math.nan,
+    "CFOA (annual) (%)": math.nan,
+    "CFOA (ttm) (%)" : math.nan,
+    "GPOA (ttm) (%)": math.nan,
+    "GPMAR (ttm) (%)": math.nan,
+    "Profit Margin (%)": math.nan,
+    "Z-Score Profitability": math.nan,
+    "Z-Score Growth": math.nan,
     "Sector": "N/A",
     "Industry": "N/A"
 }
@@ -13,6 +13,7 @@
 import datetime
 import os
 import json
+import argparse
 import logging
 import logging.config
 from dataclasses import dataclass    # Data Class
@@ -26,10 +27,6 @@ from datetime import datetime        # Manipulating dates and times
 # Data Manipulation Modules
 import pandas as pd
 
-# MS Excel Moduels
-from openpyxl import Workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
-
 # Finance Metrics Modules
 import yfinance as yf                # CHANGELOG: https://github.com/ranaroussi/yfinance/blob/main/CHANGELOG.rst
 
@@ -47,13 +44,25 @@ from ProfitabilityCalculator import (
     ROE,
     ROA
 )
+from ScreenerLogging import DEFAULT_LOG_BLOCK_MAX_RECORDS, start_queue_logging, stop_queue_logging, ticker_log_block, json_log_handler, metric_fields
+from StageTiming import span, ticker_span, recorded_spans, build_performance_report, NETWORK, DEFAULT_TOP_N
 from StockDataTemplate import STOCK_DATA_TEMPLATE, INVALID_TICKER_TEMPLATE
 from ZScoreCalculator import (
-    calc_value_z_scores,
-    calc_profitability_z_scores,
-    calc_growth_z_scores,
+    calc_factor_z_scores,
+    FACTOR_RESULT_ATTR,
 )
 
+from WeightScenarios import run_weight_scenarios, validate_weight_scenarios
+from OutputWriter import generate_output_name, atomic_write, write_outputs, copy_writers, GEN_DIR_NAME
+from ExcelExporter import write_stock_table, write_workbook, build_factor_details, SUMMARY_SHEET_TITLE
+from HtmlReport import write_html_report, DEFAULT_PAGE_SIZE, DEFAULT_HISTOGRAM_BINS
+from ResultStream import ResultStreamWriter, completed_tickers, load_result_stream, STREAM_FORMATS, DEFAULT_STREAM_FORMAT
+from RunHistory import RunHistoryStore, DEFAULT_DATABASE
+from ArrowExporter import build_result_frame as build_run_frame, build_result_table, write_result_table, ARROW_FORMATS, DEFAULT_ARROW_FORMAT, DEFAULT_COMPRESSION
+from RunDiff import build_snapshot, write_snapshot, read_snapshot, find_previous_snapshot, diff_runs, SNAPSHOT_SUFFIX, DEFAULT_COMPOSITE_THRESHOLD, DEFAULT_MIN_RANK_MOVE
+from FactorCorrelation import build_correlation_report, DEFAULT_CORRELATION_THRESHOLD, DEFAULT_MIN_OBSERVATIONS
+from PortfolioSelector import build_portfolio
+
 import MetricSelector as metricSelector
 
 from EarningsEngine import (
@@ -104,23 +113,73 @@ class __ProgramInfo__:
 CPU_COUNT = os.cpu_count() or 1
 MAX_WORKERS = max (1, CPU_COUNT - 1)
 
+# Financial statements of a yfinance Ticker read by the metric calculations - fetched up front
+# (yfinance caches them on the Ticker), so the network wait is timed per statement
+YF_STATEMENTS = (
+    "financials",
+    "quarterly_financials",
+    "balance_sheet",
+    "quarterly_balance_sheet",
+    "cashflow",
+    "quarterly_cashflow",
+)
+
+# Factor block (ScreenerConfig.json) -> output column of its composite z-score
+FACTOR_COLUMN_NAMES = {
+    "ValueFactor": "Z-Score Value",
+    "ProfitabilityFactor": "Z-Score Profitability",
+    "ProfitabilityGrowthFactor": "Z-Score Growth",
+}
+
 
 # ---------------------- Setup logging ----------------------
 
 SCRIPT_NAME = os.path.basename(__file__).replace('.py', '')
 SCRIPT_CONFIG_FILE = "ScreenerConfig.json"
 LOG_FILE = f"{SCRIPT_NAME}.log"
+JSON_LOG_FILE = f"{SCRIPT_NAME}.jsonl"
 LOG_CONFIG_FILE = "LoggingConfig.json"
 
+# Level of the root logger ('--log-level'), below WARNING the per-ticker diagnostics are formatted and written
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+DEFAULT_LOG_LEVEL = "WARNING"
 
-def config_logging ( ):
+# Disclaimer, start-up banner and runtime: own logger at INFO, written whatever '--log-level' is
+# (a record of a child logger reaches the root handlers regardless of the root logger level)
+NOTICE_LOGGER = logging.getLogger (f"{SCRIPT_NAME}.notice")
+NOTICE_LOGGER.setLevel (logging.INFO)
+
+
+def parse_arguments (argv=None):
+    """ Parse the command line arguments
+
+            Parameters:
+                argv (list): Arguments (default: sys.argv)
+
+            Returns:
+                argparse.Namespace: Parsed arguments
+
+    """
+    parser = argparse.ArgumentParser(description="Stock factor screener.")
+    parser.add_argument("--log-level", default=DEFAULT_LOG_LEVEL, type=str.upper, choices=LOG_LEVELS,
+                        help=f"Level of the log file and the console (default: {DEFAULT_LOG_LEVEL}, use INFO or DEBUG for the per-ticker details)")
+    parser.add_argument("--json-log", nargs="?", const=JSON_LOG_FILE, default=None, metavar="FILE",
+                        help=f"Also write a structured log, one JSON object per record (default file: {JSON_LOG_FILE})")
+
+    return parser.parse_args(argv)
+
+
+def config_logging ( log_level=DEFAULT_LOG_LEVEL, json_log_file=None ):
     """ Configure the logger
 
             Parameters:
-                None
+                log_level (str): Level of the root logger (records below it are discarded before formatting)
+                json_log_file (str): Structured log file (JSONL), None = no structured log
 
             Returns:
                 o_log_file_path (str): Path to the current Log File
+                o_log_listener (QueueListener): Listener writing the queued records, stop it (stop_queue_logging)
+                                                before logging.shutdown() so that no queued record is lost
 
     """
     o_log_file_path = LOG_FILE
@@ -140,9 +199,19 @@ def config_logging ( ):
         # Takes the logging configuration from a dictionary.
         logging.config.dictConfig ( logging_config )
 
+    # Messages below the level are dropped by the logger itself, before any message is formatted
+    logging.getLogger().setLevel ( log_level )
+
+    # Optional structured log next to the text log (same records, same level)
+    if json_log_file:
+        logging.getLogger().addHandler ( json_log_handler ( json_log_file ) )
 
-    # Return the currently used Log File Path
-    return o_log_file_path
+    # Workers only enqueue their records, one background thread formats and writes them
+    o_log_listener = start_queue_logging ()
+
+
+    # Return the currently used Log File Path and the listener of the log queue
+    return o_log_file_path, o_log_listener
 
 
 
@@ -159,7 +228,7 @@ def print_disclaimer():
     and should not be considered as investment advice.
     Use at your own risk.
     """
-    logging.info(disclaimer_message)
+    NOTICE_LOGGER.info(disclaimer_message)
 
 
 
@@ -168,6 +237,12 @@ def load_config (config_file='ScreenerConfig.json'):
     try:
         with open(config_file, 'r') as f:
             config = json.load(f)
+
+        # Fail before the fetch, not after the Excel file is written
+        scenario_cfg = config.get("WeightScenarios", {})
+        if scenario_cfg.get("enabled", False):
+            validate_weight_scenarios (scenario_cfg, config)
+
         return config
     except Exception as ex:
         logging.error(f"Error loading config file!")
@@ -188,7 +263,8 @@ def is_valid_ticker (symbol: str) -> bool:
     """
     try:
 
-        last_price = yf.Ticker(symbol).fast_info["last_price"]
+        with span ("fetch.validate", NETWORK):
+            last_price = yf.Ticker(symbol).fast_info["last_price"]
 
         if last_price:
             return True
@@ -322,98 +398,389 @@ def calc_profitability_growth (ticker, eps_list, gpoa_list, roe_list, roa_list,
 
 
 
+def as_number (value):
+    """
+    Numeric value for the result rows, NaN if it is missing.
+
+    The result rows keep raw numbers; rounding, percent scaling and "N/A"
+    rendering are done by the exporters (see ExcelExporter.to_display_units).
+
+    Parameters:
+        - value: Metric value (may be None, NaN or a non-numeric string like 'Infinity').
+
+    Returns:
+        - float: The value as float or NaN.
+    """
+    try:
+        return math.nan if value is None else float(value)
+    except (ValueError, TypeError):
+        return math.nan
+
+
+
+def add_portfolio_columns (stock_data, portfolio):
+    """
+    Add the portfolio rank and target weight of every ticker to the output and log the sector exposure.
+
+    Parameters:
+        - stock_data (dict): Output rows per ticker.
+        - portfolio (PortfolioSelection): Selected tickers and target weights.
+    """
+    portfolio_ranks = {ticker: rank for rank, ticker in enumerate(portfolio.tickers, 1)}
+    target_weights = dict(zip(portfolio.tickers, portfolio.target_weights))
+
+    for ticker, stock_data_entry in stock_data.items():
+        stock_data_entry["Portfolio Rank"] = portfolio_ranks.get(ticker, math.nan)
+        stock_data_entry["Target Weight (%)"] = target_weights.get(ticker, 0.0) / 100.0
+
+    # Sector diversification of the target portfolio
+    for sector, sector_weight in portfolio.sector_exposure().items():
+        logging.info(f"Portfolio sector exposure - {sector}: {sector_weight:.2f} %")
+
+
+
+def sort_by_final_score (tickers, stocks_by_ticker):
+    """
+    Sort tickers by their final composite z-score, best first.
+
+    Tickers without a final score (invalid tickers, missing data) keep their
+    relative order and are placed at the end.
+
+    Parameters:
+        - tickers (list): Ticker symbols.
+        - stocks_by_ticker (dict): Stock object per ticker.
+
+    Returns:
+        - list: Sorted ticker symbols.
+    """
+    def final_score_key (ticker):
+        final_z_score = getattr(stocks_by_ticker.get(ticker), "final_z_score", None)
+        is_missing = final_z_score is None or math.isnan(final_z_score)
+        return (is_missing, 0.0 if is_missing else -final_z_score)
+
+    # sorted() is stable, i.e. equal keys keep the input order
+    return sorted(tickers, key=final_score_key)
+
+
+
 # Function to generate excel file name
 def generate_file_name (config):
 
-    # Save the file to the 'gen' directory
-    # If the directory does not exist, create it
-    # The file name shall be using relative path,
-    # relative to the Script's directory
+    # Save the file to the 'gen' directory (relative to the Script's directory, created if needed):
+    # gen/<YYYY-MM-DD>_<Output_Excel_Filename>[_<n>].xlsx, the counter is incremented for every run of the day
+    return generate_output_name (config['Output_Excel_Filename'], GEN_DIR_NAME)
+
 
-    GEN_DIR_NAME = "gen"
 
-    # Check if the 'gen' directory exists (relative to the Script's directory)
-    if not os.path.exists(GEN_DIR_NAME):
-        os.makedirs(GEN_DIR_NAME)
+def open_result_stream (config, stream_cfg):
+    """
+    Open the incremental per-ticker result file ('ResultStream' configuration block).
 
-    # Get the base name of the file from the configuration
-    FILE_BASE_NAME = config['Output_Excel_Filename']
+    A configured 'resume_file' (stream file of an interrupted run) is appended to,
+    otherwise a new file gen/<date>_<Output_Excel_Filename>_Stream.<format> is created.
 
-    # Get the current date
+    Parameters:
+        - config (dict): Screener configuration.
+        - stream_cfg (dict): 'ResultStream' configuration block.
 
-    # Get the current date
-    date_str = datetime.now().strftime("%Y-%m-%d")
+    Returns:
+        - ResultStreamWriter: Open stream file.
+    """
+    file_format = stream_cfg.get("format", DEFAULT_STREAM_FORMAT)
+    file_name = stream_cfg.get("resume_file") or generate_output_name (
+        f"{config['Output_Excel_Filename']}_Stream",
+        GEN_DIR_NAME,
+        STREAM_FORMATS.get(file_format, "")
+    )
 
-    # Generate the final file name using the gen directory, and the date
-    file_name_final = f"{GEN_DIR_NAME}\\{date_str}_{FILE_BASE_NAME}.xlsx"
+    logging.info(f"Streaming the results to {file_name}.")
 
-    # Check if the file already exists, and increment the filename if it does
-    file_counter = 1
-    while os.path.exists(file_name_final):
-        file_name_final = f"{GEN_DIR_NAME}\\{date_str}_{FILE_BASE_NAME}_{file_counter}.xlsx"
-        file_counter += 1
+    return ResultStreamWriter (file_name, file_format)
 
-    return file_name_final
 
 
+# Function to build the result table of all tickers (shared by all exporters)
+def build_result_frame (stock_data, stock_factor_metrics_list, tickers_and_weights):
 
-# Function to save data to excel file
-def save_to_excel (stock_data, stock_factor_metrics_list, tickers_and_weights, config):
+    # Find the corresponding Stock object of every ticker
+    stocks_by_ticker = {stock.ticker: stock for stock in stock_factor_metrics_list}
 
-    # Generate the file name with today's date
-    file_name = generate_file_name (config)
+    # Reorder stock_data by the final composite z-score, tickers without a score follow in the order of tickers_and_weights
+    tickers_ordered = [ticker_data["ticker"] if isinstance(ticker_data, dict) else ticker_data[0] for ticker_data in tickers_and_weights]
+    tickers_ordered = sort_by_final_score (tickers_ordered, stocks_by_ticker)
 
-    # Reorder stock_data to match tickers_and_weights
     ordered_stock_data = {}
-    for ticker_data in tickers_and_weights:
-        ticker_current = ticker_data["ticker"] if isinstance(ticker_data, dict) else ticker_data[0]
+    for ticker_current in tickers_ordered:
         if ticker_current in stock_data:
 
-            # Find the corresponding Stock object
-            stock_obj = next((stock for stock in stock_factor_metrics_list if stock.ticker == ticker_current), None)
+            stock_obj = stocks_by_ticker.get(ticker_current)
             if stock_obj and stock_obj.value_z_score_result:
                 composite_score = stock_obj.value_z_score_result.composite
             else:
-                composite_score = "N/A"
+                composite_score = None
             # Add composite score to the output dictionary
-            stock_data[ticker_current]["Value Composite Z-Score"] = (
-                '{:,.2f}'.format(composite_score) if composite_score is not None and not isinstance(composite_score, str) and not math.isnan(composite_score) else "N/A"
-            )
+            stock_data[ticker_current]["Value Composite Z-Score"] = as_number (composite_score)
 
             # Add the stock object to the stock_data dictionary
             ordered_stock_data[ticker_current] = stock_data[ticker_current]
 
     # Convert the data to a pandas DataFrame
-    df = pd.DataFrame.from_dict(ordered_stock_data, orient='index')
+    return pd.DataFrame.from_dict(ordered_stock_data, orient='index')
+
+
+
+# Function to save data to excel file
+def save_to_excel (results_df, config, detail_sheets=None):
+
+    # Generate the file name with today's date
+    file_name = generate_file_name (config)
+
+    if detail_sheets:
+        # Summary sheet plus one detail sheet per factor block (same ticker order), all streamed
+        sheets = {SUMMARY_SHEET_TITLE: results_df}
+        sheets.update({factor: detail_df.reindex(results_df.index.astype(str)) for factor, detail_df in detail_sheets.items()})
+        writers = {file_name: lambda path: write_workbook (path, sheets)}
+    else:
+        # Stream the ETF header block and the table into the Excel file (single pass, write-only workbook)
+        writers = {file_name: lambda path: write_stock_table (path, results_df)}
+
+    # Optional CSV / JSON copies of the same result table, written concurrently with the Excel file
+    writers.update(copy_writers (results_df, os.path.splitext(file_name)[0], config.get("Output_Copies", [])))
+
+    # Every file is written to a temporary file and renamed into place when complete
+    write_outputs (writers)
+
+    return file_name
+
+
+
+def save_weight_scenarios (factor_scores, scenario_cfg, excel_file_name):
+    """
+    Evaluate all configured weight scenarios on the existing z-score matrix and save
+    their weights and top ranked tickers next to the Excel file.
+
+    Parameters:
+        - factor_scores (FactorScoreMatrix): Result of the z-score calculation.
+        - scenario_cfg (dict): 'WeightScenarios' configuration block.
+        - excel_file_name (str): File name of the main Excel output.
+
+    Returns:
+        - str: File name of the scenario output.
+    """
+    scenario_start_time = time.perf_counter()
+
+    scenario_result = run_weight_scenarios (factor_scores, scenario_cfg)
+
+    logging.info(f"Evaluated {scenario_result.weights.shape[0]} weight scenarios ({scenario_result.factor}) in {time.perf_counter() - scenario_start_time:.3f} s.")
+
+    scenario_file_name = f"{os.path.splitext(excel_file_name)[0]}_Scenarios.xlsx"
+    atomic_write (scenario_file_name, lambda path: scenario_result.to_frame(scenario_cfg.get("top_n", 20)).to_excel(path))
+
+    return scenario_file_name
+
+
+
+def save_html_report (results_df, html_cfg, excel_file_name):
+    """
+    Save a static HTML report (sector exposure, score distributions, sortable and
+    paginated result table) next to the Excel file.
+
+    Parameters:
+        - results_df (pd.DataFrame): Result table (index = ticker).
+        - html_cfg (dict): 'HtmlReport' configuration block.
+        - excel_file_name (str): File name of the main Excel output.
+
+    Returns:
+        - str: File name of the HTML report.
+    """
+    html_start_time = time.perf_counter()
+
+    base_name = os.path.splitext(excel_file_name)[0]
+    html_file_name = f"{base_name}.html"
+
+    atomic_write (html_file_name, lambda path: write_html_report (
+        path,
+        results_df,
+        f"Stock Factor Screener - {os.path.basename(base_name)}",
+        int(html_cfg.get("page_size", DEFAULT_PAGE_SIZE)),
+        int(html_cfg.get("histogram_bins", DEFAULT_HISTOGRAM_BINS))
+    ))
+
+    logging.info(f"Saved HTML report {html_file_name} in {time.perf_counter() - html_start_time:.3f} s.")
+
+    return html_file_name
+
+
+
+def save_arrow_results (results_df, factor_scores, config, arrow_cfg, excel_file_name):
+    """
+    Save the complete run (result table, metric raw values, z-scores, composites and
+    run metadata) as columnar Parquet / Arrow file next to the Excel file.
+
+    Parameters:
+        - results_df (pd.DataFrame): Result table (index = ticker).
+        - factor_scores (FactorScoreMatrix): Result of the z-score calculation.
+        - config (dict): Screener configuration (stored as run metadata).
+        - arrow_cfg (dict): 'ArrowExport' configuration block.
+        - excel_file_name (str): File name of the main Excel output.
+
+    Returns:
+        - str: File name of the columnar output.
+    """
+    file_format = arrow_cfg.get("format", DEFAULT_ARROW_FORMAT)
+    arrow_file_name = f"{os.path.splitext(excel_file_name)[0]}{ARROW_FORMATS.get(file_format, '')}"
+
+    table = build_result_table (results_df, factor_scores, config)
+    atomic_write (arrow_file_name, lambda path: write_result_table (path, table, file_format, arrow_cfg.get("compression", DEFAULT_COMPRESSION)))
+
+    logging.info(f"Saved {table.num_rows} x {table.num_columns} result table to {arrow_file_name}.")
+
+    return arrow_file_name
+
+
+
+def save_run_history (results_df, factor_scores, config, history_cfg, excel_file_name):
+    """
+    Append the run (every number of the result table, metric raw values, z-scores and
+    composites) to the SQLite run history in one transaction.
+
+    Parameters:
+        - results_df (pd.DataFrame): Result table (index = ticker).
+        - factor_scores (FactorScoreMatrix): Result of the z-score calculation.
+        - config (dict): Screener configuration (stored with the run).
+        - history_cfg (dict): 'RunHistory' configuration block.
+        - excel_file_name (str): File name of the main Excel output.
+
+    Returns:
+        - int: run_id of the stored run.
+    """
+    history_start_time = time.perf_counter()
+
+    run_date = datetime.now()
+    result_frame = build_run_frame (results_df, factor_scores, run_date.strftime("%Y-%m-%dT%H-%M-%S"), run_date)
+
+    with RunHistoryStore (history_cfg.get("database", DEFAULT_DATABASE)) as store:
+        run_id = store.append_run (result_frame, run_date, excel_file_name, config)
+
+    logging.info(f"Stored run {run_id} in the run history in {time.perf_counter() - history_start_time:.3f} s.")
+
+    return run_id
+
+
+
+def save_run_diff (results_df, stock_factor_metrics_list, diff_cfg, excel_file_name):
+    """
+    Compare the run with the previous one (rank moves, composite deltas, new / dropped
+    tickers, metric source changes) and save the snapshot of this run for the next diff.
+
+    Parameters:
+        - results_df (pd.DataFrame): Result table (index = ticker).
+        - stock_factor_metrics_list (list): Stock objects of the run (metric sources).
+        - diff_cfg (dict): 'RunDiff' configuration block.
+        - excel_file_name (str): File name of the main Excel output.
 
-    # Prepare the workbook
-    wb = Workbook()
-    worksheet = wb.active
-    if worksheet is None:
-        worksheet = wb.create_sheet(title="Sheet1")
+    Returns:
+        - str: File name of the diff output, None for the first run.
+    """
+    diff_start_time = time.perf_counter()
+
+    base_name = os.path.splitext(excel_file_name)[0]
+    snapshot_file_name = f"{base_name}{SNAPSHOT_SUFFIX}"
+
+    snapshot = build_snapshot (results_df, {stock.ticker: stock.metric_sources for stock in stock_factor_metrics_list})
+    previous_file_name = find_previous_snapshot (excel_file_name, exclude=snapshot_file_name)
+    atomic_write (snapshot_file_name, lambda path: write_snapshot (path, snapshot))
+
+    if previous_file_name is None:
+        logging.info("No previous run snapshot found - run diff skipped.")
+        return None
+
+    report = diff_runs (
+        snapshot,
+        read_snapshot (previous_file_name),
+        previous_file_name,
+        float(diff_cfg.get("composite_threshold", DEFAULT_COMPOSITE_THRESHOLD)),
+        int(diff_cfg.get("min_rank_move", DEFAULT_MIN_RANK_MOVE))
+    )
+
+    logging.info(f"Run diff against {previous_file_name}: {len(report.changes)} changed, {len(report.new_tickers)} new, "
+                 f"{len(report.dropped_tickers)} dropped tickers, {len(report.source_changes)} source changes "
+                 f"({time.perf_counter() - diff_start_time:.3f} s).")
 
-    # Insert the ETF and Total Investment headers at the top
-    worksheet['A1'] = "ETF"
-    worksheet['B1'] = "MSCI World Momentum Index"
-    worksheet['A2'] = "Total Investment"
-    worksheet['B2'] = "1.000,00 €"
+    def write_diff_excel (path):
+        with pd.ExcelWriter(path) as writer:
+            report.changes.to_excel(writer, sheet_name="Changes")
+            report.source_changes.to_excel(writer, sheet_name="Source Changes", index=False)
 
-    # Add hyperlink to "S&P SmallCap Quality"
-    worksheet['B1'].hyperlink = "https://www.ishares.com/uk/individual/en/products/270051/ishares-msci-world-momentum-factor-ucits-etf?switchLocale=y&siteEntryPassthrough=true"
+    def write_diff_json (path):
+        with open(path, "w", encoding="utf-8") as diff_json_file:
+            json.dump(report.to_dict(), diff_json_file, indent=2, ensure_ascii=False)
+
+    diff_file_name = f"{base_name}_Diff.xlsx"
+    write_outputs ({diff_file_name: write_diff_excel, f"{base_name}_Diff.json": write_diff_json})
+
+    return diff_file_name
+
+
+
+def save_correlation_report (factor_scores, correlation_cfg, excel_file_name):
+    """
+    Compute the pairwise correlation of all metric z-scores, log the redundant pairs
+    and save the matrix and the flagged pairs next to the Excel file.
+
+    Parameters:
+        - factor_scores (FactorScoreMatrix): Result of the z-score calculation.
+        - correlation_cfg (dict): 'CorrelationReport' configuration block.
+        - excel_file_name (str): File name of the main Excel output.
 
-    # Set column widths for better formatting
-    worksheet.column_dimensions['A'].width = 20
-    worksheet.column_dimensions['B'].width = 30
+    Returns:
+        - str: File name of the correlation output.
+    """
+    correlation_start_time = time.perf_counter()
+
+    threshold = float(correlation_cfg.get("threshold", DEFAULT_CORRELATION_THRESHOLD))
+    report = build_correlation_report (factor_scores, threshold, int(correlation_cfg.get("min_observations", DEFAULT_MIN_OBSERVATIONS)))
+
+    logging.info(f"Correlated {len(report.labels)} metrics in {time.perf_counter() - correlation_start_time:.3f} s.")
+    for row in report.flagged.itertuples(index=False):
+        logging.warning(f"Redundant metrics: {row[0]} / {row[1]} (correlation {row[2]:.2f}, {row[3]} tickers)")
+
+    correlation_file_name = f"{os.path.splitext(excel_file_name)[0]}_Correlation.xlsx"
+    def write_correlation_excel (path):
+        with pd.ExcelWriter(path) as writer:
+            report.flagged.to_excel(writer, sheet_name=f"Above {threshold:g}", index=False)
+            report.to_frame().to_excel(writer, sheet_name="Correlation Matrix")
+
+    atomic_write (correlation_file_name, write_correlation_excel)
+
+    return correlation_file_name
+
+
+
+def save_performance_report (performance_cfg, excel_file_name, wall_time):
+    """
+    Aggregate the timing spans of the run, print the report and save it next to the Excel file.
+
+    Parameters:
+        - performance_cfg (dict): 'PerformanceReport' configuration block.
+        - excel_file_name (str): File name of the main Excel output.
+        - wall_time (float): Runtime of the program so far in seconds.
+
+    Returns:
+        - str: File name of the performance report (JSON).
+    """
+    report = build_performance_report (recorded_spans (), wall_time, int(performance_cfg.get("top_n", DEFAULT_TOP_N)))
 
-    # Append the DataFrame to the Excel worksheet
-    for r_idx, row in enumerate(dataframe_to_rows(df, index=True, header=True), 4):
-        worksheet.append(row)
+    print(report.to_text())
 
-    # Save the data to the Excel file
-    df.to_excel(file_name)
+    performance_file_name = f"{os.path.splitext(excel_file_name)[0]}_Performance.json"
+    def write_performance_json (path):
+        with open(path, "w", encoding="utf-8") as performance_file:
+            json.dump(report.to_dict(), performance_file, indent=1)
 
-    # Show the first few rows of the DataFrame
-    df.head()
+    atomic_write (performance_file_name, write_performance_json)
+
+    return performance_file_name
 
 
 
@@ -423,31 +790,28 @@ def calc_value_metrics (stock, ticker):
 
         # fetch Forward P/E ratio
         forwardPE = stock.info.get("forwardPE", None)
-        forwardPE_rnd = round(forwardPE, 2) if forwardPE is not None else "N/A"
-        logging.info(f"P/E (Forward) (Ticker: {ticker}): {forwardPE_rnd}")
 
         # fetch Trailing P/E ratio
         trailingPE = stock.info.get("trailingPE", None)
-        trailingPE_rnd = "N/A" if trailingPE in (None, 'Infinity') else round(float(trailingPE), 2)
-
-        logging.info(f"P/E (Trailing) (Ticker: {ticker}): {trailingPE_rnd}")
-
 
         # -------------- EBIT/TEV Ratio --------------
 
         ebit_to_tev, enterprise_value = get_ebit_to_tev (stock, ticker)
-        ebit_to_tev_perc = round(ebit_to_tev * 100, 2) if ebit_to_tev is not None else None
-        if ebit_to_tev_perc is not None:
-            logging.info(f"EBIT/TEV (Ticker: {ticker}): {ebit_to_tev_perc} %")
-        else:
-            logging.info(f"EBIT/TEV (Ticker: {ticker}): N/A")
 
         # -------------- P/B Ratio --------------
 
         # fetch P/B ratio
         pb_ratio = stock.info.get("priceToBook", None)
-        pb_ratio_rnd = round(pb_ratio, 2) if pb_ratio is not None else None
-        logging.info(f"P/B (Ticker: {ticker}): {pb_ratio_rnd}")
+
+        # Diagnostics only - skipped (no rounding, no formatting) below INFO
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info("P/E (Forward) (Ticker: %s): %s", ticker, "N/A" if forwardPE is None else round(forwardPE, 2), extra=metric_fields("P/E (Forward)", forwardPE))
+            logging.info("P/E (Trailing) (Ticker: %s): %s", ticker, "N/A" if trailingPE in (None, 'Infinity') else round(float(trailingPE), 2), extra=metric_fields("P/E (Trailing)", trailingPE))
+            if ebit_to_tev is not None:
+                logging.info("EBIT/TEV (Ticker: %s): %.2f %%", ticker, ebit_to_tev * 100, extra=metric_fields("EBIT/TEV", ebit_to_tev))
+            else:
+                logging.info("EBIT/TEV (Ticker: %s): N/A", ticker, extra=metric_fields("EBIT/TEV"))
+            logging.info("P/B (Ticker: %s): %s", ticker, None if pb_ratio is None else round(pb_ratio, 2), extra=metric_fields("P/B", pb_ratio))
 
         # -------------- Value Metrics Data --------------
 
@@ -466,6 +830,9 @@ def calc_value_metrics (stock, ticker):
 
 def calc_earnings_metrics (stock, ticker, config):
 
+    # Diagnostics only - skipped below INFO (no rounding, no formatting, no structured log fields)
+    log_info = logging.getLogger().isEnabledFor(logging.INFO)
+
     # -------------- 1. Get Earnings (EPS) Data --------------
     earnings_data = None
 
@@ -482,10 +849,9 @@ def calc_earnings_metrics (stock, ticker, config):
             config['AlphaVantage']['Base_URL'],
         )
 
-        eps_latest_rnd = round (eps_list[0], 2) if eps_list is not None else None
-        if eps_list:
-            logging.info(f"Fetched Earnings data (EPS) for {len(eps_list)} years period (Ticker: {ticker}).")
-            logging.info(f"EPS (latest) (Ticker: {ticker}): {(eps_latest_rnd)}")
+        if eps_list and log_info:
+            logging.info("Fetched Earnings data (EPS) for %d years period (Ticker: %s).", len(eps_list), ticker)
+            logging.info("EPS (latest) (Ticker: %s): %s", ticker, None if eps_list[0] is None else round(eps_list[0], 2), extra=metric_fields("EPS", eps_list[0]))
 
         # 1.2 Calculate EPS Growth Year-on-Year (YoY) for each year
         eps_growth_list = calc_earnings_growth (
@@ -494,7 +860,7 @@ def calc_earnings_metrics (stock, ticker, config):
         )
 
     except Exception as e:
-        logging.error(f"Error fetching Earnings (EPS) for {ticker}: {e}")
+        logging.error("Error fetching Earnings (EPS) for %s: %s", ticker, e, extra=metric_fields("EPS"))
         eps_list = None
         eps_growth_list = None
 
@@ -513,8 +879,8 @@ def calc_earnings_metrics (stock, ticker, config):
             config['AlphaVantage']['Base_URL'],
         )
 
-        if net_income_list:
-            logging.info(f"Fetched Earnings data (Net Income) for {len(net_income_list)} years period (Ticker: {ticker}).")
+        if net_income_list and log_info:
+            logging.info("Fetched Earnings data (Net Income) for %d years period (Ticker: %s).", len(net_income_list), ticker, extra=metric_fields("Net Income"))
 
         # 2.2 Calculate Net Income Growth Year-on-Year (YoY) for each year
         net_income_growth_list = calc_earnings_growth (
@@ -523,7 +889,7 @@ def calc_earnings_metrics (stock, ticker, config):
         )
 
     except Exception as e:
-        logging.error(f"Error fetching Earnings (Net Income) for {ticker}: {e}")
+        logging.error("Error fetching Earnings (Net Income) for %s: %s", ticker, e, extra=metric_fields("Net Income"))
         net_income_list = None
         net_income_growth_list = None
 
@@ -533,51 +899,47 @@ def calc_earnings_metrics (stock, ticker, config):
     # the standard deviation of y-o-y earnings per share growth over the last five fiscal years.
     # The lower the EVAR, the better. A lower EVAR indicates that the company has more stable earnings growth.
 
-    eps_evar, eps_evar_perc = None, None
+    eps_evar = None
     try:
 
         if eps_growth_list:
-            logging.info(f"Calculating Earnings Variability (EVAR) using EPS over {len(eps_growth_list)} year period (Ticker: {ticker}).")
+            logging.info("Calculating Earnings Variability (EVAR) using EPS over %d year period (Ticker: %s).", len(eps_growth_list), ticker)
             # Calculate EVAR using EPS
             eps_evar = calc_evar (ticker, eps_growth_list)
-            eps_evar_perc = round (eps_evar * 100, 2) if eps_evar is not None else "N/A"
 
-            if eps_list is not None:
-                logging.info(f"EVAR {len(eps_list)}Y (EPS) (Ticker: {ticker}): {(eps_evar_perc)} %")
-            else:
-                logging.info(f"EVAR (EPS) (Ticker: {ticker}): N/A")
+            if log_info:
+                if eps_list is not None and eps_evar is not None:
+                    logging.info("EVAR %dY (EPS) (Ticker: %s): %.2f %%", len(eps_list), ticker, eps_evar * 100, extra=metric_fields("EVAR (EPS)", eps_evar))
+                else:
+                    logging.info("EVAR (EPS) (Ticker: %s): N/A", ticker, extra=metric_fields("EVAR (EPS)"))
 
         else:
-            logging.error(f"Cannot calculate EVAR (EPS) for {ticker}. No Earnings Growth data available.")
+            logging.error("Cannot calculate EVAR (EPS) for %s. No Earnings Growth data available.", ticker, extra=metric_fields("EVAR (EPS)"))
             eps_evar = None
-            eps_evar_perc = None
 
     except Exception as evar_error:
-        logging.error(f"Error calculating EVAR (Ticker: {ticker}): {evar_error}")
+        logging.error("Error calculating EVAR (Ticker: %s): %s", ticker, evar_error, extra=metric_fields("EVAR (EPS)"))
         eps_evar = None
-        eps_evar_perc = None
 
-    net_income_evar, net_income_evar_perc = None, None
+    net_income_evar = None
     try:
         if net_income_growth_list:
-            logging.info(f"Calculating Earnings Variability (EVAR) using Net Income over {len(net_income_growth_list)} year period (Ticker: {ticker}).")
+            logging.info("Calculating Earnings Variability (EVAR) using Net Income over %d year period (Ticker: %s).", len(net_income_growth_list), ticker)
             # Calculate EVAR using Net Income
             net_income_evar = calc_evar (ticker, net_income_growth_list)
-            net_income_evar_perc = round (net_income_evar * 100, 2) if net_income_evar is not None else "N/A"
-            if net_income_list is not None:
-                logging.info(f"EVAR {len(net_income_list)}Y (Net Income) (Ticker: {ticker}): {(net_income_evar_perc)} %")
-            else:
-                logging.info(f"EVAR (Net Income) (Ticker: {ticker}): N/A")
+            if log_info:
+                if net_income_list is not None and net_income_evar is not None:
+                    logging.info("EVAR %dY (Net Income) (Ticker: %s): %.2f %%", len(net_income_list), ticker, net_income_evar * 100, extra=metric_fields("EVAR (Net Income)", net_income_evar))
+                else:
+                    logging.info("EVAR (Net Income) (Ticker: %s): N/A", ticker, extra=metric_fields("EVAR (Net Income)"))
 
         else:
-            logging.error (f"Cannot calculate EVAR (Net Income) for {ticker}. No Earnings Growth data available.")
+            logging.error ("Cannot calculate EVAR (Net Income) for %s. No Earnings Growth data available.", ticker, extra=metric_fields("EVAR (Net Income)"))
             net_income_evar = None
-            net_income_evar_perc = None
 
     except Exception as evar_error:
-        logging.error (f"Error calculating EVAR (Ticker: {ticker}): {evar_error}")
+        logging.error ("Error calculating EVAR (Ticker: %s): %s", ticker, evar_error, extra=metric_fields("EVAR (Net Income)"))
         net_income_evar = None
-        net_income_evar_perc = None
 
     # -------------- Compound Annual Growth Rate (CAGR) --------------
 
@@ -585,14 +947,14 @@ def calc_earnings_metrics (stock, ticker, config):
     try:
 
         eps_cagr = profitabilityCalc.calc_cagr (ticker, eps_list)
-        eps_cagr_perc = round(eps_cagr * 100, 2) if eps_cagr is not None else None
-        if eps_cagr_perc is not None:
-            logging.info (f"CAGR {len(eps_list)}Y (EPS) (Ticker: {ticker}): {eps_cagr_perc} %")
-        else:
-            logging.info (f"CAGR (EPS) (Ticker: {ticker}): N/A")
+        if log_info:
+            if eps_cagr is not None:
+                logging.info ("CAGR %dY (EPS) (Ticker: %s): %.2f %%", len(eps_list), ticker, eps_cagr * 100, extra=metric_fields("CAGR (EPS)", eps_cagr))
+            else:
+                logging.info ("CAGR (EPS) (Ticker: %s): N/A", ticker, extra=metric_fields("CAGR (EPS)"))
 
     except Exception as cagr_error:
-        logging.error (f"Error calculating CAGR (EPS) (Ticker: {ticker}): {cagr_error}")
+        logging.error ("Error calculating CAGR (EPS) (Ticker: %s): %s", ticker, cagr_error, extra=metric_fields("CAGR (EPS)"))
         eps_cagr = None
 
 
@@ -600,14 +962,14 @@ def calc_earnings_metrics (stock, ticker, config):
     try:
 
         net_income_cagr = profitabilityCalc.calc_cagr(ticker, net_income_list)
-        net_income_cagr_perc = round(net_income_cagr * 100, 2) if net_income_cagr is not None else None
-        if net_income_cagr is not None:
-            logging.info (f"CAGR {len(net_income_list)}Y (Net Income) (Ticker: {ticker}): {net_income_cagr_perc} %")
-        else:
-            logging.info (f"CAGR (Net Income) (Ticker: {ticker}): N/A")
+        if log_info:
+            if net_income_cagr is not None:
+                logging.info ("CAGR %dY (Net Income) (Ticker: %s): %.2f %%", len(net_income_list), ticker, net_income_cagr * 100, extra=metric_fields("CAGR (Net Income)", net_income_cagr))
+            else:
+                logging.info ("CAGR (Net Income) (Ticker: %s): N/A", ticker, extra=metric_fields("CAGR (Net Income)"))
 
     except Exception as cagr_error:
-        logging.error (f"Error calculating CAGR (Net Income) (Ticker: {ticker}): {cagr_error}")
+        logging.error ("Error calculating CAGR (Net Income) (Ticker: %s): %s", ticker, cagr_error, extra=metric_fields("CAGR (Net Income)"))
         net_income_cagr = None
 
 
@@ -631,9 +993,12 @@ def calc_earnings_metrics (stock, ticker, config):
 
 def analyze_stock (config, stock, ticker, weight):
 
+    # Diagnostics only - skipped below INFO (no rounding, no formatting, no structured log fields)
+    log_info = logging.getLogger().isEnabledFor(logging.INFO)
+
     try:
 
-        logging.info(f"---------------------- {ticker} ----------------------")
+        logging.info("---------------------- %s ----------------------", ticker)
 
         # -------------- Company Name --------------
 
@@ -643,7 +1008,7 @@ def analyze_stock (config, stock, ticker, weight):
         if company_name is None or company_name == "":
             company_name = "N/A"
         # Log the company name
-        logging.info(f"Company: {company_name}")
+        logging.info("Company: %s", company_name)
 
         # --------------- Company Country Of Origin ---------------
 
@@ -653,37 +1018,40 @@ def analyze_stock (config, stock, ticker, weight):
         if country is None or country == "":
             country = "N/A"
         # Log the country of origin
-        logging.info(f"Country: {country}")
+        logging.info("Country: %s", country)
 
 
         ########################################################
         ###################   VALUE METRICS   ##################
         ########################################################
 
-        value_metrics = calc_value_metrics (
-            stock,
-            ticker
-        )
+        with span ("metric.value"):
+            value_metrics = calc_value_metrics (
+                stock,
+                ticker
+            )
 
         ########################################################
         ###############   PROFITABILITY METRICS   ##############
         ########################################################
 
-        earnings = calc_earnings_metrics (
-            stock,
-            ticker,
-            config
-        )
+        with span ("metric.earnings"):
+            earnings = calc_earnings_metrics (
+                stock,
+                ticker,
+                config
+            )
 
         # -------------- Dividend Yield Fetched Data --------------
 
         # Safe multiplication to handle None values, Convert to percentage
         dividend_yield = stock.info.get("dividendYield", None)
 
-        if dividend_yield:
-            logging.info(f"Dividend Yield (Ticker: {ticker}): {round(dividend_yield, 2)} %")
-        else:
-            logging.info(f"Dividend Yield (Ticker: {ticker}): N/A")
+        if log_info:
+            if dividend_yield:
+                logging.info("Dividend Yield (Ticker: %s): %.2f %%", ticker, dividend_yield, extra=metric_fields("Dividend Yield", dividend_yield / 100.0))
+            else:
+                logging.info("Dividend Yield (Ticker: %s): N/A", ticker, extra=metric_fields("Dividend Yield"))
 
         # -------------- Return on Equity (ROE) --------------
 
@@ -692,55 +1060,56 @@ def analyze_stock (config, stock, ticker, weight):
 
         # Fetch ROE using Yahoo Finance data
         roe_ttm_yf = profitabilityCalc.get_roe_ttm (stock.info)
-        # Convert ROE to percentage
-        roe_ttm_yf_perc = roe_ttm_yf * 100 if roe_ttm_yf is not None else None
-        if roe_ttm_yf_perc is not None:
-            logging.info(f"ROE (ttm) (Yahoo Finance) (Ticker: {ticker}): {round(roe_ttm_yf_perc, 2)} %")
-        else:
-            logging.info(f"ROE (ttm) (Yahoo Finance) (Ticker: {ticker}): N/A")
+        if log_info:
+            if roe_ttm_yf is not None:
+                logging.info("ROE (ttm) (Yahoo Finance) (Ticker: %s): %.2f %%", ticker, roe_ttm_yf * 100, extra=metric_fields("ROE", roe_ttm_yf, metricSelector.SOURCE_TTM_YF))
+            else:
+                logging.info("ROE (ttm) (Yahoo Finance) (Ticker: %s): N/A", ticker, extra=metric_fields("ROE", source=metricSelector.SOURCE_TTM_YF))
 
 
         roe_list = None
         try:
             # Calculate ROE using Net Income and Shareholder's Equity
-            roe_list = profitabilityCalc.calc_roe (stock, ticker, config, config.get("Earnings_Period"))
+            with span ("metric.roe"):
+                roe_list = profitabilityCalc.calc_roe (stock, ticker, config, config.get("Earnings_Period"))
 
         except profitabilityCalc.ROECalcError as roe_error:
-            logging.error (f"Error calculating ROE (Ticker: {ticker}): {roe_error}")
+            logging.error ("Error calculating ROE (Ticker: %s): %s", ticker, roe_error, extra=metric_fields("ROE", source=metricSelector.SOURCE_ANNUAL))
             roe_list = None
 
         # -------------- Return on Equity - Calculated --------------
-        roe_ttm_calc, roe_calc_perc = None, None
+        roe_ttm_calc = None
         try:
             # Get the TTM ROE
-            roe_ttm = profitabilityCalc.calc_roe_ttm ( stock, ticker )
+            with span ("metric.roe"):
+                roe_ttm = profitabilityCalc.calc_roe_ttm ( stock, ticker )
 
-            # Convert ROE to percentage
-            roe_calc_perc = roe_ttm * 100 if roe_ttm is not None else None
-            if roe_ttm_yf_perc is not None and roe_calc_perc is not None:
-                logging.info("ROE - Calc (Ticker: %s): %.2f %%", ticker, round(roe_calc_perc, 2))
-            else:
-                logging.info("ROE - Calc (Ticker: %s): N/A", ticker)
+            if log_info:
+                if roe_ttm_yf is not None and roe_ttm is not None:
+                    logging.info("ROE - Calc (Ticker: %s): %.2f %%", ticker, roe_ttm * 100, extra=metric_fields("ROE", roe_ttm, metricSelector.SOURCE_TTM_CALC))
+                else:
+                    logging.info("ROE - Calc (Ticker: %s): N/A", ticker, extra=metric_fields("ROE", source=metricSelector.SOURCE_TTM_CALC))
 
         except profitabilityCalc.ROECalcError as roe_error:
-            logging.error (f"Error calculating ROE (ttm) (Ticker: {ticker}): {roe_error}")
+            logging.error ("Error calculating ROE (ttm) (Ticker: %s): %s", ticker, roe_error, extra=metric_fields("ROE", source=metricSelector.SOURCE_TTM_CALC))
             roe_ttm = None
 
         # -------------- Return on Equity - MSCI --------------
         roe_msci = None
         try:
 
-            roe_msci = profitabilityCalc.calc_roe_msci (stock, ticker)
+            with span ("metric.roe"):
+                roe_msci = profitabilityCalc.calc_roe_msci (stock, ticker)
 
-            roe_msci_perc = roe_msci * 100 if roe_msci is not None else None
-            if roe_msci_perc is not None:
-                logging.info (f"ROE - MSCI (Ticker: {ticker}): {round(roe_msci_perc, 2)} %")
-            else:
-                logging.info (f"ROE - MSCI (Ticker: {ticker}): N/A")
+            if log_info:
+                if roe_msci is not None:
+                    logging.info ("ROE - MSCI (Ticker: %s): %.2f %%", ticker, roe_msci * 100, extra=metric_fields("ROE", roe_msci, metricSelector.SOURCE_MSCI))
+                else:
+                    logging.info ("ROE - MSCI (Ticker: %s): N/A", ticker, extra=metric_fields("ROE", source=metricSelector.SOURCE_MSCI))
 
         except Exception as roe_error:
 
-            logging.error (f"Error calculating ROE - MSCI (Ticker: {ticker}): {roe_error}")
+            logging.error ("Error calculating ROE - MSCI (Ticker: %s): %s", ticker, roe_error, extra=metric_fields("ROE", source=metricSelector.SOURCE_MSCI))
 
         roe_data = ROE (
             roe_ttm_yf,
@@ -749,7 +1118,7 @@ def analyze_stock (config, stock, ticker, weight):
             roe_msci,
         )
 
-        roe_selected = metricSelector.select_roe ( roe_data )
+        roe_selected, roe_source = metricSelector.select_roe_with_source ( roe_data )
 
 
 
@@ -777,51 +1146,48 @@ def analyze_stock (config, stock, ticker, weight):
 
         # Fetch ROA using Yahoo Finance data
         roa_ttm_yf = profitabilityCalc.get_roa_ttm (stock.info)
-        # Convert ROA to percentage
-        roa_ttm_yf_perc = roa_ttm_yf * 100 if roa_ttm_yf is not None else None
-        if roa_ttm_yf_perc is not None:
-            logging.info(f"ROA (ttm) (Yahoo Finance) (Ticker: {ticker}): {round(roa_ttm_yf_perc, 2)} %")
-        else:
-            logging.info(f"ROA (ttm) (Yahoo Finance) (Ticker: {ticker}): N/A")
+        if log_info:
+            if roa_ttm_yf is not None:
+                logging.info("ROA (ttm) (Yahoo Finance) (Ticker: %s): %.2f %%", ticker, roa_ttm_yf * 100, extra=metric_fields("ROA", roa_ttm_yf, metricSelector.SOURCE_TTM_YF))
+            else:
+                logging.info("ROA (ttm) (Yahoo Finance) (Ticker: %s): N/A", ticker, extra=metric_fields("ROA", source=metricSelector.SOURCE_TTM_YF))
 
 
         # Calculate ROA TTM
         roa_ttm_calc = None
         try:
-            roa_ttm_calc = profitabilityCalc.calc_roa_ttm ( stock, ticker )
+            with span ("metric.roa"):
+                roa_ttm_calc = profitabilityCalc.calc_roa_ttm ( stock, ticker )
 
-            # If the ROA TTM is not None, convert it to percentage
-            roa_ttm_calc_perc = roa_ttm_calc * 100 if roa_ttm_calc is not None else None
-            if roa_ttm_calc_perc is not None:
-                logging.info("ROA - Calc (Ticker: %s): %.2f %%", ticker, round(roa_ttm_calc_perc, 2))
-            else:
-                logging.info("ROA - Calc (Ticker: %s): N/A", ticker)
+            if log_info:
+                if roa_ttm_calc is not None:
+                    logging.info("ROA - Calc (Ticker: %s): %.2f %%", ticker, roa_ttm_calc * 100, extra=metric_fields("ROA", roa_ttm_calc, metricSelector.SOURCE_TTM_CALC))
+                else:
+                    logging.info("ROA - Calc (Ticker: %s): N/A", ticker, extra=metric_fields("ROA", source=metricSelector.SOURCE_TTM_CALC))
 
         except profitabilityCalc.ROACalcError as roa_error:
-            logging.error(f"Error calculating ROA (ttm) (Ticker: {ticker}): {roa_error}")
+            logging.error("Error calculating ROA (ttm) (Ticker: %s): %s", ticker, roa_error, extra=metric_fields("ROA", source=metricSelector.SOURCE_TTM_CALC))
             roa_ttm_calc = None
 
 
-        roa_list, roa_calc_perc = None, None
+        roa_list = None
         try:
             # Calculate ROA using Net Income and Total Assets
-            roa_list = profitabilityCalc.calc_roa (stock, ticker, config)
+            with span ("metric.roa"):
+                roa_list = profitabilityCalc.calc_roa (stock, ticker, config)
 
             if roa_list is not None:
-                # Convert ROA to percentage
-                roa_calc_perc = roa_list[0] * 100 if roa_list[0] is not None else None
-                if roa_calc_perc is not None:
-                    logging.info("ROA - Calc (Ticker: %s): %.2f %%", ticker, round(roa_calc_perc, 2))
-                else:
-                    logging.info("ROA - Calc (Ticker: %s): N/A", ticker)
+                if log_info:
+                    if roa_list[0] is not None:
+                        logging.info("ROA - Calc (Ticker: %s): %.2f %%", ticker, roa_list[0] * 100, extra=metric_fields("ROA", roa_list[0], metricSelector.SOURCE_ANNUAL))
+                    else:
+                        logging.info("ROA - Calc (Ticker: %s): N/A", ticker, extra=metric_fields("ROA", source=metricSelector.SOURCE_ANNUAL))
             else:
-                logging.error(f"Cannot calculate ROA (Ticker: {ticker}): ROA list is empty")
-                roa_calc_perc = None
+                logging.error("Cannot calculate ROA (Ticker: %s): ROA list is empty", ticker, extra=metric_fields("ROA", source=metricSelector.SOURCE_ANNUAL))
     
         except profitabilityCalc.ROACalcError as roa_error:
-            logging.error(f"Error calculating ROA (Ticker: {ticker}): {roa_error}")
+            logging.error("Error calculating ROA (Ticker: %s): %s", ticker, roa_error, extra=metric_fields("ROA", source=metricSelector.SOURCE_ANNUAL))
             roa_list = None
-            roa_calc_perc = None
 
         roa = ROA (
             roa_ttm_yf,
@@ -829,36 +1195,42 @@ def analyze_stock (config, stock, ticker, weight):
             roa_list
         )
 
-        roa_selected = metricSelector.select_roa ( roa )
+        roa_selected, roa_source = metricSelector.select_roa_with_source ( roa )
 
 
         # -------------- Cash Flow Over Assets (CFOA) --------------
 
-        cfoa_list, cfoa_latest_perc = None, None
+        cfoa_list = None
         try:
-            cfoa_list = profitabilityCalc.calc_cfoa (stock, ticker)
-            cfoa_latest_perc = round(cfoa_list[0] * 100, 2) if cfoa_list is not None else None
-            logging.info(f"CFOA (annual) (Ticker: {ticker}): {cfoa_latest_perc} %")
+            with span ("metric.cfoa"):
+                cfoa_list = profitabilityCalc.calc_cfoa (stock, ticker)
+            if log_info:
+                if cfoa_list is not None and cfoa_list[0] is not None:
+                    logging.info("CFOA (annual) (Ticker: %s): %.2f %%", ticker, cfoa_list[0] * 100, extra=metric_fields("CFOA", cfoa_list[0], metricSelector.SOURCE_ANNUAL))
+                else:
+                    logging.info("CFOA (annual) (Ticker: %s): N/A", ticker, extra=metric_fields("CFOA", source=metricSelector.SOURCE_ANNUAL))
 
         except profitabilityCalc.CFOACalcError as cfoa_error:
-            logging.error(f"Error calculating CFOA (annual) (Ticker: {ticker}): {cfoa_error}")
+            logging.error("Error calculating CFOA (annual) (Ticker: %s): %s", ticker, cfoa_error, extra=metric_fields("CFOA", source=metricSelector.SOURCE_ANNUAL))
             cfoa_list = None
-            cfoa_latest_perc = None
 
         # Calculate CFOA TTM
-        cfoa_ttm, cfoa_ttm_perc = None, None
+        cfoa_ttm = None
         try:
-            cfoa_ttm = profitabilityCalc.calc_cfoa_ttm (stock, ticker)
-            cfoa_ttm_perc = round(cfoa_ttm * 100, 2) if cfoa_ttm is not None else None
-            logging.info(f"CFOA (ttm) (Ticker: {ticker}): {cfoa_ttm_perc} %")
+            with span ("metric.cfoa"):
+                cfoa_ttm = profitabilityCalc.calc_cfoa_ttm (stock, ticker)
+            if log_info:
+                if cfoa_ttm is not None:
+                    logging.info("CFOA (ttm) (Ticker: %s): %.2f %%", ticker, cfoa_ttm * 100, extra=metric_fields("CFOA", cfoa_ttm, metricSelector.SOURCE_TTM))
+                else:
+                    logging.info("CFOA (ttm) (Ticker: %s): N/A", ticker, extra=metric_fields("CFOA", source=metricSelector.SOURCE_TTM))
 
         except profitabilityCalc.CFOACalcError as cfoa_error:
-            logging.error(f"Error calculating CFOA (ttm) (Ticker: {ticker}): {cfoa_error}")
+            logging.error("Error calculating CFOA (ttm) (Ticker: %s): %s", ticker, cfoa_error, extra=metric_fields("CFOA", source=metricSelector.SOURCE_TTM))
             cfoa_ttm = None
-            cfoa_ttm_perc = None
 
 
-        cfoa_selected = metricSelector.select_cfoa (
+        cfoa_selected, cfoa_source = metricSelector.select_cfoa_with_source (
             cfoa_ttm,
             cfoa_list
         )
@@ -869,34 +1241,36 @@ def analyze_stock (config, stock, ticker, weight):
         #       ECG, AX, RDN
 
 
-        gpoa_list, gpoa_latest_perc = None, None
+        gpoa_list = None
         try:
             # Calculate GPOA (Gross Profit over Assets) annual data
-            gpoa_list = profitabilityCalc.calc_gpoa_annual (stock, ticker, config, config.get("Earnings_Period"))
+            with span ("metric.gpoa"):
+                gpoa_list = profitabilityCalc.calc_gpoa_annual (stock, ticker, config, config.get("Earnings_Period"))
 
-            gpoa_latest_perc = round(gpoa_list[0] * 100, 2) if gpoa_list is not None else None
-            logging.info(f"GPOA (Ticker: {ticker}): {gpoa_latest_perc} %")
+            if log_info:
+                if gpoa_list is not None and gpoa_list[0] is not None:
+                    logging.info("GPOA (Ticker: %s): %.2f %%", ticker, gpoa_list[0] * 100, extra=metric_fields("GPOA", gpoa_list[0], metricSelector.SOURCE_ANNUAL))
+                else:
+                    logging.info("GPOA (Ticker: %s): N/A", ticker, extra=metric_fields("GPOA", source=metricSelector.SOURCE_ANNUAL))
 
         except Exception as gpoa_error:
-            logging.error(f"Error calculating GPOA (Ticker: {ticker}): {gpoa_error}")
+            logging.error("Error calculating GPOA (Ticker: %s): %s", ticker, gpoa_error, extra=metric_fields("GPOA", source=metricSelector.SOURCE_ANNUAL))
             gpoa_list = None
-            gpoa_latest_perc = None
 
 
-        gpoa_ttm, gpoa_ttm_perc = None, None
+        gpoa_ttm = None
         try:
 
             # Calculate GPOA
-            gpoa_ttm = profitabilityCalc.calc_gpoa_ttm ( stock, ticker )
-            # Convert GPOA to percentage
-            gpoa_ttm_perc = round(gpoa_ttm * 100, 2) if gpoa_ttm is not None else None
+            with span ("metric.gpoa"):
+                gpoa_ttm = profitabilityCalc.calc_gpoa_ttm ( stock, ticker )
 
         except profitabilityCalc.GPOACalcError as gpoa_error:
-            logging.error(f"Error calculating GPOA and GPMAR TTM (Ticker: {ticker}): {gpoa_error}")
+            logging.error("Error calculating GPOA and GPMAR TTM (Ticker: %s): %s", ticker, gpoa_error, extra=metric_fields("GPOA", source=metricSelector.SOURCE_TTM))
             gpoa_ttm = None
 
 
-        gpoa_selected = metricSelector.select_gpoa (
+        gpoa_selected, gpoa_source = metricSelector.select_gpoa_with_source (
             gpoa_ttm,
             gpoa_list
         )
@@ -904,32 +1278,34 @@ def analyze_stock (config, stock, ticker, weight):
 
         # --------------   Gross Profit Margin (GPMAR)      --------------
 
-        gpmar_list, gpmar_latest_perc = None, None
+        gpmar_list = None
         try:
             # Calculate GPMAR (Gross Profit Margin) anual data
-            gpmar_list = profitabilityCalc.calc_gpmar_annual (stock, ticker, config, config.get("Earnings_Period"))
+            with span ("metric.gpmar"):
+                gpmar_list = profitabilityCalc.calc_gpmar_annual (stock, ticker, config, config.get("Earnings_Period"))
 
-            gpmar_latest_perc = round(gpmar_list[0] * 100, 2) if gpmar_list is not None else None
-            logging.info(f"GPMAR (Ticker: {ticker}): {gpmar_latest_perc} %")
+            if log_info:
+                if gpmar_list is not None and gpmar_list[0] is not None:
+                    logging.info("GPMAR (Ticker: %s): %.2f %%", ticker, gpmar_list[0] * 100, extra=metric_fields("GPMAR", gpmar_list[0], metricSelector.SOURCE_ANNUAL))
+                else:
+                    logging.info("GPMAR (Ticker: %s): N/A", ticker, extra=metric_fields("GPMAR", source=metricSelector.SOURCE_ANNUAL))
 
         except Exception as gpoa_error:
-            logging.error(f"Error calculating GPOA and GPMAR (Ticker: {ticker}): {gpoa_error}")
+            logging.error("Error calculating GPOA and GPMAR (Ticker: %s): %s", ticker, gpoa_error, extra=metric_fields("GPMAR", source=metricSelector.SOURCE_ANNUAL))
             gpmar_list = None
-            gpmar_latest_perc = None
 
 
-        gpmar_ttm, gpmar_ttm_perc = None, None
+        gpmar_ttm = None
         try:
             # Calculate GPMAR TTM
-            gpmar_ttm =  profitabilityCalc.calc_gpmar_ttm ( stock, ticker )
-            # Convert GPMAR to percentage
-            gpmar_ttm_perc = round(gpmar_ttm * 100, 2) if gpmar_ttm is not None else None
+            with span ("metric.gpmar"):
+                gpmar_ttm =  profitabilityCalc.calc_gpmar_ttm ( stock, ticker )
         except profitabilityCalc.GPMARCalcError as gpmar_error:
-            logging.error(f"Error calculating GPMAR TTM (Ticker: {ticker}): {gpmar_error}")
+            logging.error("Error calculating GPMAR TTM (Ticker: %s): %s", ticker, gpmar_error, extra=metric_fields("GPMAR", source=metricSelector.SOURCE_TTM))
             gpmar_ttm = None
 
 
-        gpmar_selected = metricSelector.select_gpmar (
+        gpmar_selected, gpmar_source = metricSelector.select_gpmar_with_source (
             gpmar_ttm,
             gpmar_list
         )
@@ -939,17 +1315,17 @@ def analyze_stock (config, stock, ticker, weight):
 
         # Safe multiplication to handle None values, Convert to percentage
         profit_margin = stock.info.get("profitMargins", None)
-        profit_margin_percent = profit_margin * 100 if profit_margin is not None else None
-        if profit_margin_percent is not None:
-            logging.info(f"Profit Margin (Ticker: {ticker}): {round(profit_margin_percent, 2)} %")
-        else:
-            logging.info(f"Profit Margin (Ticker: {ticker}): N/A")
+        if log_info:
+            if profit_margin is not None:
+                logging.info("Profit Margin (Ticker: %s): %.2f %%", ticker, profit_margin * 100, extra=metric_fields("Profit Margin", profit_margin))
+            else:
+                logging.info("Profit Margin (Ticker: %s): N/A", ticker, extra=metric_fields("Profit Margin"))
 
 
         # -------------- Market Cap --------------
         # Convert Market Cap to billions
         market_cap = get_market_cap(stock)
-        market_cap_bill = round(market_cap / 1e9, 2) if market_cap is not None else "N/A"  # Convert Market Cap to billions
+        market_cap_bill = market_cap / 1e9 if market_cap is not None else None  # Convert Market Cap to billions
 
 
         # -------------- Sector and Industry --------------
@@ -958,12 +1334,11 @@ def analyze_stock (config, stock, ticker, weight):
         sector = stock.info.get("sector", "N/A")
         industry = stock.info.get("industry", "N/A")
 
-        logging.info(f"Sector: {sector}")
-        logging.info(f"Industry: {industry}")
+        logging.info("Sector: %s", sector)
+        logging.info("Industry: %s", industry)
 
-        # TODO: Calculate Pie Chart of Sectors diversification
-        #       for the calculcated weightings using your own qualit methodology
-        #       We want to be diviersified across sectors.
+        # NOTE: Sector diversification of the calculated weightings is handled by the
+        #       portfolio selection (PortfolioSelector.py, 'use_sector_cap' of the factor blocks).
         #       Diversification is the only free lunch in investing.
 
 
@@ -989,15 +1364,16 @@ def analyze_stock (config, stock, ticker, weight):
         # roa_growth  
         # cfoa_growth
         # gpmar_growth
-        profitability_growth_metrics = calc_profitability_growth (
-            ticker,
-            earnings.eps_list,            # Five-year growth in Earnings per Share (EPS) - EPS Growth
-            gpoa_list,                    # Five-year growth in Gross Profits over Assets - GPOA Growth
-            roe_list,                     # Five-year growth in Return on Equity - ROE Growth
-            roa_list,                     # Five-year growth in Return on Assets - ROA Growth
-            cfoa_list,                    # Five-year growth in Cash Flow over Assets - CFOA Growth
-            gpmar_list                    # Five-year growth in Gross Profit Margin - GPMAR Growth
-        )
+        with span ("metric.growth"):
+            profitability_growth_metrics = calc_profitability_growth (
+                ticker,
+                earnings.eps_list,            # Five-year growth in Earnings per Share (EPS) - EPS Growth
+                gpoa_list,                    # Five-year growth in Gross Profits over Assets - GPOA Growth
+                roe_list,                     # Five-year growth in Return on Equity - ROE Growth
+                roa_list,                     # Five-year growth in Return on Assets - ROA Growth
+                cfoa_list,                    # Five-year growth in Cash Flow over Assets - CFOA Growth
+                gpmar_list                    # Five-year growth in Gross Profit Margin - GPMAR Growth
+            )
 
         # -------------- Store Stock Metrics --------------
 
@@ -1007,7 +1383,15 @@ def analyze_stock (config, stock, ticker, weight):
             value_metrics,
             profitability_metrics,
             profitability_growth_metrics,
-            None
+            None,
+            industry,
+            {
+                "ROE": roe_source,
+                "ROA": roa_source,
+                "CFOA": cfoa_source,
+                "GPOA": gpoa_source,
+                "GPMAR": gpmar_source,
+            }
         )
 
         # Build Stock Data Dictionary
@@ -1016,27 +1400,28 @@ def analyze_stock (config, stock, ticker, weight):
             "Company": company_name,
             "Country" : country,
             "Original Weight": weight,  # Add the original weight for the company
-            "Market Cap (in Billions)": round(market_cap_bill, 2),
-            "P/E (Forward)": '{:,.2f}'.format(value_metrics.pe_forward) if value_metrics.pe_forward is not None else "N/A",
-            "P/E (Trailing)":  '{:,.2f}'.format(value_metrics.pe_trailing) if value_metrics.pe_trailing is not None else "N/A",
-            "EBIT/TEV (%)": '{:,.2f}'.format(round(value_metrics.ebit_to_tev * 100, 2)) if value_metrics.ebit_to_tev is not None else "N/A",
-            "TEV (in Billions)": '{:,.2f}'.format(round(value_metrics.enterprise_value_bill, 2)) if value_metrics.enterprise_value_bill is not None else "N/A",
-            "P/B": '{:,.2f}'.format( round(value_metrics.pb_ratio, 2)) if value_metrics.pb_ratio is not None else "N/A",
-            "EPS (latest)": '{:,.2f}'.format( round (earnings.eps_list[0], 2) ) if earnings.eps_list is not None else "N/A",
-            "EVAR - EPS (%)":"{}".format( round (earnings.eps_evar * 100, 2) ) if earnings.eps_evar is not None else "N/A",
-            "EVAR - Net Income (%)":"{}".format ( round(earnings.net_income_evar * 100, 2) ) if earnings.net_income_evar is not None else "N/A",
-            "CAGR - EPS (%)": '{:,.2f}'.format(round(earnings.eps_cagr * 100, 2)) if earnings.eps_cagr is not None else "N/A",
-            "CAGR - Net Income (%)": '{:,.2f}'.format( round(earnings.net_income_cagr * 100, 2) ) if earnings.net_income_cagr is not None else "N/A",
-            "Dividend Yield (%)": '{:,.2f}'.format(dividend_yield) if dividend_yield is not None else "N/A",     
-            "ROE (ttm) - yFinance (%)": '{:,.2f}'.format(roe_ttm_yf_perc) if roe_ttm_yf_perc is not None else "N/A",
-            "ROE (ttm) - Calc (%)": '{:,.2f}'.format(roe_calc_perc) if roe_calc_perc is not None else "N/A",
-            "ROA - yFinance (%)": '{:,.2f}'.format(roa_ttm_yf_perc) if roa_ttm_yf_perc is not None else "N/A",
-            "ROA - Calc (%)": '{:,.2f}'.format(roa_calc_perc) if roa_calc_perc is not None else "N/A",
-            "CFOA (annual) (%)": '{:,.2f}'.format(cfoa_latest_perc) if cfoa_latest_perc is not None else "N/A",
-            "CFOA (ttm) (%)": '{:,.2f}'.format(cfoa_ttm_perc) if cfoa_ttm_perc is not None else "N/A",
-            "GPOA (ttm) (%)": '{:,.2f}'.format(gpoa_ttm_perc) if gpoa_ttm_perc is not None else "N/A",
-            "GPMAR (ttm) (%)": '{:,.2f}'.format(gpmar_ttm_perc) if gpmar_ttm_perc is not None else "N/A",
-            "Profit Margin (%)": '{:,.2f}'.format(profit_margin_percent) if profit_margin_percent is not None else "N/A",
+            "Market Cap (in Billions)": as_number (market_cap_bill),
+            # Raw numbers (NaN = missing), '(%)' columns as fractions - formatted by the exporters
+            "P/E (Forward)": as_number (value_metrics.pe_forward),
+            "P/E (Trailing)": as_number (value_metrics.pe_trailing),
+            "EBIT/TEV (%)": as_number (value_metrics.ebit_to_tev),
+            "TEV (in Billions)": as_number (value_metrics.enterprise_value_bill),
+            "P/B": as_number (value_metrics.pb_ratio),
+            "EPS (latest)": as_number (earnings.eps_list[0]) if earnings.eps_list is not None else math.nan,
+            "EVAR - EPS (%)": as_number (earnings.eps_evar),
+            "EVAR - Net Income (%)": as_number (earnings.net_income_evar),
+            "CAGR - EPS (%)": as_number (earnings.eps_cagr),
+            "CAGR - Net Income (%)": as_number (earnings.net_income_cagr),
+            "Dividend Yield (%)": as_number (dividend_yield) / 100.0,       # Yahoo Finance reports the dividend yield in percent
+            "ROE (ttm) - yFinance (%)": as_number (roe_ttm_yf),
+            "ROE (ttm) - Calc (%)": as_number (roe_ttm),
+            "ROA - yFinance (%)": as_number (roa_ttm_yf),
+            "ROA - Calc (%)": as_number (roa_list[0]) if roa_list is not None else math.nan,
+            "CFOA (annual) (%)": as_number (cfoa_list[0]) if cfoa_list is not None else math.nan,
+            "CFOA (ttm) (%)": as_number (cfoa_ttm),
+            "GPOA (ttm) (%)": as_number (gpoa_ttm),
+            "GPMAR (ttm) (%)": as_number (gpmar_ttm),
+            "Profit Margin (%)": as_number (profit_margin),
             "Sector": sector,
             "Industry": industry
         })
@@ -1057,48 +1442,59 @@ def analyze_one_stock (ticker_data, i_config):
     ticker = ticker_data["ticker"]
     weight = ticker_data["weight"]
 
-    try:
-
-        # Fetch the stock data from Yahoo Finance
-        stock = yf.Ticker(ticker)
-
-        # Get stock data
-        stock_info = stock.info
-
-        # Check if the stock info is available and contains the 'symbol' key
-        # and if the ticker symbol is valid
-        if stock_info and 'symbol' in stock_info and is_valid_ticker(ticker):
+    # All records of this ticker are written as one block when the analysis returns
+    with ticker_log_block (ticker, i_config.get("Log_Block_Max_Records", DEFAULT_LOG_BLOCK_MAX_RECORDS)), ticker_span (ticker):
+        try:
 
-            # If the ticker symbol is valid, analyze the stock
-            stock_data_entry, stock_factor_metrics = analyze_stock (
-                i_config,
-                stock,
-                ticker,
-                weight
-            )
+            with span ("fetch.info", NETWORK):
+                # Fetch the stock data from Yahoo Finance
+                stock = yf.Ticker(ticker)
+
+                # Get stock data
+                stock_info = stock.info
+
+            # Check if the stock info is available and contains the 'symbol' key
+            # and if the ticker symbol is valid
+            if stock_info and 'symbol' in stock_info and is_valid_ticker(ticker):
+
+                # Fetch the statements now - a failed fetch is retried (and handled) by the metric calculation
+                for statement in YF_STATEMENTS:
+                    with span (f"fetch.{statement}", NETWORK):
+                        try:
+                            getattr (stock, statement)
+                        except Exception as fetch_error:
+                            logging.debug ("Prefetch of %s failed (Ticker: %s): %s", statement, ticker, fetch_error)
+
+                # If the ticker symbol is valid, analyze the stock
+                stock_data_entry, stock_factor_metrics = analyze_stock (
+                    i_config,
+                    stock,
+                    ticker,
+                    weight
+                )
 
-            return ticker, stock_data_entry, stock_factor_metrics
+                return ticker, stock_data_entry, stock_factor_metrics
 
-        else:
-            # If the ticker symbol is invalid, log the error and return an invalid entry
+            else:
+                # If the ticker symbol is invalid, log the error and return an invalid entry
+                # Log the error and return an invalid entry
+                logging.error(f"Invalid Stock Ticker Symbol: {ticker}")
+                logging.error(f"Skipping Stock Analysis for {ticker}.")
+                invalid_entry = INVALID_TICKER_TEMPLATE.copy()
+                invalid_entry["Company"] = ticker
+                invalid_entry["Original Weight"] = weight
+
+                return ticker, invalid_entry, None
+        
+        except Exception as e:
             # Log the error and return an invalid entry
-            logging.error(f"Invalid Stock Ticker Symbol: {ticker}")
-            logging.error(f"Skipping Stock Analysis for {ticker}.")
+            logging.critical(f"Error analyzing stock (Ticker: {ticker}): {e}!")
+            logging.exception(e)
             invalid_entry = INVALID_TICKER_TEMPLATE.copy()
             invalid_entry["Company"] = ticker
             invalid_entry["Original Weight"] = weight
 
             return ticker, invalid_entry, None
-        
-    except Exception as e:
-        # Log the error and return an invalid entry
-        logging.critical(f"Error analyzing stock (Ticker: {ticker}): {e}!")
-        logging.exception(e)
-        invalid_entry = INVALID_TICKER_TEMPLATE.copy()
-        invalid_entry["Company"] = ticker
-        invalid_entry["Original Weight"] = weight
-
-        return ticker, invalid_entry, None
 
 
 
@@ -1108,6 +1504,7 @@ def analyze_one_stock (ticker_data, i_config):
 if __name__ == "__main__":
 
     current_ticker = None
+    log_listener = None
 
     try:
 
@@ -1119,13 +1516,15 @@ if __name__ == "__main__":
         # Store Scripts Start Time
         programStartTime = datetime.now ( )
 
-        log_file_path = config_logging()
+        args = parse_arguments ( )
+
+        log_file_path, log_listener = config_logging ( args.log_level, args.json_log )
 
         # Instantiate Program Information Object
         __program__ = __ProgramInfo__ ( )
 
         # Print the Script Date (Format YYYY-MM-DD) and Version
-        logging.info(f"Running Stock Analysis Script:\n    Version: {__program__.swVersion}\n    Date: {__program__.buildDate.strftime('%d.%m.%Y')}")
+        NOTICE_LOGGER.info(f"Running Stock Analysis Script:\n    Version: {__program__.swVersion}\n    Date: {__program__.buildDate.strftime('%d.%m.%Y')}")
 
         # Print the disclaimer message
         print_disclaimer()
@@ -1153,19 +1552,40 @@ if __name__ == "__main__":
         yf_logger.disabled = True
         yf_logger.propagate = False
 
+        # Incremental result file: every ticker is appended as soon as it is analysed (partial results
+        # survive a crash), scoring and the exports are rebuilt from the file after the fetch
+        stream_cfg = config.get("ResultStream", {})
+        result_sink = open_result_stream (config, stream_cfg) if stream_cfg.get("enabled", False) else None
+
+        # Tickers already in the stream file of an interrupted run are not fetched again
+        # (failed tickers are retried unless 'retry_invalid' is disabled)
+        tickers_to_fetch = tickers_and_weights
+        if result_sink is not None:
+            already_completed = completed_tickers (result_sink.file_name, stream_cfg.get("retry_invalid", True))
+            tickers_to_fetch = [ticker_data for ticker_data in tickers_and_weights if ticker_data["ticker"] not in already_completed]
+            if already_completed:
+                logging.info(f"Resuming {result_sink.file_name}: {len(already_completed)} tickers already analysed.")
+
         # Loop through the tickers and weights
         with ThreadPoolExecutor (max_workers=MAX_WORKERS) as executor:
 
-            futures = [ executor.submit ( analyze_one_stock, ticker_data, config ) for ticker_data in tickers_and_weights ]
+            futures = [ executor.submit ( analyze_one_stock, ticker_data, config ) for ticker_data in tickers_to_fetch ]
 
             for future in as_completed (futures):
                 ticker, stock_data_entry, stock_factor_metrics = future.result()
                 current_ticker = ticker  # Track the most recently processed ticker globally
+                if result_sink is not None:
+                    result_sink.append (ticker, stock_data_entry, stock_factor_metrics)
+                    continue
                 if stock_data_entry:
                     stock_data[ticker] = stock_data_entry
                 if stock_factor_metrics:
                     stock_factor_metrics_list.append(stock_factor_metrics)
 
+        if result_sink is not None:
+            result_sink.close()
+            stock_data, stock_factor_metrics_list = load_result_stream (result_sink.file_name)
+
         # Step 2: Calculate Z-scores for All Stocks (Normalize after gathering data)
         #calculate_z_scores(stock_data)
         # Calculate z-score for Value Metrics
@@ -1177,56 +1597,138 @@ if __name__ == "__main__":
         #   - Once we’ve collected the data for all stocks, normalize the metrics by calculating Z-scores for each metric across all stocks.
         #   - Calculate Z-scores for each of the three categories (Value, Profitability, and Growth) for all the stocks at the end, ensuring they are normalized across the entire group of stocks.
 
-        value_cfg = config.get("ValueFactor", None)
-        profitability_cfg = config.get("ProfitabilityFactor", None)
-        growth_cfg = config.get("GrowthFactor", None)
-
         # Calculate Z-scores for each factor
 
-        ####### Value Factor Z-Scores Calculation #######
+        ####### Value, Profitability and Growth Factor Z-Scores Calculation #######
+
+        # One (metrics x tickers) matrix for all factor blocks (ValueFactor, ProfitabilityFactor,
+        # ProfitabilityGrowthFactor) - the results are written back to every stock.
+        with span ("zscore"):
+            factor_scores = calc_factor_z_scores (
+                stock_factor_metrics_list,
+                config
+            )
 
-        # TODO: We might not have to return, as the function modifies the input parameter (stock list) itself ?
-        value_zscore  = calc_value_z_scores (
-            stock_factor_metrics_list,
-            value_cfg ["z_score_metrics"]
-        )
         # After Z-score calculation, update each stock's data dictionary
         for stock in stock_factor_metrics_list:
             ticker = stock.ticker
             if ticker in stock_data:
-                composite_score = stock.value_z_score_result.composite if stock.value_z_score_result else None
-                stock_data[ticker]["Z-Score Value"] = (
-                    '{:,.2f}'.format(composite_score) if composite_score is not None and not isinstance(composite_score, str) and not math.isnan(composite_score) else "N/A"
-                )
-
-        ####### Value Factor Z-Scores Calculation #######
+                for factor, column_name in FACTOR_COLUMN_NAMES.items():
+                    z_score_result = getattr(stock, FACTOR_RESULT_ATTR[factor])
+                    composite_score = z_score_result.composite if z_score_result else None
+                    stock_data[ticker][column_name] = as_number (composite_score)
+
+                # Final Z-Score: factor composites weighted by the 'total_weight' of each factor block
+                stock_data[ticker]["Z-Score Final"] = as_number (stock.final_z_score)
+
+                # Metrics filled by the imputation stage ('imputation' of the factor blocks)
+                if factor_scores.imputed.any():
+                    stock_data[ticker]["Imputed Metrics"] = ", ".join(
+                        f"{factor}: {key}"
+                        for factor in FACTOR_COLUMN_NAMES
+                        if getattr(stock, FACTOR_RESULT_ATTR[factor])
+                        for key in getattr(stock, FACTOR_RESULT_ATTR[factor]).detail.imputed
+                    ) or None
 
         # TODO: Calculate Debt to Equity Ratio for profitability metrics
         # TODO: Calculate Accruals for profitability metrics
-        #profit_z = calc_profitability_z_scores (stock_factor_metrics_list, profitability_cfg)
-        #growth_z = calc_growth_z_scores (stock_factor_metrics_list, growth_cfg)
+
+        # -------------------- Portfolio Selection --------------------
+
+        # Top-k names by composite score (with sector caps) and their target weights
+        portfolio_cfg = config.get("Portfolio", {})
+        if portfolio_cfg.get("enabled", False):
+            portfolio = build_portfolio (factor_scores, portfolio_cfg, config)
+            add_portfolio_columns (stock_data, portfolio)
 
         # 3. Final Z-Score Calculation:
-        #   - After the Z-scores for the individual metrics are calculated, compute the final Z-score for each stock by averaging the Z-scores from all three categories.
+        #   - The final Z-score of each stock is the 'total_weight' weighted average of the three factor composites
+        #     (calculated together with the factor z-scores above, see ZScoreCalculator.calc_final_composite).
 
         # 4. Output the Results:
-        #   - Save the final Z-scores and all metrics in the Excel file for easy reference.
+        #   - Save the final Z-scores and all metrics in the Excel file (sorted by the final Z-score) for easy reference.
 
 
         # -------------------- Excel File Generation --------------------
 
-        # Save the stock data to an Excel file
-        save_to_excel (
+        # Result table of all tickers, sorted by the final Z-score
+        results_df = build_result_frame (
             stock_data,
             stock_factor_metrics_list,
-            tickers_and_weights,
-            config
+            tickers_and_weights
         )
 
+        # Per-factor detail sheets (raw metric, z-score, effective weight and source of every metric)
+        detail_sheets = None
+        if config.get("FactorDetailSheets", {}).get("enabled", False):
+            detail_sheets = build_factor_details (
+                factor_scores,
+                {stock.ticker: stock.metric_sources for stock in stock_factor_metrics_list}
+            )
+
+        # Save the stock data to an Excel file
+        with span ("export.excel"):
+            excel_file_name = save_to_excel (results_df, config, detail_sheets)
+
+        # -------------------- HTML Report --------------------
+
+        # Self-contained HTML page of the results (no Excel needed, e.g. on a headless server)
+        html_cfg = config.get("HtmlReport", {})
+        if html_cfg.get("enabled", False):
+            with span ("export.html"):
+                save_html_report (results_df, html_cfg, excel_file_name)
+
+        # -------------------- Parquet / Arrow Export --------------------
+
+        # Columnar copy of the full run (raw metrics, z-scores, composites, metadata) for fast reloading
+        arrow_cfg = config.get("ArrowExport", {})
+        if arrow_cfg.get("enabled", False):
+            with span ("export.arrow"):
+                save_arrow_results (results_df, factor_scores, config, arrow_cfg, excel_file_name)
+
+        # -------------------- Run History --------------------
+
+        # Append the run to the SQLite run history (score history per ticker, top-n per date)
+        history_cfg = config.get("RunHistory", {})
+        if history_cfg.get("enabled", False):
+            with span ("export.history"):
+                save_run_history (results_df, factor_scores, config, history_cfg, excel_file_name)
+
+        # -------------------- Run Diff --------------------
+
+        # What changed since the previous run (rank moves, composite deltas, new / dropped tickers, metric sources)
+        diff_cfg = config.get("RunDiff", {})
+        if diff_cfg.get("enabled", False):
+            with span ("export.diff"):
+                save_run_diff (results_df, stock_factor_metrics_list, diff_cfg, excel_file_name)
+
+        # -------------------- Weight Scenarios --------------------
+
+        # Re-weight the existing z-score matrix with every configured weight set (no re-fetching)
+        scenario_cfg = config.get("WeightScenarios", {})
+        if scenario_cfg.get("enabled", False):
+            with span ("export.scenarios"):
+                save_weight_scenarios (factor_scores, scenario_cfg, excel_file_name)
+
+        # -------------------- Correlation Report --------------------
+
+        # Pairwise correlation of the metric z-scores (flags collinear, i.e. double counted, metrics)
+        correlation_cfg = config.get("CorrelationReport", {})
+        if correlation_cfg.get("enabled", False):
+            with span ("export.correlation"):
+                save_correlation_report (factor_scores, correlation_cfg, excel_file_name)
+
         # -------------------- Program Runtime --------------------
         # Output program's runtime
         programRuntime = datetime.now() - programStartTime
-        logging.info (f"Program total runtime: {programRuntime}")
+
+        # -------------------- Performance Report --------------------
+        # p50 / p95 / max per stage, slowest tickers and network vs compute share of the run
+        performance_cfg = config.get("PerformanceReport", {})
+        if performance_cfg.get("enabled", False):
+            save_performance_report (performance_cfg, excel_file_name, programRuntime.total_seconds())
+
+        NOTICE_LOGGER.info (f"Program total runtime: {programRuntime}")
 
     except Exception as e:
         logging.critical(f"Unhandled ERROR running the Script occurred (Ticker: {current_ticker}): {e} !")
@@ -1234,4 +1736,7 @@ if __name__ == "__main__":
         raise e
     
     finally:
+        # Drain the log queue first - logging.shutdown() closes the handlers the listener writes to
+        if log_listener is not None:
+            stop_queue_logging (log_listener)
         logging.shutdown()
@@ -16,6 +16,9 @@ import pandas as pd
 # Finance Metrics Modules
 import yfinance as yf
 
+# Local Modules
+from StageTiming import span, NETWORK
+
 
 
 # ---------------------- Custom Exceptions ----------------------
@@ -327,11 +330,12 @@ def get_market_cap_annual (stock, ticker):
     # 2) Share price on (or just before) the the latest annual balance sheet date
     latest_annual_date = latest_col.to_pydatetime().date()
     # Look five trading days either side in case of weekend / holiday
-    hist = yf.Ticker(ticker).history(
-        start=latest_annual_date - timedelta(days=7),
-        end=latest_annual_date + timedelta(days=1),
-        auto_adjust=False
-    )
+    with span ("fetch.history", NETWORK):
+        hist = yf.Ticker(ticker).history(
+            start=latest_annual_date - timedelta(days=7),
+            end=latest_annual_date + timedelta(days=1),
+            auto_adjust=False
+        )
     # Check if the historical data is available
     if hist.empty:
         raise ValueError(f"No historical data found for {ticker} around {latest_annual_date}. Cannot calculate (annual) Market Cap!")
@@ -345,7 +349,8 @@ def get_market_cap_annual (stock, ticker):
 
 
     # 3) currency normalisation (LSE quotes come in pence) -----------------
-    currency = (yf.Ticker(ticker).fast_info.get("currency") or "UNKNOWN").upper()
+    with span ("fetch.fast_info", NETWORK):
+        currency = (yf.Ticker(ticker).fast_info.get("currency") or "UNKNOWN").upper()
     if currency in {"GBP", "GBX", "GBp"} and stock_price < 1000:       # pence → pounds
         stock_price /= 100
         currency = "GBP"
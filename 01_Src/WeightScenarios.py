@@ -0,0 +1,238 @@
+# encoding: utf-8
+
+# Copyright (c) Ivan Antunović (ivantun05@gmail.com) - All rights reserved.
+# Unintended redistribution can be punishable by law.
+# By reading this message, you are automatically consenting to it
+# and you are accepting that the financial data might be incorrect.
+# The financial data generated by this script is for informational purposes only
+# and should not be considered as investment advice.
+# Use at your own risk.
+
+"""
+WeightScenarios.py - batched scoring of many `z_score_metrics` weight sets
+-------------------------------------------------------------------------------
+Tuning the `z_score_metrics` weights used to require a complete re-run of the
+screener (network included) per weight set. This module re-uses the z-score
+matrix already built by `ZScoreCalculator.calc_factor_z_scores` and evaluates
+all weight sets at once:
+
+    composites (S x N) = weights (S x M) @ z-scores (M x N)
+
+with the same missing-metric weight renormalisation as the regular composite.
+Every scenario gets its own ranking of the universe.
+
+Scenarios are configured in the `WeightScenarios` block of ScreenerConfig.json,
+either as an explicit list of weight sets or as a grid (cartesian product of
+candidate weights per metric). `validate_weight_scenarios` checks the block
+when the configuration is loaded, before any data is fetched.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+from ZScoreCalculator import (
+    METRIC_REGISTRY,
+    FactorScoreMatrix,
+    calc_weighted_composites,
+    parse_weight,
+)
+
+
+
+# ---------------------------------------------------------------------------
+# dataclasses
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ScenarioResult:
+    """Composite scores and rankings of every weight scenario of one factor block."""
+
+    factor: str
+    metric_keys: List[str]          # Metrics (columns of `weights`)
+    weights: np.ndarray             # (S x M) weight matrix, one row per scenario
+    tickers: List[str]
+    composites: np.ndarray          # (S x N) composite z-scores
+
+    def ranks (self) -> np.ndarray:
+        """(S x N) rank of every ticker per scenario (1 = best, missing scores last)."""
+        return rank_composites(self.composites)
+
+    def top_indices (self, top_n: int) -> np.ndarray:
+        """(S x top_n) ticker indices of the best *top_n* tickers of every scenario, ordered by rank."""
+        return top_n_indices(self.composites, top_n)
+
+    def top_tickers (self, scenario: int, top_n: int) -> List[str]:
+        """Best *top_n* tickers of one scenario, ordered by rank."""
+        return [self.tickers[i] for i in top_n_indices(self.composites[scenario:scenario + 1], top_n)[0]]
+
+    def to_frame (self, top_n: int = 10) -> pd.DataFrame:
+        """One row per scenario: the weights of every metric followed by its top *top_n* tickers."""
+        weights_df = pd.DataFrame(self.weights, columns=self.metric_keys)
+
+        order = self.top_indices(top_n)
+        tickers = np.asarray(self.tickers, dtype=object)[order]
+        top_df = pd.DataFrame(tickers, columns=[f"Rank {i + 1}" for i in range(order.shape[1])])
+
+        scenario_df = pd.concat([weights_df, top_df], axis=1)
+        scenario_df.index.name = "Scenario"
+        return scenario_df
+
+
+
+# ---------------------------------------------------------------------------
+# public API
+# ---------------------------------------------------------------------------
+
+def build_weight_grid (grid: Dict[str, list]) -> Tuple[List[str], np.ndarray]:
+    """
+    Cartesian product of candidate weights per metric.
+
+    Example:
+        {"pe_trailing": [0, 0.5], "ebit_to_tev": ["1/3", 1]}  ->  4 scenarios
+
+    Scenarios where all weights are zero are dropped (no composite can be computed).
+
+    Returns:
+        Tuple[List[str], np.ndarray]: Metric keys and the (S x M) weight matrix.
+    """
+    metric_keys = list(grid)
+    candidates = [[parse_weight(weight) for weight in grid[key]] for key in metric_keys]
+
+    weight_matrix = np.array(list(product(*candidates)), dtype=float).reshape(-1, len(metric_keys))
+    weight_matrix = weight_matrix[weight_matrix.sum(axis=1) != 0]
+
+    return metric_keys, weight_matrix
+
+
+def build_weight_list (scenarios: List[Dict[str, object]]) -> Tuple[List[str], np.ndarray]:
+    """
+    Weight matrix from an explicit list of weight sets (missing metrics get a weight of zero).
+
+    Returns:
+        Tuple[List[str], np.ndarray]: Metric keys and the (S x M) weight matrix.
+    """
+    metric_keys = list(dict.fromkeys(key for scenario in scenarios for key in scenario))
+
+    weight_matrix = np.array(
+        [[parse_weight(scenario.get(key, 0)) for key in metric_keys] for scenario in scenarios],
+        dtype=float
+    ).reshape(len(scenarios), len(metric_keys))
+
+    return metric_keys, weight_matrix
+
+
+def validate_weight_scenarios (scenario_cfg: dict, config: dict) -> None:
+    """
+    Check the `WeightScenarios` block against `METRIC_REGISTRY` and the factor's `z_score_metrics`.
+
+    Raises:
+        ValueError: If the factor or a scenario metric is unknown, or the metric is not
+            configured in the factor block (it would have no z-score row to re-weight).
+    """
+    factor = scenario_cfg.get("factor", "ValueFactor")
+    if factor not in METRIC_REGISTRY:
+        raise ValueError(f"WeightScenarios: unknown factor '{factor}' (available: {list(METRIC_REGISTRY)}).")
+
+    scenario_keys = scenario_cfg["grid"] if scenario_cfg.get("grid") else [key for scenario in scenario_cfg.get("scenarios", []) for key in scenario]
+    configured_keys = config.get(factor, {}).get("z_score_metrics", {})
+
+    for key in dict.fromkeys(scenario_keys):
+        if key not in METRIC_REGISTRY[factor]:
+            raise ValueError(f"WeightScenarios: unknown metric '{key}' for '{factor}' (available: {list(METRIC_REGISTRY[factor])}).")
+        if key not in configured_keys:
+            raise ValueError(f"WeightScenarios: metric '{key}' is not configured in the 'z_score_metrics' of '{factor}'.")
+
+
+def rank_composites (composites: np.ndarray) -> np.ndarray:
+    """
+    Rank every row of a (scenarios x tickers) composite matrix, highest composite = rank 1.
+
+    Tickers without a composite (NaN) are ranked after all scored tickers.
+    """
+    # Sort descending with NaNs last: argsort of the negated values puts NaNs at the end
+    order = np.argsort(-composites, axis=1, kind="stable")
+
+    ranks = np.empty(composites.shape, dtype=np.int64)
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(1, composites.shape[1] + 1), composites.shape), axis=1)
+    return ranks
+
+
+def top_n_indices (composites: np.ndarray, top_n: int) -> np.ndarray:
+    """
+    Indices of the *top_n* highest composites of every row, ordered by rank.
+
+    Uses a partial selection (argpartition, O(N) per row) and only sorts the
+    selected *top_n* entries, instead of fully sorting every scenario.
+    Missing composites (NaN) are treated as the lowest scores.
+    """
+    top_n = min(top_n, composites.shape[1])
+    if top_n == 0:
+        return np.empty((composites.shape[0], 0), dtype=np.int64)
+
+    sort_keys = np.where(np.isnan(composites), np.inf, -composites)
+
+    candidates = np.argpartition(sort_keys, top_n - 1, axis=1)[:, :top_n]
+    candidate_keys = np.take_along_axis(sort_keys, candidates, axis=1)
+    return np.take_along_axis(candidates, np.argsort(candidate_keys, axis=1, kind="stable"), axis=1)
+
+
+def calc_scenario_scores (scores: FactorScoreMatrix, factor: str, metric_keys: List[str], weight_matrix: np.ndarray) -> ScenarioResult:
+    """
+    Composite scores and rankings of all weight scenarios in one matrix multiply.
+
+    Parameters:
+        scores (FactorScoreMatrix): Result of `calc_factor_z_scores`.
+        factor (str): Factor block whose metric z-scores are re-weighted (e.g. 'ValueFactor').
+        metric_keys (List[str]): Metric of every column of *weight_matrix*.
+        weight_matrix (np.ndarray): (S x K) weights, one row per scenario.
+
+    Returns:
+        ScenarioResult: Composites and rankings of every scenario.
+
+    Raises:
+        KeyError: If a scenario metric is not part of the factor block's z-score matrix.
+    """
+    rows = scores.factor_rows(factor)
+    factor_keys = [scores.metric_keys[r] for r in rows]
+
+    unknown_keys = [key for key in metric_keys if key not in factor_keys]
+    if unknown_keys:
+        raise KeyError(f"Scenario metrics {unknown_keys} are not configured in '{factor}' (available: {factor_keys}).")
+
+    # Align the scenario weights to the factor's z-score rows (metrics not in a scenario get zero weight)
+    aligned_weights = np.zeros((weight_matrix.shape[0], len(rows)))
+    for col, key in enumerate(metric_keys):
+        aligned_weights[:, factor_keys.index(key)] = weight_matrix[:, col]
+
+    #            (S x M) @ (M x N)  with missing-metric renormalisation
+    composites = calc_weighted_composites(scores.zscores[rows], aligned_weights)
+
+    return ScenarioResult(
+        factor=factor,
+        metric_keys=factor_keys,
+        weights=aligned_weights,
+        tickers=list(scores.tickers),
+        composites=composites,
+    )
+
+
+def run_weight_scenarios (scores: FactorScoreMatrix, scenario_cfg: dict) -> ScenarioResult:
+    """
+    Evaluate the scenarios of the `WeightScenarios` configuration block.
+
+    The block contains the `factor` to re-weight and either a `grid`
+    (candidate weights per metric) or an explicit list of `scenarios`.
+    """
+    factor = scenario_cfg.get("factor", "ValueFactor")
+
+    if scenario_cfg.get("grid"):
+        metric_keys, weight_matrix = build_weight_grid(scenario_cfg["grid"])
+    else:
+        metric_keys, weight_matrix = build_weight_list(scenario_cfg.get("scenarios", []))
+
+    return calc_scenario_scores(scores, factor, metric_keys, weight_matrix)